@@ -3,11 +3,12 @@ LangGraph Multi-Agent Workflow for IT Ticket Analysis
 Replaces CrewAI with adaptive routing, HITL, performance tracking, and cost-aware selection
 """
 
-from typing import Dict, List, Any, Optional, TypedDict, Annotated
+from typing import Dict, List, Any, Optional, TypedDict, Annotated, Awaitable, Callable, Tuple
+import asyncio
 import time
 import uuid
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 from operator import add
 
 try:
@@ -82,7 +83,7 @@ class AgentPerformanceTracker:
             "ticket_id": ticket_id,
             "predicted": predicted,
             "confidence": confidence,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "metadata": metadata or {}
         }
         self.predictions.append(prediction)
@@ -101,7 +102,7 @@ class AgentPerformanceTracker:
             if pred["ticket_id"] == ticket_id and pred["agent"] == agent:
                 pred["actual"] = actual
                 pred["feedback_source"] = feedback_source
-                pred["feedback_timestamp"] = datetime.utcnow().isoformat()
+                pred["feedback_timestamp"] = datetime.now(timezone.utc).isoformat()
                 
                 # Calculate accuracy for this prediction
                 is_correct = str(pred["predicted"]).lower() == str(actual).lower()
@@ -1201,85 +1202,71 @@ Return JSON with high confidence (0.8+) and detailed reasoning.
         self,
         tickets: List[Dict],
         task_id: str,
-        options: Optional[Dict] = None
+        options: Optional[Dict] = None,
+        chunk_size: int = 32,
+        on_chunk: Optional[Callable[[List[Tuple[Dict, Dict]]], Awaitable[Any]]] = None
     ):
-        """Process multiple tickets in batch (synchronous for small batches)"""
+        """Process multiple tickets in batch
+
+        Tickets are analyzed `chunk_size` at a time (a small batch is a single window);
+        `on_chunk` receives (ticket, analysis) pairs for each window's successful analyses.
+        """
         logger.info(f"📦 Bulk processing {len(tickets)} tickets (task: {task_id})...")
         results = []
-        # Synchronous for small batches (<=10)
-        if len(tickets) <= 10:
-            for i, ticket in enumerate(tickets):
-                try:
-                    t_plain = self._to_plain(ticket) or {}
-                    if not t_plain:
-                        try:
-                            t_plain = {
-                                "title": getattr(ticket, "title", ""),
-                                "description": getattr(ticket, "description", ""),
-                                "requester_info": getattr(ticket, "requester_info", None) or {},
-                                "additional_context": getattr(ticket, "additional_context", None) or {}
-                            }
-                        except Exception:
-                            pass
-                    # Run classification, priority, and recommendation synchronously
-                    classification = await self.classify_ticket(
-                        t_plain.get("title", ""),
-                        t_plain.get("description", "")
-                    )
-                    priority = await self.predict_priority(
-                        t_plain.get("title", ""),
-                        t_plain.get("description", ""),
-                        t_plain.get("requester_info", {})
-                    )
-                    # Solution recommendation (stub, to be improved in next step)
-                    solution = {"solution": "[Solution recommendation here]"}
-                    results.append({
-                        "classification": classification,
-                        "priority": priority,
-                        "solution": solution
-                    })
-                except Exception as e:
-                    results.append({"error": str(e)})
-            return results
-        # For large batches, keep async/parallel logic (not shown here)
-        for i, ticket in enumerate(tickets):
-            try:
-                t_plain = self._to_plain(ticket) or {}
-                if not t_plain:
-                    try:
-                        t_plain = {
-                            "title": getattr(ticket, "title", ""),
-                            "description": getattr(ticket, "description", ""),
-                            "requester_info": getattr(ticket, "requester_info", None) or {},
-                            "additional_context": getattr(ticket, "additional_context", None) or {}
-                        }
-                    except Exception:
-                        pass
+        # Analyze in fixed-size windows so only `chunk_size` tickets are in flight,
+        # handing each finished window to `on_chunk` (e.g. one bulk DB insert per window)
+        for start in range(0, len(tickets), chunk_size):
+            window = list(enumerate(tickets[start:start + chunk_size], start=start))
+            window_results = await asyncio.gather(
+                *[self._analyze_bulk_item(i, ticket, task_id) for i, ticket in window]
+            )
+            results.extend(result for _, result in window_results)
+            logger.info(f"✅ Processed {start + len(window)}/{len(tickets)}")
 
-                result = await self.analyze_ticket(
-                    title=t_plain.get("title", ""),
-                    description=t_plain.get("description", ""),
-                    requester_info=t_plain.get("requester_info"),
-                    additional_context=t_plain.get("additional_context")
-                )
-                result["batch_index"] = i
-                result["task_id"] = task_id
-                results.append(result)
-                
-                logger.info(f"✅ Processed {i+1}/{len(tickets)}")
-                
-            except Exception as e:
-                logger.error(f"Failed ticket {i}: {str(e)}")
-                results.append({
-                    "batch_index": i,
-                    "task_id": task_id,
-                    "error": str(e),
-                    "status": "failed"
-                })
+            if on_chunk is not None:
+                completed = [(t_plain, result) for t_plain, result in window_results if "error" not in result]
+                if completed:
+                    try:
+                        await on_chunk(completed)
+                    except Exception as e:
+                        logger.error(f"Bulk chunk handler failed (task: {task_id}): {str(e)}")
         
         logger.info(f"✅ Bulk complete: {len(results)} tickets")
         return results
     
+    async def _analyze_bulk_item(self, i: int, ticket: Any, task_id: str) -> Tuple[Dict, Dict]:
+        """Analyze one bulk ticket; failures are returned as an error result instead of raised."""
+        t_plain = self._to_plain(ticket) or {}
+        try:
+            if not t_plain:
+                try:
+                    t_plain = {
+                        "title": getattr(ticket, "title", ""),
+                        "description": getattr(ticket, "description", ""),
+                        "requester_info": getattr(ticket, "requester_info", None) or {},
+                        "additional_context": getattr(ticket, "additional_context", None) or {}
+                    }
+                except Exception:
+                    pass
+
+            result = await self.analyze_ticket(
+                title=t_plain.get("title", ""),
+                description=t_plain.get("description", ""),
+                requester_info=t_plain.get("requester_info"),
+                additional_context=t_plain.get("additional_context")
+            )
+            result["batch_index"] = i
+            result["task_id"] = task_id
+            return t_plain, result
+        except Exception as e:
+            logger.error(f"Failed ticket {i}: {str(e)}")
+            return t_plain, {
+                "batch_index": i,
+                "task_id": task_id,
+                "error": str(e),
+                "status": "failed"
+            }
+    
     async def health_check(self) -> Dict[str, Any]:
         """Check health of workflow manager"""
         return {
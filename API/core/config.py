@@ -7,6 +7,7 @@ from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator, AliasChoices
 from typing import Optional, List, Dict, Any
 from pathlib import Path
+from functools import lru_cache
 import logging
 
 # Anchor all default paths relative to the API directory (project root for the API app)
@@ -22,6 +23,8 @@ class Settings(BaseSettings):
     host: str = Field(default="0.0.0.0")
     port: int = Field(default=8000)
     workers: int = Field(default=1)
+    # Comma-separated CORS origin allowlist ("*" allows any origin, without credentials)
+    allowed_origins: str = Field(default="http://localhost:3000,http://127.0.0.1:3000")
     
     # Model Configuration
     # LLM Provider flags (enable/disable each provider)
@@ -58,6 +61,9 @@ class Settings(BaseSettings):
     twilio_account_sid: Optional[str] = Field(default=None)
     twilio_auth_token: Optional[str] = Field(default=None)
     twilio_phone_number: Optional[str] = Field(default=None)
+    twilio_session_max: int = Field(default=10000)  # concurrent voice calls kept in memory
+    twilio_session_ttl: int = Field(default=1800)  # seconds an idle call's session survives
+    twilio_max_history_turns: int = Field(default=12)  # chat contents kept per call (oldest dropped)
     
     # Weaviate Configuration
     weaviate_host: str = Field(default="http://localhost:8080")
@@ -74,9 +80,15 @@ class Settings(BaseSettings):
     ledger_db_path: str = Field(default=str((BASE_DIR / "data" / "ledger.db").resolve()))
     # ChromaDB persistent directory for local vector storage (used when not using Docker/Weaviate)
     chroma_persist_directory: str = Field(default=str((BASE_DIR / "data" / "chroma_db").resolve()))
+    # HNSW index parameters for new Chroma collections (recall vs. speed/memory trade-off)
+    chroma_hnsw_m: int = Field(default=16)
+    chroma_hnsw_construction_ef: int = Field(default=200)
+    chroma_hnsw_search_ef: int = Field(default=64)
     
     # Data Configuration
     data_dir: str = Field(default=str((BASE_DIR / "data").resolve()))
+    watch_data_folders: bool = Field(default=True)  # ingest changed files after the startup auto-sync
+    data_dir_remote: bool = Field(default=False)  # data_dir on NFS/SMB: watch by polling instead of native events
     models_dir: str = Field(default=str((BASE_DIR / "models").resolve()))
     logs_dir: str = Field(default=str((BASE_DIR / "logs").resolve()))
     
@@ -103,6 +115,9 @@ class Settings(BaseSettings):
     embedding_dimension: int = Field(default=384)
     max_sequence_length: int = Field(default=512)
     batch_size: int = Field(default=32)
+    # "onnx": int8-quantized ONNX Runtime sentence encoder (pip install "sentence-transformers[onnx]"),
+    # several times faster on CPU; vectors stay float32 and close to the PyTorch model's
+    embedding_backend: str = Field(default="torch")
     
     # Categories Configuration
     ticket_categories: List[str] = [
@@ -136,6 +151,11 @@ class Settings(BaseSettings):
     # Cache Configuration
     enable_caching: bool = Field(default=True)
     cache_ttl: int = Field(default=3600)  # seconds
+    analytics_refresh_interval: int = Field(default=300)  # seconds between dashboard rollup rebuilds
+    semantic_cache_threshold: float = Field(default=0.92)  # min cosine similarity for a cache hit
+    semantic_cache_max_entries: int = Field(default=256)
+    dashboard_cache_ttl: int = Field(default=30)  # seconds a dashboard response is shared across clients
+    redis_url: Optional[str] = Field(default=None)  # shared response cache; in-process when unset
     
     # Logging Configuration
     log_level: str = Field(default="INFO")
@@ -206,6 +226,11 @@ class Settings(BaseSettings):
             raise ValueError(f"Log level must be one of {valid_levels}")
         return v.upper()
     
+    @property
+    def model_cache_dir(self) -> str:
+        """Download cache for HuggingFace / sentence-transformers weights and tokenizers"""
+        return str(Path(self.models_dir) / "cache")
+    
     @property
     def has_external_llm(self) -> bool:
         """Check if external LLM APIs are configured and enabled"""
@@ -289,20 +314,15 @@ class Settings(BaseSettings):
         return config
 
 # Global settings instance
-_settings: Optional[Settings] = None
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get global settings instance"""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    return Settings()
 
 def reload_settings() -> Settings:
     """Reload settings from environment"""
-    global _settings
-    _settings = Settings()
-    return _settings
+    get_settings.cache_clear()
+    return get_settings()
 
 # Example .env file content
 ENV_EXAMPLE = """
@@ -311,6 +331,8 @@ ENV_EXAMPLE = """
 DEBUG=false
 HOST=0.0.0.0
 PORT=8000
+# Worker processes when started via `python main.py` (ignored when DEBUG=true, which enables reload)
+WORKERS=1
 
 # Model Configuration
 USE_OLLAMA=true
@@ -335,6 +357,10 @@ MAX_CONCURRENT_REQUESTS=5
 BATCH_SIZE=32
 ENABLE_CACHING=true
 CACHE_TTL=3600
+ANALYTICS_REFRESH_INTERVAL=300
+DASHBOARD_CACHE_TTL=30
+# Optional: share the dashboard response cache across workers
+#REDIS_URL=redis://localhost:6379/0
 
 
 # ========== Docker-only ==========
@@ -348,11 +374,17 @@ WEAVIATE_API_KEY=
 # ========== Local-only (no Docker) ==========
 # Keep USE_DOCKER=false for local mode
 CHROMA_PERSIST_DIRECTORY=./data/chroma_db
+#CHROMA_HNSW_M=16
+#CHROMA_HNSW_CONSTRUCTION_EF=200
+#CHROMA_HNSW_SEARCH_EF=64
 # Optional: general app persistence (non-vector)
 USE_SQLITE=true
 SQLITE_DB_PATH=./data/app.db
 # Ledger DB for auto-sync bookkeeping
 LEDGER_DB_PATH=./data/ledger.db
+# Ingest files changed after startup (needs watchdog); poll when the data dir is on NFS/SMB
+WATCH_DATA_FOLDERS=true
+DATA_DIR_REMOTE=false
 # If you run a local Weaviate outside Docker (instead of Chroma), point to localhost
 #WEAVIATE_HOST=http://localhost:8080
 
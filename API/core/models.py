@@ -2,7 +2,7 @@
 Pydantic models for request/response schemas
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic import field_validator
 from typing import List, Dict, Optional, Any
 from datetime import datetime
@@ -177,6 +177,8 @@ class SolutionRecommendation(BaseModel):
 
 class TicketAnalysisResponse(BaseModel):
     """Complete ticket analysis response"""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     ticket_id: str
     classification: ClassificationResult
     priority_prediction: PriorityPrediction
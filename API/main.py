@@ -3,13 +3,25 @@ AI-Powered IT Ticket Analyzer & Auto-Suggester
 Enterprise-grade FastAPI application with multi-agent architecture
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import anyio.to_thread
 import asyncio
+import base64
+import io
+import orjson
+import os
+import time
+import secrets
 import uvicorn
+import pandas as pd
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Annotated, Optional, Type, TypeVar
+from pydantic import BaseModel, ValidationError
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -31,7 +43,13 @@ from services.model_service import ModelService
 from utils.logger import setup_logger
 from utils.ledger_sqlite import SqliteLedger
 from utils.database import TicketDatabase
-from scripts.datasets import ingest_folder, Embedder
+from utils.semantic_cache import SemanticCache
+from utils.response_cache import ResponseCache
+from utils.folder_watcher import FolderWatcher
+from utils.cache import async_ttl_cache
+from utils.cache_control import CacheControlMiddleware
+from utils.orjson_response import ORJSONResponse
+from scripts.datasets import ingest_file, ingest_folder, Embedder, get_embedder, SUPPORTED_SUFFIXES
 from routers import twilio
 
 # Setup logging
@@ -43,11 +61,73 @@ knowledge_service: KnowledgeService = None
 data_service: DataService = None
 model_service: ModelService = None
 ticket_db: TicketDatabase = None
+embedder: Embedder = None
+semantic_cache: SemanticCache = None
+response_cache: ResponseCache = None
+folder_watcher: FolderWatcher = None
+ledger_store: SqliteLedger = None
+DASHBOARD_CACHE_NAMESPACE = "dash"
+feedback_queue: asyncio.Queue = None
+
+# Worker threads available for blocking (SQLite) calls made via run_db
+DB_THREAD_LIMIT = 64
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking database call in the shared worker thread pool."""
+    return await run_in_threadpool(fn, *args, **kwargs)
+
+# Agent feedback is buffered and written in batches
+FEEDBACK_BATCH_SIZE = 500
+FEEDBACK_FLUSH_INTERVAL = 0.1  # seconds
+FEEDBACK_QUEUE_MAX = 10_000  # pending items; beyond this the endpoint answers 503
+# A failed batch write is retried with exponential backoff (capped) until it succeeds;
+# during shutdown it gets FEEDBACK_SHUTDOWN_ATTEMPTS tries so the drain can finish
+FEEDBACK_RETRY_BASE_DELAY = 0.5  # seconds
+FEEDBACK_RETRY_MAX_DELAY = 30.0  # seconds
+FEEDBACK_SHUTDOWN_ATTEMPTS = 3
+AUTO_SYNC_BATCH_SIZE = 500
+# Subfolders of data_dir kept in sync with the vector DB
+AUTO_SYNC_FOLDERS = ("kaggle", "scraped", "processed", "imports", "exports")
+
+async def _flush_agent_feedback(queue: asyncio.Queue, db: TicketDatabase):
+    """Drain queued agent feedback into the database in batches."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + FEEDBACK_FLUSH_INTERVAL
+        while len(batch) < FEEDBACK_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        try:
+            attempt = 0
+            while True:
+                try:
+                    await run_db(db.log_agent_feedback_batch, batch)
+                    if response_cache:
+                        await response_cache.clear(DASHBOARD_CACHE_NAMESPACE)
+                    break
+                except Exception as e:
+                    attempt += 1
+                    shutting_down = feedback_queue is not queue
+                    if shutting_down and attempt >= FEEDBACK_SHUTDOWN_ATTEMPTS:
+                        logger.error("Agent feedback batch write failed at shutdown, dropping %s items: %s", len(batch), e)
+                        break
+                    delay = min(FEEDBACK_RETRY_MAX_DELAY, FEEDBACK_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                    logger.warning("Agent feedback batch write failed (%s items), retrying in %.1fs: %s", len(batch), delay, e)
+                    await asyncio.sleep(delay)
+        finally:
+            for _ in batch:
+                queue.task_done()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown events"""
-    global workflow_manager, knowledge_service, data_service, model_service, ticket_db
+    global workflow_manager, knowledge_service, data_service, model_service, ticket_db, embedder, semantic_cache, response_cache, folder_watcher, feedback_queue, ledger_store
     
     logger.info("🚀 Starting IT Ticket Analyzer API...")
     
@@ -55,13 +135,20 @@ async def lifespan(app: FastAPI):
         # Initialize settings
         settings = get_settings()
         
+        # Size the worker thread pool used for blocking DB calls
+        anyio.to_thread.current_default_thread_limiter().total_tokens = DB_THREAD_LIMIT
+        
         # Initialize database
         logger.info("Initializing database...")
         db_path = Path(settings.data_dir) / "tickets.db"
         ticket_db = TicketDatabase(str(db_path))
+        # Open the ingestion ledger once; auto-sync and the ledger endpoint share it
+        app.state.ledger = get_sqlite_ledger()
         
         # Initialize services
         logger.info("Initializing services...")
+        # The sentence embedder loads in a worker thread while the services below initialize
+        embedder_load = asyncio.create_task(asyncio.to_thread(get_embedder))
         model_service = ModelService(settings)
         await model_service.initialize()
         
@@ -74,56 +161,153 @@ async def lifespan(app: FastAPI):
         workflow_manager = WorkflowManager(settings, model_service, knowledge_service)
         await workflow_manager.initialize()
         
+        # Shared sentence embedder (auto-sync ingestion + query embeddings for the semantic cache);
+        # get_embedder() is cached, so re-entering lifespan reuses the loaded model
+        try:
+            embedder = await embedder_load
+            app.state.embedder = embedder
+        except Exception as e:
+            logger.warning("Embedder unavailable, auto-sync and semantic cache disabled: %s", e)
+        if embedder is not None and getattr(settings, 'enable_caching', True):
+            semantic_cache = SemanticCache(
+                max_entries=getattr(settings, 'semantic_cache_max_entries', 256),
+                ttl_seconds=getattr(settings, 'cache_ttl', 3600),
+                threshold=getattr(settings, 'semantic_cache_threshold', 0.92),
+            )
+        
+        # Short-TTL response cache for dashboard aggregates (Redis when configured)
+        redis_client = None
+        if getattr(settings, 'redis_url', None):
+            try:
+                import redis.asyncio as aioredis
+                redis_client = aioredis.from_url(settings.redis_url)
+                await redis_client.ping()
+            except Exception as e:
+                logger.warning("Redis unavailable, using in-process response cache: %s", e)
+                redis_client = None
+        response_cache = ResponseCache(redis_client)
+        # Voice call sessions share the same Redis, so any worker can serve any turn of a call
+        twilio.sessions.attach_redis(redis_client)
+        
         # Start background auto-sync of local data folders into vector DB (idempotent via ledger)
         async def _auto_sync_data_folders():
+            global folder_watcher
             try:
+                if embedder is None:
+                    raise RuntimeError("embedder not loaded")
                 data_dir = Path(getattr(settings, 'data_dir', './data'))
-                ledger = SqliteLedger(Path(getattr(settings, 'ledger_db_path', './data/ledger.db')))
-
-                embedder = Embedder()
-                folders = [
-                    data_dir / 'kaggle',
-                    data_dir / 'scraped',
-                    data_dir / 'processed',
-                    data_dir / 'imports',
-                    data_dir / 'exports',
-                ]
+                ledger = get_sqlite_ledger()
+
+                folders = [data_dir / name for name in AUTO_SYNC_FOLDERS]
+                # Folders are independent, so ingest them concurrently in batches
+                existing = await asyncio.to_thread(lambda: [folder for folder in folders if folder.exists()])
+                results = await asyncio.gather(
+                    *[
+                        ingest_folder(folder, 'Documentation', 'auto', knowledge_service, embedder, ledger, batch_size=AUTO_SYNC_BATCH_SIZE)
+                        for folder in existing
+                    ],
+                    return_exceptions=True,
+                )
                 total = 0
-                for folder in folders:
-                    if folder.exists():
-                        added = await ingest_folder(folder, 'Documentation', 'auto', knowledge_service, embedder, ledger)
-                        if added:
-                            logger.info(f"Auto-sync: ingested {added} docs from {folder}")
-                        total += added
+                for folder, added in zip(existing, results):
+                    if isinstance(added, Exception):
+                        logger.warning("Auto-sync failed for %s: %s", folder, added)
+                        continue
+                    if added:
+                        logger.info("Auto-sync: ingested %s docs from %s", added, folder)
+                    total += added
+                if total:
+                    _clear_kb_query_caches()
+
+                # Mark removed: entries whose files no longer exist. Runs off the event loop and
+                # lists each parent directory once instead of stat-ing every entry.
+                def _missing_doc_ids():
+                    listings = {}
+                    missing = []
+                    for entry in ledger.active_entries(('auto', 'manual')):
+                        if not entry['path']:
+                            continue
+                        path = Path(entry['path'])
+                        parent = str(path.parent)
+                        if parent not in listings:
+                            try:
+                                listings[parent] = set(os.listdir(parent))
+                            except OSError:
+                                listings[parent] = set()
+                        if path.name not in listings[parent]:
+                            missing.append(entry['doc_id'])
+                    return missing
 
-                # Mark removed: entries whose files no longer exist
                 removed = 0
-                for entry in ledger.iter_entries():
-                    p = Path(entry.get('path') or '')
-                    if entry.get('source_type') in ('auto', 'manual') and entry.get('status') != 'removed':
-                        if not p.exists():
-                            try:
-                                ledger.mark_removed(entry['doc_id'])
-                                removed += 1
-                            except Exception:
-                                pass
+                try:
+                    removed = await run_db(ledger.mark_removed_many, await run_db(_missing_doc_ids))
+                except Exception as e:
+                    logger.warning("Auto-sync: marking removed files failed: %s", e)
                 health = await knowledge_service.health_check()
-                logger.info(f"Auto-sync complete. Added {total}, removed {removed}. Backend={health.get('backend')} Count={health.get('document_count')}")
+                logger.info("Auto-sync complete. Added %s, removed %s. Backend=%s Count=%s", total, removed, health.get('backend'), health.get('document_count'))
+
+                # From here on, ingest individual files as they change instead of rescanning
+                if getattr(settings, 'watch_data_folders', True):
+                    async def _ingest_changed_file(path: Path, folder: Path) -> int:
+                        added = await ingest_file(path, folder, 'Documentation', 'auto', knowledge_service, embedder, ledger)
+                        if added:
+                            _clear_kb_query_caches()
+                        return added
+
+                    folder_watcher = FolderWatcher(
+                        folders,
+                        patterns=[f"*{suffix}" for suffix in SUPPORTED_SUFFIXES],
+                        on_change=_ingest_changed_file,
+                        polling=getattr(settings, 'data_dir_remote', False),
+                    )
+                    folder_watcher.start()
             except Exception as e:
-                logger.warning(f"Auto-sync skipped or failed: {e}")
+                logger.warning("Auto-sync skipped or failed: %s", e)
 
         asyncio.create_task(_auto_sync_data_folders())
 
+        # Periodically rebuild the dashboard rollup table (first pass runs immediately)
+        async def _refresh_analytics_rollups():
+            interval = max(int(getattr(settings, 'analytics_refresh_interval', 300)), 1)
+            while True:
+                try:
+                    await run_db(ticket_db.refresh_rollups)
+                except Exception as e:
+                    logger.warning("Analytics rollup refresh failed: %s", e)
+                await asyncio.sleep(interval)
+
+        rollup_task = asyncio.create_task(_refresh_analytics_rollups())
+
+        feedback_queue = asyncio.Queue(maxsize=FEEDBACK_QUEUE_MAX)
+        feedback_task = asyncio.create_task(_flush_agent_feedback(feedback_queue, ticket_db))
+
+        # Voice assistant: one Gemini client for the whole process
+        twilio.init_gemini_client()
+
         logger.info("✅ All services initialized successfully!")
         
     except Exception as e:
-        logger.error(f"❌ Failed to initialize services: {str(e)}")
+        logger.error("❌ Failed to initialize services: %s", e)
         raise
     
     yield
     
     # Cleanup
     logger.info("🔄 Shutting down services...")
+    rollup_task.cancel()
+    if folder_watcher:
+        folder_watcher.stop()
+    # Stop accepting agent feedback, then drain what is pending before stopping the writer
+    pending_feedback, feedback_queue = feedback_queue, None
+    await pending_feedback.join()
+    feedback_task.cancel()
+    twilio.sessions.attach_redis(None)
+    if response_cache and response_cache.redis is not None:
+        await response_cache.redis.aclose()
+    await twilio.close_gemini_client()
+    if ledger_store:
+        ledger_store.close()
+        ledger_store = None
     if knowledge_service:
         await knowledge_service.close()
     if model_service:
@@ -137,20 +321,33 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 app.include_router(twilio.router)
 
-# CORS middleware
+# CORS middleware: explicit origin allowlist, preflight responses cached by browsers for a day
+_cors_origins = [o.strip() for o in get_settings().allowed_origins.split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=_cors_origins,
+    allow_credentials="*" not in _cors_origins,  # credentials are not allowed with a wildcard origin
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
+    expose_headers=["Content-Disposition"],
+    max_age=86400,
 )
 
+# Compress larger responses (dashboard JSON, streamed CSV exports) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Log unexpected endpoint errors once, with traceback, and return a 500."""
+    logger.exception("Unhandled error on %s %s: %s", request.method, request.url.path, exc)
+    return ORJSONResponse(status_code=500, content={"detail": str(exc)})
+
 # Dependency to get services
 async def get_workflow_manager() -> WorkflowManager:
     if not workflow_manager:
@@ -167,16 +364,86 @@ async def get_data_service() -> DataService:
         raise HTTPException(status_code=503, detail="Data service not initialized")
     return data_service
 
+def get_sqlite_ledger() -> SqliteLedger:
+    """Process-wide ingestion ledger, opened on first use and shared by auto-sync and endpoints."""
+    global ledger_store
+    if ledger_store is None:
+        ledger_store = SqliteLedger(Path(getattr(get_settings(), 'ledger_db_path', './data/ledger.db')))
+    return ledger_store
+
 def get_database() -> TicketDatabase:
     if not ticket_db:
         raise HTTPException(status_code=503, detail="Database not initialized")
     return ticket_db
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+def json_body(model: Type[ModelT]):
+    """Dependency validating the raw JSON body in a single pass with Pydantic's Rust parser.
+
+    Skips FastAPI's json.loads + dict validation round trip; errors still surface as 422.
+    """
+    async def dependency(request: Request) -> ModelT:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+            )
+    return dependency
+
+def json_body_openapi(model: Type[BaseModel]) -> dict:
+    """openapi_extra documenting `model` as the JSON request body of a json_body route.
+
+    FastAPI can't see a body read inside a dependency, so the schema is declared here;
+    nested definitions (e.g. enums) are inlined since the operation has no $defs of its own.
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def inline(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return inline({**defs[ref.rsplit("/", 1)[-1]], **{k: v for k, v in node.items() if k != "$ref"}})
+            return {key: inline(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [inline(item) for item in node]
+        return node
+
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": inline(schema)}},
+        }
+    }
+
+async def _embed_query(query: str):
+    """Embed a query once for the semantic cache and the vector search; None if unavailable."""
+    if embedder is None:
+        return None
+    try:
+        return await asyncio.to_thread(embedder.encode, query)
+    except Exception as e:
+        logger.warning("Query embedding failed, bypassing semantic cache: %s", e)
+        return None
+
+
 # Ledger stats endpoint
+LEDGER_JSON_BUFFER_LIMIT = 1000
+LEDGER_STATS_TTL_SECONDS = 10
+
+@async_ttl_cache(ttl=LEDGER_STATS_TTL_SECONDS)
+async def _ledger_stats_snapshot(ledger: SqliteLedger):
+    """Ledger counts shared by repeated polls for LEDGER_STATS_TTL_SECONDS."""
+    return await run_db(ledger.stats)
+
 @app.get("/api/v1/knowledge/ledger")
 async def get_ledger(
     include_entries: bool = False,
     limit: int = 0,
     status: Optional[str] = None,
+    format: str = "json",  # json | ndjson
 ):
     """Return ledger stats and optionally entries.
 
@@ -184,91 +451,89 @@ async def get_ledger(
     - include_entries: when true, include entries payload (be mindful, may be large)
     - limit: maximum number of entries to return (0 = no limit)
     - status: filter by status (e.g., 'synced' or 'removed') when including entries
+    - format: 'ndjson' streams {"stats": ...} then one entry per line, with flat memory
+
+    JSON responses with more than LEDGER_JSON_BUFFER_LIMIT entries (or no limit) are
+    streamed as the same {"stats": ..., "entries": [...]} document instead of built in memory.
     """
-    settings = get_settings()
-    ledger = SqliteLedger(Path(getattr(settings, 'ledger_db_path', './data/ledger.db')))
-    stats = ledger.stats()
+    ledger = get_sqlite_ledger()
+    stats = await _ledger_stats_snapshot(ledger)
+    if (format or "").lower() == "ndjson":
+        def _ndjson_lines():
+            yield orjson.dumps({"stats": stats}) + b"\n"
+            if include_entries:
+                for entry in ledger.iter_entries_cursor(status=status, limit=limit):
+                    yield orjson.dumps(entry) + b"\n"
+
+        return StreamingResponse(_ndjson_lines(), media_type="application/x-ndjson")
+    if include_entries and not (0 < limit <= LEDGER_JSON_BUFFER_LIMIT):
+        def _json_document():
+            buf = bytearray(b'{"stats":' + orjson.dumps(stats) + b',"entries":[')
+            for i, entry in enumerate(ledger.iter_entries_cursor(status=status, limit=limit)):
+                if i:
+                    buf += b","
+                buf += orjson.dumps(entry)
+                if len(buf) >= 65536:
+                    yield bytes(buf)
+                    buf.clear()
+            buf += b"]}"
+            yield bytes(buf)
+
+        return StreamingResponse(_json_document(), media_type="application/json")
     resp = {"stats": stats}
     if include_entries:
-        entries = []
-        for e in ledger.iter_entries():
-            if status and e.get("status") != status:
-                continue
-            entries.append(e)
-            if limit and len(entries) >= limit:
-                break
-        resp["entries"] = entries
+        resp["entries"] = await run_db(ledger.query_entries, status=status, limit=limit)
     return resp
 
 
 # Knowledge base debug/status endpoint
-@app.get("/api/v1/debug/knowledge-base-status")
-async def knowledge_base_status(knowledge: KnowledgeService = Depends(get_knowledge_service)):
-    """Return debug info about the knowledge base so we can quickly verify content exists."""
-    try:
-        health = await knowledge.health_check()
-        count = await knowledge.get_document_count()
+KB_STATUS_TTL_SECONDS = 30
 
-        backend = health.get("backend")
-        chroma_info = None
-        weaviate_info = None
-        sample = None
+@async_ttl_cache(ttl=KB_STATUS_TTL_SECONDS)
+async def _kb_status_snapshot(knowledge: KnowledgeService):
+    """Knowledge base status, shared by repeated polls for KB_STATUS_TTL_SECONDS."""
+    settings = get_settings()
+    health = await knowledge.health_check()
+    count = health.get("document_count")  # health_check already counts; avoid a second round trip
 
-        # Try to fetch a sample document depending on backend
-        if getattr(knowledge, "chroma_collection", None) is not None:
-            try:
-                # Chroma collections support .get with a limit
-                raw = knowledge.chroma_collection.get(limit=1)
-                if raw and raw.get("ids"):
-                    ids = raw.get("ids", [])
-                    metadatas = raw.get("metadatas", [])
-                    documents = raw.get("documents", [])
-
-                    # Handle both shapes: flat lists (get) and list-of-lists (query)
-                    id0 = ids[0] if ids else None
-                    meta0 = None
-                    doc0 = None
-                    if metadatas:
-                        if isinstance(metadatas[0], dict):
-                            meta0 = metadatas[0]
-                        elif isinstance(metadatas[0], list) and metadatas[0]:
-                            meta0 = metadatas[0][0]
-                    if documents:
-                        if isinstance(documents[0], str):
-                            doc0 = documents[0]
-                        elif isinstance(documents[0], list) and documents[0]:
-                            doc0 = documents[0][0]
+    backend = health.get("backend")
+    chroma_info = None
+    weaviate_info = None
+    sample = None
 
-                    sample = {
-                        "id": id0,
-                        "title": (meta0 or {}).get("title"),
-                        "category": (meta0 or {}).get("category"),
-                        "snippet": (doc0 or "")[:200]
-                    }
-            except Exception:
-                # As a fallback, try searching anything with min_similarity=0
-                try:
-                    srch = await knowledge.search(query="sample", category=None, limit=1, min_similarity=0.0)
-                    if srch:
-                        r0 = srch[0]
-                        sample = {
-                            "id": r0.get("doc_id"),
-                            "title": r0.get("title"),
-                            "category": r0.get("category"),
-                            "snippet": r0.get("content_snippet")[:200] if r0.get("content_snippet") else None
-                        }
-                except Exception:
-                    pass
-            chroma_info = {
-                "collection_name": getattr(knowledge.chroma_collection, "name", "it_knowledge_base"),
-                "persist_dir": str(getattr(knowledge, "_chroma_path", "./data/chroma_db"))
-            }
-        elif getattr(knowledge, "client", None) and getattr(knowledge, "collection", None):
-            # Weaviate info
-            weaviate_info = {
-                "class_name": getattr(get_settings(), 'weaviate_class_name', 'ITKnowledge'),
-                "host": getattr(get_settings(), 'weaviate_host', 'http://localhost:8080')
-            }
+    # Try to fetch a sample document depending on backend
+    if getattr(knowledge, "chroma_collection", None) is not None:
+        try:
+            # Chroma collections support .get with a limit; it reads SQLite, so keep it off the loop
+            raw = await run_db(knowledge.chroma_collection.get, limit=1)
+            if raw and raw.get("ids"):
+                ids = raw.get("ids", [])
+                metadatas = raw.get("metadatas", [])
+                documents = raw.get("documents", [])
+
+                # Handle both shapes: flat lists (get) and list-of-lists (query)
+                id0 = ids[0] if ids else None
+                meta0 = None
+                doc0 = None
+                if metadatas:
+                    if isinstance(metadatas[0], dict):
+                        meta0 = metadatas[0]
+                    elif isinstance(metadatas[0], list) and metadatas[0]:
+                        meta0 = metadatas[0][0]
+                if documents:
+                    if isinstance(documents[0], str):
+                        doc0 = documents[0]
+                    elif isinstance(documents[0], list) and documents[0]:
+                        doc0 = documents[0][0]
+
+                sample = {
+                    "id": id0,
+                    "title": (meta0 or {}).get("title"),
+                    "category": (meta0 or {}).get("category"),
+                    "snippet": (doc0 or "")[:200]
+                }
+        except Exception:
+            # As a fallback, try searching anything with min_similarity=0
             try:
                 srch = await knowledge.search(query="sample", category=None, limit=1, min_similarity=0.0)
                 if srch:
@@ -281,17 +546,41 @@ async def knowledge_base_status(knowledge: KnowledgeService = Depends(get_knowle
                     }
             except Exception:
                 pass
-
-        return {
-            "backend": backend,
-            "document_count": count,
-            "chroma": chroma_info,
-            "weaviate": weaviate_info,
-            "sample": sample,
+        chroma_info = {
+            "collection_name": getattr(knowledge.chroma_collection, "name", "it_knowledge_base"),
+            "persist_dir": str(getattr(knowledge, "_chroma_path", "./data/chroma_db"))
         }
-    except Exception as e:
-        logger.error(f"KB status failed: {e}")
-        raise HTTPException(status_code=500, detail=f"KB status failed: {str(e)}")
+    elif getattr(knowledge, "client", None) and getattr(knowledge, "collection", None):
+        # Weaviate info
+        weaviate_info = {
+            "class_name": getattr(settings, 'weaviate_class_name', 'ITKnowledge'),
+            "host": getattr(settings, 'weaviate_host', 'http://localhost:8080')
+        }
+        try:
+            srch = await knowledge.search(query="sample", category=None, limit=1, min_similarity=0.0)
+            if srch:
+                r0 = srch[0]
+                sample = {
+                    "id": r0.get("doc_id"),
+                    "title": r0.get("title"),
+                    "category": r0.get("category"),
+                    "snippet": r0.get("content_snippet")[:200] if r0.get("content_snippet") else None
+                }
+        except Exception:
+            pass
+
+    return {
+        "backend": backend,
+        "document_count": count,
+        "chroma": chroma_info,
+        "weaviate": weaviate_info,
+        "sample": sample,
+    }
+
+@app.get("/api/v1/debug/knowledge-base-status")
+async def knowledge_base_status(knowledge: KnowledgeService = Depends(get_knowledge_service)):
+    """Return debug info about the knowledge base so we can quickly verify content exists."""
+    return await _kb_status_snapshot(knowledge)
 
 
 # Root endpoint
@@ -306,39 +595,88 @@ async def root():
     }
 
 # Health check endpoints
+HEALTH_CHECK_TTL_SECONDS = 3
+HEALTH_PROBE_TIMEOUT_SECONDS = 1.0
+
+async def _probe(service) -> bool:
+    """One backend's health_check, bounded so a stuck backend reads as unhealthy instead of hanging."""
+    if service is None:
+        return False
+    try:
+        return await asyncio.wait_for(service.health_check(), HEALTH_PROBE_TIMEOUT_SECONDS)
+    except Exception as e:  # includes TimeoutError
+        logger.warning("%s health probe failed: %r", type(service).__name__, e)
+        return False
+
+@async_ttl_cache(ttl=HEALTH_CHECK_TTL_SECONDS)
+async def _probe_services_health():
+    """Backend health shared by concurrent/frequent probes (load balancers) for a few seconds."""
+    # Probe concurrently: latency is the slowest probe, not the sum
+    knowledge_ok, model_ok = await asyncio.gather(_probe(knowledge_service), _probe(model_service))
+    return {
+        "workflow_manager": workflow_manager is not None,
+        "knowledge_service": knowledge_ok,
+        "data_service": data_service is not None,
+        "model_service": model_ok
+    }
+
 @app.get("/api/v1/health")
 async def health_check():
     """Health check endpoint"""
     try:
-        services_status = {
-            "workflow_manager": workflow_manager is not None,
-            "knowledge_service": knowledge_service is not None and await knowledge_service.health_check(),
-            "data_service": data_service is not None,
-            "model_service": model_service is not None and await model_service.health_check()
-        }
+        services_status = await _probe_services_health()
         
         all_healthy = all(services_status.values())
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200 if all_healthy else 503,
             content={
                 "status": "healthy" if all_healthy else "degraded",
-                "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "timestamp": datetime.now(timezone.utc),
                 "services": services_status
             }
         )
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return JSONResponse(
+        logger.error("Health check failed: %s", e)
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
                 "error": str(e),
-                "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+                "timestamp": datetime.now(timezone.utc)
             }
         )
 
 # Main ticket analysis endpoint
+def _ticket_record(title: str, description: str, requester_info, analysis_result: dict) -> dict:
+    """Map a workflow analysis result onto a TicketDatabase row."""
+    if hasattr(requester_info, "model_dump"):
+        requester_info = requester_info.model_dump()
+    requester_info = requester_info or None
+    return {
+        'ticket_id': analysis_result['ticket_id'],
+        'title': title,
+        'description': description,
+        'category': analysis_result['classification']['category'],
+        'subcategory': analysis_result['classification'].get('subcategory'),
+        'classification_confidence': analysis_result['classification']['confidence'],
+        'classification_reasoning': analysis_result['classification'].get('reasoning'),
+        'priority': analysis_result['priority_prediction']['priority'],
+        'priority_confidence': analysis_result['priority_prediction']['confidence'],
+        'estimated_resolution_hours': analysis_result['priority_prediction'].get('estimated_resolution_hours'),
+        'priority_reasoning': analysis_result['priority_prediction'].get('reasoning'),
+        'requester_name': requester_info.get('name') if requester_info else None,
+        'requester_email': requester_info.get('email') if requester_info else None,
+        'requester_department': requester_info.get('department') if requester_info else None,
+        'requester_info': requester_info,
+        'processing_time_ms': analysis_result.get('processing_time_ms'),
+        'summary': analysis_result.get('summary'),
+        'suggested_assignee': analysis_result.get('suggested_assignee'),
+        'tags': analysis_result.get('tags'),
+        'recommended_solutions': analysis_result.get('recommended_solutions', []),
+        'track_performance': True  # Enable performance tracking
+    }
+
 @app.post("/api/v1/tickets/analyze", response_model=TicketAnalysisResponse)
 async def analyze_ticket(
     request: TicketAnalysisRequest,
@@ -349,89 +687,63 @@ async def analyze_ticket(
     Comprehensive ticket analysis using LangGraph multi-agent workflow
     Saves results to database for history and analytics
     """
-    try:
-        logger.info(f"Analyzing ticket: {request.title[:50]}...")
-        
-        # Run LangGraph workflow analysis
-        analysis_result = await workflow.analyze_ticket(
-            title=request.title,
-            description=request.description,
-            requester_info=request.requester_info,
-            additional_context=request.additional_context
-        )
-        
-        # Prepare data for database storage
-        requester_info = request.requester_info
-        db_ticket_data = {
-            'ticket_id': analysis_result['ticket_id'],
-            'title': request.title,
-            'description': request.description,
-            'category': analysis_result['classification']['category'],
-            'subcategory': analysis_result['classification'].get('subcategory'),
-            'classification_confidence': analysis_result['classification']['confidence'],
-            'classification_reasoning': analysis_result['classification'].get('reasoning'),
-            'priority': analysis_result['priority_prediction']['priority'],
-            'priority_confidence': analysis_result['priority_prediction']['confidence'],
-            'estimated_resolution_hours': analysis_result['priority_prediction'].get('estimated_resolution_hours'),
-            'priority_reasoning': analysis_result['priority_prediction'].get('reasoning'),
-            'requester_name': requester_info.name if requester_info else None,
-            'requester_email': requester_info.email if requester_info else None,
-            'requester_department': requester_info.department if requester_info else None,
-            'requester_info': requester_info.model_dump() if requester_info else None,
-            'processing_time_ms': analysis_result.get('processing_time_ms'),
-            'summary': analysis_result.get('summary'),
-            'suggested_assignee': analysis_result.get('suggested_assignee'),
-            'tags': analysis_result.get('tags'),
-            'recommended_solutions': analysis_result.get('recommended_solutions', []),
-            'track_performance': True  # Enable performance tracking
-        }
-        
-        # Save to database
-        ticket_id = db.create_ticket(db_ticket_data)
-        logger.info(f"✅ Ticket {ticket_id} saved to database")
+    logger.info("Analyzing ticket: %s...", request.title[:50])
+    # Dump once; the workflow and the DB row share the plain dict
+    requester_info = request.requester_info.model_dump(mode="json") if request.requester_info else None
+    
+    # Run LangGraph workflow analysis
+    analysis_result = await workflow.analyze_ticket(
+        title=request.title,
+        description=request.description,
+        requester_info=requester_info,
+        additional_context=request.additional_context
+    )
+    
+    # Prepare data for database storage
+    db_ticket_data = _ticket_record(request.title, request.description, requester_info, analysis_result)
+    
+    # Save to database
+    ticket_id = await run_db(db.create_ticket, db_ticket_data)
+    logger.info("✅ Ticket %s saved to database", ticket_id)
 
-        # Best-effort: ingest recommended solutions into the knowledge base to grow KB size
-        try:
-            solutions = analysis_result.get("recommended_solutions") or []
-            if solutions and knowledge_service:
-                for sol in solutions:
-                    # Build a compact content blob combining problem and solution steps
-                    steps = sol.get("steps") or []
-                    content_parts = [
-                        f"Ticket: {request.title}\n\nDescription: {request.description}",
-                        f"Solution: {sol.get('description','')}",
-                    ]
-                    if steps:
-                        content_parts.append("Steps:\n- " + "\n- ".join([str(s) for s in steps]))
-                    content = "\n\n".join([p for p in content_parts if p and p.strip()])
-
-                    # Use solution_id to dedupe; fall back to deterministic ID
-                    doc_id = sol.get("solution_id") or f"sol-{ticket_id}"
-                    await knowledge_service.add_document(
-                        title=f"Solution: {sol.get('title') or request.title}",
-                        content=content,
-                        category=analysis_result.get('classification', {}).get('category') or sol.get('category') or 'General Support',
-                        tags=["ticket_solution"],
-                        source=ticket_id,
-                        source_type="ticket_solution",
-                        metadata={
-                            "ticket_id": ticket_id,
-                            "priority": analysis_result.get('priority_prediction', {}).get('priority'),
-                            "similarity": sol.get('similarity_score'),
-                            "source": sol.get('source'),
-                        },
-                        doc_id=doc_id,
-                    )
-        except Exception as e:
-            logger.warning(f"Solution KB ingestion skipped/failed: {e}")
-        
-        # Return a plain dict so direct function calls in tests receive a subscriptable result.
-        # FastAPI will validate/serialize this against TicketAnalysisResponse for HTTP clients.
-        return analysis_result
-        
+    # Best-effort: ingest recommended solutions into the knowledge base to grow KB size
+    try:
+        solutions = analysis_result.get("recommended_solutions") or []
+        if solutions and knowledge_service:
+            for sol in solutions:
+                # Build a compact content blob combining problem and solution steps
+                steps = sol.get("steps") or []
+                content_parts = [
+                    f"Ticket: {request.title}\n\nDescription: {request.description}",
+                    f"Solution: {sol.get('description','')}",
+                ]
+                if steps:
+                    content_parts.append("Steps:\n- " + "\n- ".join([str(s) for s in steps]))
+                content = "\n\n".join([p for p in content_parts if p and p.strip()])
+
+                # Use solution_id to dedupe; fall back to deterministic ID
+                doc_id = sol.get("solution_id") or f"sol-{ticket_id}"
+                await knowledge_service.add_document(
+                    title=f"Solution: {sol.get('title') or request.title}",
+                    content=content,
+                    category=analysis_result.get('classification', {}).get('category') or sol.get('category') or 'General Support',
+                    tags=["ticket_solution"],
+                    source=ticket_id,
+                    source_type="ticket_solution",
+                    metadata={
+                        "ticket_id": ticket_id,
+                        "priority": analysis_result.get('priority_prediction', {}).get('priority'),
+                        "similarity": sol.get('similarity_score'),
+                        "source": sol.get('source'),
+                    },
+                    doc_id=doc_id,
+                )
     except Exception as e:
-        logger.error(f"Ticket analysis failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        logger.warning("Solution KB ingestion skipped/failed: %s", e)
+    
+    # The result comes from our own workflow, so skip re-validating it against
+    # TicketAnalysisResponse (which still documents the schema in OpenAPI)
+    return ORJSONResponse(analysis_result)
 
 # Ticket classification only
 @app.post("/api/v1/tickets/classify")
@@ -475,7 +787,7 @@ async def classify_ticket(
         }
         
     except Exception as e:
-        logger.error(f"Ticket classification failed: {str(e)}")
+        logger.error("Ticket classification failed: %s", e)
         # Return safe fallback instead of raw 500 where possible
         return {
             "classification": {
@@ -499,105 +811,111 @@ async def predict_priority(
     """
     Predict ticket priority and estimated resolution time
     """
-    try:
-        priority_info = await workflow.predict_priority(
-            title=request.title,
-            description=request.description,
-            requester_info=request.requester_info
-        )
-        
-        return priority_info
-        
-    except Exception as e:
-        logger.error(f"Priority prediction failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Priority prediction failed: {str(e)}")
+    priority_info = await workflow.predict_priority(
+        title=request.title,
+        description=request.description,
+        requester_info=request.requester_info
+    )
+    
+    return priority_info
 
 # Get ticket history
+def _encode_history_cursor(ticket: dict) -> str:
+    raw = orjson.dumps([str(ticket["created_at"]), ticket["ticket_id"]])
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_history_cursor(cursor: str) -> tuple:
+    try:
+        created_at, ticket_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), str(ticket_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
 @app.get("/api/v1/tickets/history")
 async def get_ticket_history(
-    limit: int = 50,
-    offset: int = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+    offset: Annotated[int, Query(ge=0)] = 0,
     category: Optional[str] = None,
     priority: Optional[str] = None,
     status: Optional[str] = None,
-    days: Optional[int] = None,
+    days: Annotated[Optional[int], Query(ge=1)] = None,
+    after: Optional[str] = None,
     db: TicketDatabase = Depends(get_database)
 ):
     """
     Get ticket history with filtering and pagination
+    Pass the returned `next_cursor` as `after` for keyset pagination (no OFFSET scan);
+    `offset` is still honoured when `after` is not given.
     """
-    try:
-        tickets, total_count = db.get_tickets(
-            limit=limit,
-            offset=offset,
-            category=category,
-            priority=priority,
-            status=status,
-            days=days
-        )
-        
-        return {
-            "tickets": tickets,
-            "total": total_count,
-            "limit": limit,
-            "offset": offset
-        }
-        
-    except Exception as e:
-        logger.error(f"Ticket history retrieval failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get ticket history: {str(e)}")
+    keyset = _decode_history_cursor(after) if after else None
+    tickets, total_count = await run_db(
+        db.get_tickets,
+        limit=limit,
+        offset=offset,
+        category=category,
+        priority=priority,
+        status=status,
+        days=days,
+        after=keyset
+    )
+    
+    return {
+        "tickets": tickets,
+        "total": total_count,
+        "limit": limit,
+        "offset": 0 if keyset else offset,
+        "next_cursor": _encode_history_cursor(tickets[-1]) if len(tickets) == limit else None
+    }
 
 
 # Bulk CSV template for upload
 @app.get("/api/v1/tickets/bulk-template")
 async def bulk_template():
     """Serve a CSV template with a few sample rows for bulk ticket upload."""
-    try:
-        headers = [
-            "title",
-            "description",
-            "requester_name",
-            "requester_email",
-            "requester_department",
-            "additional_context_json",
-        ]
-        samples = [
-            [
-                "Cannot connect to corporate WiFi",
-                "User reports WiFi authentication failure on office network.",
-                "Jane Doe",
-                "jane@example.com",
-                "Engineering",
-                "{\"location\": \"HQ-3F\", \"device\": \"Windows Laptop\"}",
-            ],
-            [
-                "Outlook crashes when opening attachments",
-                "Outlook app closes unexpectedly whenever user opens PDF attachments.",
-                "John Smith",
-                "john@example.com",
-                "Finance",
-                "{\"affected_app\": \"Outlook 365\"}",
-            ],
-        ]
-        # Build CSV string
-        import io
-        import csv
-        buf = io.StringIO()
-        writer = csv.writer(buf)
-        writer.writerow(headers)
-        for row in samples:
-            writer.writerow(row)
-        content = buf.getvalue()
-        return JSONResponse(
-            status_code=200,
-            content={
-                "filename": "ticketflow_bulk_template.csv",
-                "content": content,
-            },
-        )
-    except Exception as e:
-        logger.error(f"Template generation failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Template generation failed: {str(e)}")
+    headers = [
+        "title",
+        "description",
+        "requester_name",
+        "requester_email",
+        "requester_department",
+        "additional_context_json",
+    ]
+    samples = [
+        [
+            "Cannot connect to corporate WiFi",
+            "User reports WiFi authentication failure on office network.",
+            "Jane Doe",
+            "jane@example.com",
+            "Engineering",
+            "{\"location\": \"HQ-3F\", \"device\": \"Windows Laptop\"}",
+        ],
+        [
+            "Outlook crashes when opening attachments",
+            "Outlook app closes unexpectedly whenever user opens PDF attachments.",
+            "John Smith",
+            "john@example.com",
+            "Finance",
+            "{\"affected_app\": \"Outlook 365\"}",
+        ],
+    ]
+    # Build CSV string
+    import io
+    import csv
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(headers)
+    for row in samples:
+        writer.writerow(row)
+    content = buf.getvalue()
+    return ORJSONResponse(
+        status_code=200,
+        content={
+            "filename": "ticketflow_bulk_template.csv",
+            "content": content,
+        },
+    )
 
 # Get single ticket
 
@@ -609,21 +927,28 @@ async def get_ticket_details(
     """
     Get detailed information for a specific ticket
     """
-    try:
-        ticket = db.get_ticket(ticket_id)
-        
-        if not ticket:
-            raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
-        
-        return ticket
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Ticket retrieval failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get ticket: {str(e)}")
+    ticket = await run_db(db.get_ticket, ticket_id)
+    
+    if not ticket:
+        raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
+    
+    return ticket
 
 # Bulk ticket processing
+BULK_CHUNK_SIZE = 32
+
+async def _save_bulk_chunk(completed):
+    """Persist one window of bulk analyses with a single multi-row insert."""
+    if ticket_db is None:
+        return
+    records = [
+        _ticket_record(t.get("title", ""), t.get("description", ""), t.get("requester_info"), result)
+        for t, result in completed
+    ]
+    await run_db(ticket_db.create_tickets_bulk, records)
+    if response_cache:
+        await response_cache.clear(DASHBOARD_CACHE_NAMESPACE)
+
 @app.post("/api/v1/tickets/bulk-process")
 async def bulk_process_tickets(
     request: BulkTicketRequest,
@@ -633,50 +958,47 @@ async def bulk_process_tickets(
     """
     Process multiple tickets in batch
     """
-    try:
-        # Optional dry-run: validate ticket payloads without starting background job
-        if request.options and getattr(request.options, "dry_run", False):
-            total = len(request.tickets)
-            invalid = 0
-            errors = []
-            for idx, t in enumerate(request.tickets, start=1):
-                row_errors = []
-                title = (t.title or "").strip()
-                desc = (t.description or "").strip()
-                if not title:
-                    row_errors.append("title is required")
-                if not desc or len(desc) < 10:
-                    row_errors.append("description must be at least 10 characters")
-                if row_errors:
-                    invalid += 1
-                    errors.append({"row_index": idx, "errors": row_errors})
-            return {
-                "status": "validated",
-                "total_rows": total,
-                "valid_rows": total - invalid,
-                "invalid_rows": invalid,
-                "errors": errors,
-            }
-
-        # Start background processing
-        task_id = f"bulk_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-        
-        background_tasks.add_task(
-            workflow.process_bulk_tickets,
-            tickets=request.tickets,
-            task_id=task_id,
-            options=request.options
-        )
-        
+    # Optional dry-run: validate ticket payloads without starting background job
+    if request.options and getattr(request.options, "dry_run", False):
+        total = len(request.tickets)
+        invalid = 0
+        errors = []
+        for idx, t in enumerate(request.tickets, start=1):
+            row_errors = []
+            title = (t.title or "").strip()
+            desc = (t.description or "").strip()
+            if not title:
+                row_errors.append("title is required")
+            if not desc or len(desc) < 10:
+                row_errors.append("description must be at least 10 characters")
+            if row_errors:
+                invalid += 1
+                errors.append({"row_index": idx, "errors": row_errors})
         return {
-            "task_id": task_id,
-            "message": f"Started processing {len(request.tickets)} tickets",
-            "status": "processing"
+            "status": "validated",
+            "total_rows": total,
+            "valid_rows": total - invalid,
+            "invalid_rows": invalid,
+            "errors": errors,
         }
-        
-    except Exception as e:
-        logger.error(f"Bulk processing failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Bulk processing failed: {str(e)}")
+
+    # Start background processing
+    task_id = f"bulk_{time.time_ns() // 1_000_000}_{secrets.token_hex(3)}"
+    
+    background_tasks.add_task(
+        workflow.process_bulk_tickets,
+        tickets=request.tickets,
+        task_id=task_id,
+        options=request.options,
+        chunk_size=BULK_CHUNK_SIZE,
+        on_chunk=_save_bulk_chunk
+    )
+    
+    return {
+        "task_id": task_id,
+        "message": f"Started processing {len(request.tickets)} tickets",
+        "status": "processing"
+    }
 
 # Bulk CSV validation for upload
 @app.post("/api/v1/tickets/bulk-validate", response_model=BulkValidationResult)
@@ -688,7 +1010,6 @@ async def bulk_validate_csv(payload: BulkCsvRequest):
     """
     import csv
     import io
-    import json as pyjson
 
     required_headers = [
         "title",
@@ -742,12 +1063,6 @@ async def bulk_validate_csv(payload: BulkCsvRequest):
             if req.lower() not in header_lower:
                 missing.append(req)
 
-        errors = []
-        tickets = []
-        total_rows = 0
-        valid_rows = 0
-        invalid_rows = 0
-
         if missing and payload.has_headers:
             # Can't safely parse without required headers
             return {
@@ -772,7 +1087,6 @@ async def bulk_validate_csv(payload: BulkCsvRequest):
         idx_rname = col("requester_name")
         idx_remail = col("requester_email")
         idx_rdept = col("requester_department")
-        idx_rdept = col("requester_department")
         idx_ctx = col("additional_context_json")
 
         # Walk rows
@@ -780,42 +1094,54 @@ async def bulk_validate_csv(payload: BulkCsvRequest):
         if payload.limit:
             data_rows = data_rows[: payload.limit]
 
-        for i, row in enumerate(data_rows, start=1):
-            total_rows += 1
-            row_errors = []
-            # Safe get by index
-            def get_val(idx: int) -> str:
-                return (row[idx] if 0 <= idx < len(row) else "").strip()
+        # Validate column-wise: ragged rows are padded with None by the DataFrame
+        frame = pd.DataFrame(data_rows, dtype=object)
 
-            title = get_val(idx_title)
-            desc = get_val(idx_desc)
-            rname = get_val(idx_rname)
-            remail = get_val(idx_remail)
-            rdept = get_val(idx_rdept)
-            ctx_raw = get_val(idx_ctx)
+        def column(idx: int) -> pd.Series:
+            if 0 <= idx < frame.shape[1]:
+                return frame[idx].fillna("").str.strip()
+            return pd.Series("", index=frame.index, dtype=object)
 
-            if not title:
-                row_errors.append("title is required")
-            if not desc or len(desc) < 10:
-                row_errors.append("description must be at least 10 characters")
+        titles = column(idx_title)
+        descs = column(idx_desc)
+        rnames = column(idx_rname)
+        remails = column(idx_remail)
+        rdepts = column(idx_rdept)
+        ctx_raws = column(idx_ctx)
 
-            additional_context = None
-            if ctx_raw:
-                try:
-                    ctx_obj = pyjson.loads(ctx_raw)
-                    if not isinstance(ctx_obj, dict):
-                        row_errors.append("additional_context_json must be a JSON object")
-                    else:
-                        additional_context = ctx_obj
-                except Exception as e:
-                    row_errors.append(f"additional_context_json invalid JSON: {str(e)}")
+        missing_title = titles.eq("")
+        short_desc = descs.str.len().lt(10)
 
-            if row_errors:
-                invalid_rows += 1
-                errors.append({"row_index": i, "errors": row_errors})
+        # Only non-empty context cells need JSON parsing
+        contexts = {}
+        ctx_errors = {}
+        for pos, ctx_raw in ctx_raws[ctx_raws.ne("")].items():
+            try:
+                ctx_obj = orjson.loads(ctx_raw)
+            except orjson.JSONDecodeError as e:
+                ctx_errors[pos] = f"additional_context_json invalid JSON: {str(e)}"
                 continue
+            if not isinstance(ctx_obj, dict):
+                ctx_errors[pos] = "additional_context_json must be a JSON object"
+            else:
+                contexts[pos] = ctx_obj
+
+        invalid = missing_title | short_desc | frame.index.isin(list(ctx_errors))
 
-            tickets.append({
+        errors = []
+        for pos in invalid[invalid].index:
+            row_errors = []
+            if missing_title[pos]:
+                row_errors.append("title is required")
+            if short_desc[pos]:
+                row_errors.append("description must be at least 10 characters")
+            if pos in ctx_errors:
+                row_errors.append(ctx_errors[pos])
+            errors.append({"row_index": int(pos) + 1, "errors": row_errors})
+
+        valid = ~invalid
+        tickets = [
+            {
                 "title": title,
                 "description": desc,
                 "requester_info": {
@@ -823,9 +1149,17 @@ async def bulk_validate_csv(payload: BulkCsvRequest):
                     "email": remail or None,
                     "department": rdept or None,
                 },
-                "additional_context": additional_context,
-            })
-            valid_rows += 1
+                "additional_context": contexts.get(pos),
+            }
+            for pos, title, desc, rname, remail, rdept in zip(
+                frame.index[valid], titles[valid], descs[valid],
+                rnames[valid], remails[valid], rdepts[valid],
+            )
+        ]
+
+        total_rows = len(data_rows)
+        invalid_rows = len(errors)
+        valid_rows = len(tickets)
 
         return {
             "is_valid": invalid_rows == 0 and valid_rows > 0 and (not missing),
@@ -837,35 +1171,88 @@ async def bulk_validate_csv(payload: BulkCsvRequest):
             "tickets": tickets,
         }
     except Exception as e:
-        logger.error(f"Bulk CSV validation failed: {e}")
+        logger.error("Bulk CSV validation failed: %s", e)
         raise HTTPException(status_code=400, detail=f"CSV validation failed: {str(e)}")
 
 # Solution recommendations
-@app.post("/api/v1/solutions/recommend")
+# Identical KB queries within this window share one vector-DB round trip (single-flight).
+# Empty results are not cached: the knowledge service returns [] on backend errors too,
+# and an outage must not keep answering "nothing found" after it is over.
+KB_QUERY_CACHE_TTL_SECONDS = 60
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+def _use_semantic_cache(query_emb) -> bool:
+    return semantic_cache is not None and query_emb is not None
+
+@async_ttl_cache(ttl=KB_QUERY_CACHE_TTL_SECONDS, maxsize=1024, cache_if=bool)
+async def _cached_recommendations(knowledge: KnowledgeService, query: str, category, max_results: int, min_similarity: float):
+    """Exact-match layer in front of the semantic cache and the knowledge base."""
+    query_emb = await _embed_query(query)
+    scope = f"recommend:{category}:{max_results}:{min_similarity}"
+    recommendations = semantic_cache.lookup(query_emb, scope) if _use_semantic_cache(query_emb) else None
+    if recommendations is None:
+        recommendations = await knowledge.get_recommendations(
+            query=query,
+            category=category,
+            max_results=max_results,
+            min_similarity=min_similarity,
+            query_embedding=query_emb
+        )
+        if recommendations and _use_semantic_cache(query_emb):
+            semantic_cache.put(query_emb, recommendations, scope)
+    return recommendations
+
+@async_ttl_cache(ttl=KB_QUERY_CACHE_TTL_SECONDS, maxsize=1024, cache_if=bool)
+async def _cached_search(knowledge: KnowledgeService, query: str, category, limit: int):
+    """Exact-match layer in front of the semantic cache and the knowledge base."""
+    query_emb = await _embed_query(query)
+    scope = f"search:{category}:{limit}"
+    results = semantic_cache.lookup(query_emb, scope) if _use_semantic_cache(query_emb) else None
+    if results is None:
+        results = await knowledge.search(query=query, category=category, limit=limit, query_embedding=query_emb)
+        if results and _use_semantic_cache(query_emb):
+            semantic_cache.put(query_emb, results, scope)
+    return results
+
+def _clear_kb_query_caches() -> None:
+    """Drop cached KB query results after the knowledge base changes."""
+    _cached_recommendations.cache_clear()
+    _cached_search.cache_clear()
+    if semantic_cache:
+        semantic_cache.clear()
+
+@app.post("/api/v1/solutions/recommend", openapi_extra=json_body_openapi(SolutionRecommendationRequest))
 async def recommend_solutions(
-    request: SolutionRecommendationRequest,
-    knowledge: KnowledgeService = Depends(get_knowledge_service)
+    request: Annotated[SolutionRecommendationRequest, Depends(json_body(SolutionRecommendationRequest))],
+    knowledge: KnowledgeService = Depends(get_knowledge_service),
+    no_cache: bool = False
 ):
     """
     Get solution recommendations from knowledge base
+    
+    Repeated and near-duplicate queries are served from cache; pass no_cache=true to bypass it.
     """
-    try:
+    max_results = request.max_results or 5
+    min_similarity = request.min_similarity or 0.4
+    if no_cache:
         recommendations = await knowledge.get_recommendations(
             query=request.query,
             category=request.category,
-            max_results=request.max_results or 5,
-            min_similarity=request.min_similarity or 0.4
+            max_results=max_results,
+            min_similarity=min_similarity
         )
-        
-        return {
-            "recommendations": recommendations,
-            "query": request.query,
-            "total_results": len(recommendations)
-        }
-        
-    except Exception as e:
-        logger.error(f"Solution recommendation failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Recommendation failed: {str(e)}")
+    else:
+        recommendations = await _cached_recommendations(
+            knowledge, _normalize_query(request.query), request.category, max_results, min_similarity
+        )
+    
+    return {
+        "recommendations": recommendations,
+        "query": request.query,
+        "total_results": len(recommendations)
+    }
 
 # Knowledge base search
 @app.get("/api/v1/solutions/search")
@@ -873,105 +1260,108 @@ async def search_knowledge_base(
     q: str,
     category: Optional[str] = None,
     limit: int = 10,
-    knowledge: KnowledgeService = Depends(get_knowledge_service)
+    knowledge: KnowledgeService = Depends(get_knowledge_service),
+    no_cache: bool = False
 ):
     """
     Search the knowledge base
+    
+    Repeated and near-duplicate queries are served from cache; pass no_cache=true to bypass it.
     """
-    try:
-        results = await knowledge.search(
-            query=q,
-            category=category,
-            limit=limit
-        )
-        
-        return {
-            "results": results,
-            "query": q,
-            "total_results": len(results)
-        }
-        
-    except Exception as e:
-        logger.error(f"Knowledge base search failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    if no_cache:
+        results = await knowledge.search(query=q, category=category, limit=limit)
+    else:
+        results = await _cached_search(knowledge, _normalize_query(q), category, limit)
+    
+    return {
+        "results": results,
+        "query": q,
+        "total_results": len(results)
+    }
+
+async def _ingest_and_invalidate_cache(knowledge: KnowledgeService, **kwargs):
+    """Run knowledge ingestion, then drop cached search results that may now be outdated."""
+    ingested = await knowledge.ingest_knowledge(**kwargs)
+    _clear_kb_query_caches()
+    if response_cache:
+        await response_cache.clear(DASHBOARD_CACHE_NAMESPACE)
+    return ingested
 
 # Knowledge ingestion
-@app.post("/api/v1/knowledge/ingest")
+@app.post("/api/v1/knowledge/ingest", openapi_extra=json_body_openapi(KnowledgeIngestRequest))
 async def ingest_knowledge(
-    request: KnowledgeIngestRequest,
+    request: Annotated[KnowledgeIngestRequest, Depends(json_body(KnowledgeIngestRequest))],
     background_tasks: BackgroundTasks,
     knowledge: KnowledgeService = Depends(get_knowledge_service)
 ):
     """
     Ingest new knowledge into the system
     """
-    try:
-        task_id = f"ingest_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-        
-        background_tasks.add_task(
-            knowledge.ingest_knowledge,
-            source=request.source,
-            source_type=request.source_type,
-            metadata=request.metadata,
-            task_id=task_id
-        )
-        
-        return {
-            "task_id": task_id,
-            "message": "Knowledge ingestion started",
-            "status": "processing"
-        }
-        
-    except Exception as e:
-        logger.error(f"Knowledge ingestion failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
+    task_id = f"ingest_{time.time_ns() // 1_000_000}_{secrets.token_hex(3)}"
+    
+    background_tasks.add_task(
+        _ingest_and_invalidate_cache,
+        knowledge,
+        source=request.source,
+        source_type=request.source_type,
+        metadata=request.metadata,
+        task_id=task_id,
+        embedder=embedder
+    )
+    
+    return {
+        "task_id": task_id,
+        "message": "Knowledge ingestion started",
+        "status": "processing"
+    }
 
 
 
 # Analytics dashboard
+async def _build_dashboard_data(db: TicketDatabase, days: int) -> dict:
+    bundle = await run_db(db.get_dashboard_bundle, days=days)
+    metrics = bundle["metrics"]
+    refreshed_at = bundle["rollup_refreshed_at"]
+    
+    # Format response
+    data = {
+        "total_tickets": metrics["total_tickets"],
+        "avg_processing_time": metrics["avg_processing_time"],
+        "classification_accuracy": metrics["classification_accuracy"],
+        "knowledge_base_size": metrics["knowledge_base_size"],
+        "category_breakdown": bundle["category_stats"],
+        "priority_breakdown": bundle["priority_stats"],
+        "trend_data": bundle["trend_data"],
+        "recent_tickets": bundle["recent_tickets"]
+    }
+    return {"rollup_refreshed_at": refreshed_at.isoformat() if refreshed_at else None, "data": data}
+
 @app.get("/api/v1/analytics/dashboard")
 async def get_dashboard_data(
+    response: Response,
     days: int = 30,
     db: TicketDatabase = Depends(get_database)
 ):
     """
     Get dashboard analytics data from database
+    
+    Category, priority and trend breakdowns are read from the daily rollup table;
+    the X-Analytics-Max-Staleness header reports its age in seconds. Results are
+    cached per `days` for `dashboard_cache_ttl` seconds and shared by all clients.
     """
-    try:
-        # Get metrics from database
-        metrics = db.get_dashboard_metrics(days=days)
-        category_stats = db.get_category_stats(days=days)
-        priority_stats = db.get_priority_stats(days=days)
-        trend_data = db.get_trend_data(days=days)
-        
-        # Get recent tickets
-        recent_tickets, _ = db.get_tickets(limit=10, days=days)
-        
-        # Format response
-        return {
-            "total_tickets": metrics["total_tickets"],
-            "avg_processing_time": metrics["avg_processing_time"],
-            "classification_accuracy": metrics["classification_accuracy"],
-            "knowledge_base_size": metrics["knowledge_base_size"],
-            "category_breakdown": category_stats,
-            "priority_breakdown": priority_stats,
-            "trend_data": trend_data,
-            "recent_tickets": [
-                {
-                    "ticket_id": t["ticket_id"],
-                    "title": t["title"],
-                    "category": t["category"],
-                    "priority": t["priority"],
-                    "status": t["status"],
-                    "created_at": t["created_at"]
-                }
-                for t in recent_tickets
-            ]
-        }
-        
-    except Exception as e:
-        logger.error(f"Dashboard data retrieval failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Dashboard failed: {str(e)}")
+    if response_cache:
+        ttl = getattr(get_settings(), 'dashboard_cache_ttl', 30)
+        cached = await response_cache.get_or_compute(
+            DASHBOARD_CACHE_NAMESPACE, str(days), ttl, lambda: _build_dashboard_data(db, days)
+        )
+    else:
+        cached = await _build_dashboard_data(db, days)
+    
+    if cached["rollup_refreshed_at"] is not None:
+        refreshed_at = datetime.fromisoformat(cached["rollup_refreshed_at"]).replace(tzinfo=timezone.utc)
+        staleness = max((datetime.now(timezone.utc) - refreshed_at).total_seconds(), 0)
+        response.headers["X-Analytics-Max-Staleness"] = str(int(staleness))
+    return cached["data"]
 
 # Analytics reports
 @app.get("/api/v1/analytics/reports")
@@ -984,118 +1374,138 @@ async def generate_reports(
     """
     Generate analytical reports
     """
-    try:
-        report_data = await data_service.generate_report(
-            report_type=report_type,
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        return report_data
-        
-    except Exception as e:
-        logger.error(f"Report generation failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
+    report_data = await data_service.generate_report(
+        report_type=report_type,
+        start_date=start_date,
+        end_date=end_date
+    )
+    
+    return report_data
 
 # Analytics export (CSV)
+EXPORT_PAGE_SIZE = 500
+EXPORT_PRIORITY_COLUMNS = ["Critical", "High", "Medium", "Low"]
+EXPORT_TICKET_COLUMNS = ["ticket_id", "title", "category", "priority", "status", "created_at"]
+
+def _iter_export_frames(db: TicketDatabase, export_type: str, days: int):
+    """Yield the DataFrames making up an analytics export; tickets are paged from the DB."""
+    if export_type == "categories":
+        data = db.get_category_stats(days=days)
+        # Flatten the per-category priority counts into columns in one columnar pass
+        priorities = pd.DataFrame.from_records(
+            [row.get("priorities") or {} for row in data],
+            columns=EXPORT_PRIORITY_COLUMNS,
+        ).fillna(0).astype(int).rename(columns=str.lower)
+        yield pd.concat(
+            [pd.DataFrame(data, columns=["category", "count", "avg_resolution_hours"]), priorities],
+            axis=1,
+        )
+    elif export_type == "priorities":
+        data = db.get_priority_stats(days=days)
+        # Expand categories per priority as JSON string for simplicity
+        df = pd.DataFrame(data, columns=["priority", "count", "avg_resolution_hours", "categories"])
+        df = df.rename(columns={"categories": "categories_json"})
+        df["categories_json"] = df["categories_json"].map(lambda c: c or {})
+        yield df
+    elif export_type == "tickets":
+        # Export tickets basic info for the period, one keyset page at a time: each page
+        # seeks past the last (created_at, ticket_id) seen, so deep pages cost no more than the first
+        after = None
+        while True:
+            tickets, _ = db.get_tickets(
+                limit=EXPORT_PAGE_SIZE, days=days, columns=EXPORT_TICKET_COLUMNS,
+                after=after, count_total=False
+            )
+            yield pd.DataFrame(tickets, columns=EXPORT_TICKET_COLUMNS)
+            if len(tickets) < EXPORT_PAGE_SIZE:
+                break
+            after = (tickets[-1]["created_at"], tickets[-1]["ticket_id"])
+    else:
+        # trends (default)
+        data = db.get_trend_data(days=days)
+        df = pd.DataFrame(data, columns=["date", "count", "avg_resolution_hours"])
+        yield df.rename(columns={"count": "ticket_count"})
+
+def _iter_export_csv(frames):
+    """Serialize DataFrames to CSV chunks, reusing a single buffer."""
+    buf = io.StringIO()
+    for i, df in enumerate(frames):
+        df.to_csv(buf, index=False, header=(i == 0), lineterminator="\r\n")
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+
+class _TodayString:
+    """UTC date as YYYYMMDD, re-formatted at most once per TTL window."""
+
+    def __init__(self, ttl_seconds: int = 60):
+        self._ttl_ns = ttl_seconds * 1_000_000_000
+        self._value = (0, "")  # (expiry_ns, "YYYYMMDD")
+
+    def get_or_update(self) -> str:
+        expiry_ns, today = self._value
+        now_ns = time.monotonic_ns()
+        if now_ns > expiry_ns:
+            today = datetime.now(timezone.utc).strftime("%Y%m%d")
+            self._value = (now_ns + self._ttl_ns, today)
+        return today
+
+_TODAY_CACHE = _TodayString(ttl_seconds=60)
+
 @app.get("/api/v1/analytics/export")
 async def export_analytics(
     export_type: str = "trends",  # trends | categories | priorities | tickets
     days: int = 30,
+    format: str = "csv",  # csv | json
     db: TicketDatabase = Depends(get_database)
 ):
-    """Export analytics datasets as CSV in a JSON envelope.
+    """Export analytics datasets as CSV.
 
-    Returns: { filename, content } with CSV string content for client-side download.
+    Streams text/csv as an attachment by default. With format=json, returns the
+    legacy envelope { filename, content } with the CSV string content.
     """
-    try:
-        import io
-        import csv
-
-        buf = io.StringIO()
-        writer = csv.writer(buf)
-
-        export_type = (export_type or "").lower()
-        now_suffix = datetime.utcnow().strftime("%Y%m%d")
-
-        if export_type == "categories":
-            data = db.get_category_stats(days=days)
-            writer.writerow(["category", "count", "avg_resolution_hours", "critical", "high", "medium", "low"])
-            for row in data:
-                p = row.get("priorities", {})
-                writer.writerow([
-                    row.get("category"),
-                    row.get("count"),
-                    row.get("avg_resolution_hours"),
-                    p.get("Critical", 0), p.get("High", 0), p.get("Medium", 0), p.get("Low", 0)
-                ])
-            filename = f"analytics_categories_{now_suffix}.csv"
-        elif export_type == "priorities":
-            data = db.get_priority_stats(days=days)
-            # Expand categories per priority as JSON string for simplicity
-            writer.writerow(["priority", "count", "avg_resolution_hours", "categories_json"])
-            for row in data:
-                writer.writerow([
-                    row.get("priority"),
-                    row.get("count"),
-                    row.get("avg_resolution_hours"),
-                    (row.get("categories") or {}),
-                ])
-            filename = f"analytics_priorities_{now_suffix}.csv"
-        elif export_type == "tickets":
-            # Export recent tickets basic info for the period
-            tickets, _ = db.get_tickets(limit=1000, offset=0, days=days)
-            writer.writerow([
-                "ticket_id", "title", "category", "priority", "status", "created_at"
-            ])
-            for t in tickets:
-                writer.writerow([
-                    t.get("ticket_id"), t.get("title"), t.get("category"),
-                    t.get("priority"), t.get("status"), t.get("created_at"),
-                ])
-            filename = f"tickets_{now_suffix}.csv"
-        else:
-            # trends (default)
-            data = db.get_trend_data(days=days)
-            writer.writerow(["date", "ticket_count", "avg_resolution_hours"])
-            for row in data:
-                writer.writerow([row.get("date"), row.get("count"), row.get("avg_resolution_hours")])
-            filename = f"analytics_trends_{now_suffix}.csv"
-
-        content = buf.getvalue()
-        return JSONResponse(status_code=200, content={"filename": filename, "content": content})
-    except Exception as e:
-        logger.error(f"Analytics export failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+    export_type = (export_type or "").lower()
+    now_suffix = _TODAY_CACHE.get_or_update()
+    prefixes = {"categories": "analytics_categories", "priorities": "analytics_priorities", "tickets": "tickets"}
+    filename = f"{prefixes.get(export_type, 'analytics_trends')}_{now_suffix}.csv"
+
+    chunks = _iter_export_csv(_iter_export_frames(db, export_type, days))
+    if (format or "").lower() == "json":
+        content = await run_db("".join, chunks)
+        return ORJSONResponse(status_code=200, content={"filename": filename, "content": content})
+
+    return StreamingResponse(
+        chunks,
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 # Model management endpoints
+MODEL_STATUS_TTL_SECONDS = 5
+
+@async_ttl_cache(ttl=MODEL_STATUS_TTL_SECONDS)
+async def _probe_model_status():
+    """Model status shared by concurrent pollers for a few seconds."""
+    return await model_service.get_model_status()
+
 @app.get("/api/v1/models/status")
 async def get_model_status():
     """Get status of all AI models"""
-    try:
-        if not model_service:
-            raise HTTPException(status_code=503, detail="Model service not initialized")
-            
-        status = await model_service.get_model_status()
-        return status
+    if not model_service:
+        raise HTTPException(status_code=503, detail="Model service not initialized")
         
-    except Exception as e:
-        logger.error(f"Model status check failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Model status failed: {str(e)}")
+    status = await _probe_model_status()
+    return status
 
 @app.post("/api/v1/models/reload")
 async def reload_models():
     """Reload AI models"""
-    try:
-        if not model_service:
-            raise HTTPException(status_code=503, detail="Model service not initialized")
-            
-        await model_service.reload_models()
-        return {"message": "Models reloaded successfully"}
+    if not model_service:
+        raise HTTPException(status_code=503, detail="Model service not initialized")
         
-    except Exception as e:
-        logger.error(f"Model reload failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Model reload failed: {str(e)}")
+    await model_service.reload_models()
+    _probe_model_status.cache_clear()
+    return {"message": "Models reloaded successfully"}
 
 # Agent performance tracking endpoints
 @app.get("/api/v1/agents/performance")
@@ -1104,13 +1514,9 @@ async def get_agent_performance(
     db: TicketDatabase = Depends(get_database)
 ):
     """Get performance statistics for all agents from database"""
-    try:
-        return db.get_agent_performance(days=days)
-    except Exception as e:
-        logger.error(f"Performance stats retrieval failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get performance stats: {str(e)}")
+    return await run_db(db.get_agent_performance, days=days)
 
-@app.post("/api/v1/agents/feedback")
+@app.post("/api/v1/agents/feedback", status_code=202)
 async def log_agent_feedback(
     ticket_id: str,
     agent: str,
@@ -1118,44 +1524,69 @@ async def log_agent_feedback(
     feedback_source: str = "user",
     db: TicketDatabase = Depends(get_database)
 ):
-    """Log feedback for agent performance tracking (for ROI/accuracy measurement)"""
-    try:
-        db.log_agent_feedback(
+    """Log feedback for agent performance tracking (for ROI/accuracy measurement)
+    
+    Feedback is queued and written in batches by a background worker, so 202 means
+    accepted, not yet stored; a full queue (writes falling behind) answers 503.
+    """
+    if feedback_queue is not None:
+        try:
+            feedback_queue.put_nowait((ticket_id, agent, actual, feedback_source))
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Feedback queue is full, retry later")
+    else:
+        await run_db(
+            db.log_agent_feedback,
             ticket_id=ticket_id,
             agent_name=agent,
             actual_value=actual,
             feedback_source=feedback_source
         )
-        return {
-            "message": "Feedback logged successfully",
-            "ticket_id": ticket_id,
-            "agent": agent
-        }
-    except Exception as e:
-        logger.error(f"Feedback logging failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to log feedback: {str(e)}")
+    return {
+        "message": "Feedback accepted",
+        "ticket_id": ticket_id,
+        "agent": agent
+    }
 
 # Human review endpoint for low-confidence tickets
 @app.get("/api/v1/review/{ticket_id}")
 async def get_ticket_review(ticket_id: str):
     """Get draft analysis for human review (HITL)"""
-    try:
-        # In production, this would fetch from a database
-        return {
-            "ticket_id": ticket_id,
-            "status": "needs_review",
-            "message": "This ticket has been flagged for human review due to low confidence scores",
-            "review_url": f"/api/v1/review/{ticket_id}/submit"
-        }
-    except Exception as e:
-        logger.error(f"Review retrieval failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve review: {str(e)}")
+    # In production, this would fetch from a database
+    return {
+        "ticket_id": ticket_id,
+        "status": "needs_review",
+        "message": "This ticket has been flagged for human review due to low confidence scores",
+        "review_url": f"/api/v1/review/{ticket_id}/submit"
+    }
+
+# Let browsers reuse polled read-only responses for as long as the server-side caches would
+app.add_middleware(
+    CacheControlMiddleware,
+    max_age_by_path={
+        "/": 300,
+        "/api/v1/models/status": MODEL_STATUS_TTL_SECONDS,
+        "/api/v1/analytics/dashboard": get_settings().dashboard_cache_ttl,
+        "/api/v1/knowledge/ledger": LEDGER_STATS_TTL_SECONDS,
+    },
+    skip_if_query_contains=[("/api/v1/knowledge/ledger", b"include_entries")],
+)
 
 if __name__ == "__main__":
+    import importlib.util
+
+    settings = get_settings()
+    # DEBUG: single auto-reloading process. Otherwise: WORKERS processes, each running
+    # its own lifespan (services, DB handles and caches are per worker).
+    dev_mode = settings.api_debug
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
+        host=settings.host,
+        port=settings.port,
+        reload=dev_mode,
+        workers=1 if dev_mode else max(1, settings.workers),
+        # uvloop/httptools ship with uvicorn[standard]; uvloop is unavailable on Windows
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
         log_level="info"
     )
\ No newline at end of file
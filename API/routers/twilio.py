@@ -1,9 +1,16 @@
+import importlib.util
 import os
+import re
 import logging
 import asyncio
-from fastapi import APIRouter, Request, Response, BackgroundTasks
+from functools import lru_cache
+import httpx
+from typing import List
+from pydantic import TypeAdapter
+from fastapi import APIRouter, Request, Response
 from twilio.twiml.voice_response import VoiceResponse, Gather
 from core.config import get_settings
+from utils.call_sessions import CallSessionStore
 from google import genai
 from google.genai import types
 
@@ -11,35 +18,98 @@ from google.genai import types
 router = APIRouter(prefix="/api/v1/twilio", tags=["twilio"])
 logger = logging.getLogger(__name__)
 
-# In-memory session storage
-sessions = {}
+# Call history per CallSid: in-process by default, shared through Redis when the app attaches
+# a client (see main.lifespan), so every worker can serve every turn of a call
+_settings = get_settings()
+_history_adapter = TypeAdapter(List[types.Content])
+sessions = CallSessionStore(
+    maxsize=_settings.twilio_session_max,
+    ttl=_settings.twilio_session_ttl,
+    encode=lambda history: _history_adapter.dump_json(history, exclude_none=True),
+    decode=_history_adapter.validate_json,
+)
+MAX_HISTORY_TURNS = _settings.twilio_max_history_turns
 
-# Reusable Gemini client (connection pooling)
-_gemini_client = None
+def _trim_history(history):
+    """Once over MAX_HISTORY_TURNS contents, keep the latest half, starting at a spoken user turn.
 
-async def get_gemini_client():
-    global _gemini_client
-    if _gemini_client is None:
-        settings = get_settings()
-        if not settings.gemini_api_key:
-            raise ValueError("GEMINI_API_KEY not set")
-        _gemini_client = genai.Client(
-            api_key=settings.gemini_api_key, 
-            http_options={"api_version": "v1alpha"}
+    Trimming by half rather than one turn at a time keeps the prompt prefix identical for
+    the following turns, so Gemini's implicit prefix caching can keep hitting. The cut
+    moves back to the nearest spoken user turn: a kept window must not open on a model
+    turn or a tool result, whose function call would have been dropped.
+    """
+    if len(history) <= MAX_HISTORY_TURNS:
+        return history
+    start = len(history) - max(MAX_HISTORY_TURNS // 2, 1)
+    while start > 0 and not (
+        history[start].role == "user" and any(part.text for part in history[start].parts or [])
+    ):
+        start -= 1
+    return history[start:]
+
+# Reusable Gemini client (connection pooling); lru_cache builds it once, errors are not cached
+_gemini_http_client = None  # our HTTP/2 transport, which genai leaves to its owner to close
+
+@lru_cache(maxsize=1)
+def _gemini_client_sync():
+    global _gemini_http_client
+    settings = get_settings()
+    if not settings.gemini_api_key:
+        raise ValueError("GEMINI_API_KEY not set")
+    http_options = {"api_version": "v1alpha"}
+    if importlib.util.find_spec("h2") is not None:
+        # One long-lived HTTP/2 connection multiplexes a call's concurrent tool round trips,
+        # and later voice turns skip the TCP/TLS handshake
+        _gemini_http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60),
         )
-    return _gemini_client
+        http_options["httpx_async_client"] = _gemini_http_client
+    return genai.Client(
+        api_key=settings.gemini_api_key, 
+        http_options=http_options
+    )
+
+async def get_gemini_client():
+    return _gemini_client_sync()
+
+def init_gemini_client() -> None:
+    """Build the shared client at app startup so the first voice turn does not pay for it."""
+    try:
+        _gemini_client_sync()
+    except ValueError as e:
+        logger.warning("Gemini voice assistant unavailable: %s", e)
+
+async def close_gemini_client() -> None:
+    """Close the shared client's connections on shutdown (a no-op if it was never built)."""
+    global _gemini_http_client
+    if _gemini_client_sync.cache_info().currsize == 0:
+        return
+    client = _gemini_client_sync()
+    _gemini_client_sync.cache_clear()
+    await client.aio.aclose()
+    if _gemini_http_client is not None:
+        await _gemini_http_client.aclose()
+        _gemini_http_client = None
 
 # --- Tool Definitions (with timeouts) ---
 
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+
+def _spoken_query_key(query: str) -> str:
+    """Transcripts of the same question differ in case and punctuation; the (uncased) embedder ignores both."""
+    return " ".join(_PUNCTUATION_RE.sub(" ", query.lower().replace("'", "").replace("\u2019", "")).split())
+
 async def search_knowledge_base(query: str):
     """Search the IT knowledge base for solutions."""
-    logger.info(f"Tool Call: search_knowledge_base('{query}')")
+    logger.info("Tool Call: search_knowledge_base('%s')", query)
     try:
         # Add timeout to prevent hanging
         async with asyncio.timeout(3):  # 3 second timeout
-            from main import get_knowledge_service
+            from main import get_knowledge_service, _cached_search
             knowledge_service = await get_knowledge_service()
-            results = await knowledge_service.search(query, limit=2)  # Reduced to 2 results
+            # Shares the API's KB query caches (exact + semantic), which ingestion invalidates
+            results = await _cached_search(knowledge_service, _spoken_query_key(query), None, 2)  # Reduced to 2 results
             if not results:
                 return "No relevant information found."
             
@@ -52,15 +122,15 @@ async def search_knowledge_base(query: str):
         logger.error("search_knowledge_base timed out")
         return "Search timed out. Please try again."
     except Exception as e:
-        logger.error(f"Error in search_knowledge_base: {e}")
+        logger.error("Error in search_knowledge_base: %s", e)
         return "Search error occurred."
 
 async def create_ticket(title: str, description: str, category: str = "General Support"):
     """Create a new IT support ticket."""
-    logger.info(f"Tool Call: create_ticket('{title}')")
+    logger.info("Tool Call: create_ticket('%s')", title)
     try:
         async with asyncio.timeout(2):  # 2 second timeout
-            from main import get_database
+            from main import get_database, run_db
             db = get_database()
             
             ticket_data = {
@@ -72,13 +142,14 @@ async def create_ticket(title: str, description: str, category: str = "General S
                 "requester_name": "Voice Caller",
                 "source": "phone"
             }
-            ticket_id = db.create_ticket(ticket_data)
+            # In a worker thread, so the insert doesn't block the event loop and the timeout can fire
+            ticket_id = await run_db(db.create_ticket, ticket_data)
             return f"Ticket {ticket_id} created."
     except asyncio.TimeoutError:
         logger.error("create_ticket timed out")
         return "Ticket creation timed out."
     except Exception as e:
-        logger.error(f"Error in create_ticket: {e}")
+        logger.error("Error in create_ticket: %s", e)
         return "Ticket creation failed."
 
 # Gemini Tool Schema
@@ -109,6 +180,140 @@ tools_def = [types.Tool(function_declarations=[
     )
 ])]
 
+# Phrases that end the call; one case-insensitive pass over the transcript, whole words only
+_GOODBYE_RE = re.compile(r"\b(?:goodbye|bye|thank you thanks|that's all|done)\b", re.IGNORECASE)
+
+# Chat model and config shared by every voice turn (built and validated once).
+# Optimized config: lower max_tokens, higher temperature for faster responses
+GEMINI_VOICE_MODEL = "models/gemini-2.5-flash-lite"  # Faster model
+GEMINI_VOICE_CONFIG = types.GenerateContentConfig(
+    tools=tools_def,
+    system_instruction="You are an IT Support AI. Respond in 1-2 short sentences suitable for voice. Be direct and helpful. Use tools only when absolutely necessary.",
+    temperature=0.5,  # Slightly higher for faster generation
+    max_output_tokens=150,  # Reduced token limit
+    candidate_count=1
+)
+
+# Tool name -> coroutine factory taking the call's args
+TOOLS = {
+    "search_knowledge_base": lambda args: search_knowledge_base(args.get("query", "")),
+    "create_ticket": lambda args: create_ticket(
+        args.get("title", ""),
+        args.get("description", ""),
+        args.get("category", "General Support")
+    ),
+}
+
+async def execute_tool(fc):
+    """Run one Gemini function call and wrap its result as a function-response part.
+
+    Never raises: the model needs a response for every call it made, so an unknown
+    tool or a failure comes back as {"error": ...} and does not cancel sibling calls.
+    """
+    logger.info("Executing Tool: %s", fc.name)
+    tool = TOOLS.get(fc.name)
+    if tool is None:
+        response = {"error": f"Unknown tool {fc.name}"}
+    else:
+        try:
+            response = {"result": await tool(fc.args or {})}
+        except Exception as e:
+            logger.error("Tool %s failed: %s", fc.name, e)
+            response = {"error": "The tool failed."}
+    return types.Part(
+        function_response=types.FunctionResponse(
+            name=fc.name,
+            id=fc.id,
+            response=response
+        )
+    )
+
+# --- Streaming replies ---
+
+# Replies are meant to be 1-2 sentences; generation is abandoned once this many have arrived
+MAX_SPOKEN_SENTENCES = 2
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+async def _stream_reply(chat, message):
+    """Send `message` with send_message_stream; return (function_calls, sentences, complete).
+
+    Text is split into sentences as chunks arrive, and the stream is closed as soon as
+    MAX_SPOKEN_SENTENCES are complete instead of waiting for the whole generation.
+    `complete` is False when it was cut short that way (the chat then does not record
+    the turn in its history).
+    """
+    function_calls, sentences, text = [], [], ""
+    stream = await chat.send_message_stream(message)
+    async for chunk in stream:
+        if not chunk.candidates or not chunk.candidates[0].content:
+            continue
+        for part in chunk.candidates[0].content.parts or []:
+            if part.function_call:
+                function_calls.append(part.function_call)
+            elif part.text:
+                text += part.text
+        if function_calls:
+            continue
+        *finished, text = _SENTENCE_END_RE.split(text)
+        sentences.extend(s.strip() for s in finished if s.strip())
+        if len(sentences) >= MAX_SPOKEN_SENTENCES:
+            await stream.aclose()
+            return function_calls, sentences[:MAX_SPOKEN_SENTENCES], False
+    if text.strip():
+        sentences.append(text.strip())
+    return function_calls, sentences, True
+
+# --- TwiML ---
+
+VOICE = "Polly.Joanna"
+LANGUAGE = "en-US"
+
+def _gather() -> Gather:
+    return Gather(
+        input="speech", 
+        action="/api/v1/twilio/process_speech", 
+        speechTimeout="auto",
+        speechModel="phone_call",
+        enhanced=True,
+        language=LANGUAGE
+    )
+
+def _say_and_gather(text: str) -> bytes:
+    response = VoiceResponse()
+    response.say(text, voice=VOICE, language=LANGUAGE)
+    response.append(_gather())
+    return str(response).encode()
+
+def _build_greeting() -> bytes:
+    response = VoiceResponse()
+    response.say("Hello! I'm your IT support assistant. How can I help?", voice=VOICE, language=LANGUAGE)
+    response.append(_gather())
+    response.redirect("/api/v1/twilio/voice")
+    return str(response).encode()
+
+def _build_session_error() -> bytes:
+    response = VoiceResponse()
+    response.say("Session error. Let's start over.", voice=VOICE, language=LANGUAGE)
+    response.redirect("/api/v1/twilio/voice")
+    return str(response).encode()
+
+def _build_goodbye() -> bytes:
+    response = VoiceResponse()
+    response.say("Thank you for contacting IT support. Goodbye!", voice=VOICE, language=LANGUAGE)
+    response.hangup()
+    return str(response).encode()
+
+# Static prompts are rendered once at import; only model replies are built per turn
+GREETING_XML = _build_greeting()
+SESSION_ERROR_XML = _build_session_error()
+GOODBYE_XML = _build_goodbye()
+PROMPT_REPEAT_XML = _say_and_gather("I didn't catch that. Please repeat.")
+PROMPT_TIMEOUT_XML = _say_and_gather("Sorry, that's taking too long. Please try a simpler question.")
+PROMPT_ERROR_XML = _say_and_gather("I encountered an error. Please try again.")
+
+def _twiml(content: bytes) -> Response:
+    return Response(content=content, media_type="application/xml")
+
 # --- Endpoints ---
 
 @router.post("/voice")
@@ -117,206 +322,107 @@ async def voice_webhook(request: Request):
     form = await request.form()
     call_sid = form.get("CallSid")
     
-    logger.info(f"New call received: {call_sid}")
+    logger.info("New call received: %s", call_sid)
     
     # Initialize session
-    sessions[call_sid] = {"history": []}
-    
-    response = VoiceResponse()
-    response.say("Hello! I'm your IT support assistant. How can I help?", voice="Polly.Joanna", language="en-US")
-    
-    gather = Gather(
-        input="speech", 
-        action="/api/v1/twilio/process_speech", 
-        speechTimeout="auto",
-        speechModel="phone_call",
-        enhanced=True,
-        language="en-US"
-    )
-    response.append(gather)
-    
-    response.redirect("/api/v1/twilio/voice")
+    await sessions.set(call_sid, [])
     
-    return Response(content=str(response), media_type="application/xml")
+    return _twiml(GREETING_XML)
 
 @router.post("/process_speech")
-async def process_speech(request: Request, background_tasks: BackgroundTasks):
+async def process_speech(request: Request):
     """Process speech input from Twilio <Gather>."""
     form = await request.form()
     call_sid = form.get("CallSid")
     speech_result = form.get("SpeechResult")
     
-    logger.info(f"Processing speech for {call_sid}: {speech_result}")
-    
-    # Quick validation
-    if not call_sid or call_sid not in sessions:
-        response = VoiceResponse()
-        response.say("Session error. Let's start over.", voice="Polly.Joanna", language="en-US")
-        response.redirect("/api/v1/twilio/voice")
-        return Response(content=str(response), media_type="application/xml")
+    logger.info("Processing speech for %s: %s", call_sid, speech_result)
     
-    session = sessions[call_sid]
+    # Quick validation (reading the session also restarts its TTL)
+    history = await sessions.get(call_sid) if call_sid else None
+    if history is None:
+        return _twiml(SESSION_ERROR_XML)
     
     if not speech_result:
-        response = VoiceResponse()
-        response.say("I didn't catch that. Please repeat.", voice="Polly.Joanna", language="en-US")
-        gather = Gather(
-            input="speech", 
-            action="/api/v1/twilio/process_speech", 
-            speechTimeout="auto",
-            speechModel="phone_call",
-            enhanced=True,
-            language="en-US"
-        )
-        response.append(gather)
-        return Response(content=str(response), media_type="application/xml")
+        return _twiml(PROMPT_REPEAT_XML)
     
     # Check for goodbye immediately (skip AI processing)
-    if any(word in speech_result.lower() for word in ["goodbye", "bye", "thank you thanks", "that's all", "done"]):
-        response = VoiceResponse()
-        response.say("Thank you for contacting IT support. Goodbye!", voice="Polly.Joanna", language="en-US")
-        response.hangup()
-        # Clean up session in background
-        background_tasks.add_task(lambda: sessions.pop(call_sid, None))
-        return Response(content=str(response), media_type="application/xml")
+    if _GOODBYE_RE.search(speech_result):
+        await sessions.delete(call_sid)
+        return _twiml(GOODBYE_XML)
     
     # Call Gemini with overall timeout
     try:
         async with asyncio.timeout(8):  # 8 second total timeout
             client = await get_gemini_client()
             
-            # Optimized config: lower max_tokens, higher temperature for faster responses
             chat = client.aio.chats.create(
-                model="models/gemini-2.5-flash-lite",  # Faster model
-                config=types.GenerateContentConfig(
-                    tools=tools_def,
-                    system_instruction="You are an IT Support AI. Respond in 1-2 short sentences suitable for voice. Be direct and helpful. Use tools only when absolutely necessary.",
-                    temperature=0.5,  # Slightly higher for faster generation
-                    max_output_tokens=150,  # Reduced token limit
-                    candidate_count=1
-                ),
-                history=session.get("history", [])
+                model=GEMINI_VOICE_MODEL,
+                # Shallow copy (no re-validation): the SDK writes usage headers into the config it is given
+                config=GEMINI_VOICE_CONFIG.model_copy(),
+                history=history
             )
             
-            # Send user message
-            response_content = await chat.send_message(speech_result)
-            
-            # Handle Tool Calls (with limit)
-            current_response = response_content
-            model_response_text = ""
+            # Stream each reply; tool calls are answered and the result streamed in turn
+            message = speech_result
+            sentences, complete = [], True
             tool_call_count = 0
             max_tool_calls = 2  # Limit tool calls to prevent long chains
             
-            while tool_call_count < max_tool_calls:
-                if not current_response.candidates:
+            while True:
+                function_calls, sentences, complete = await _stream_reply(chat, message)
+                if not function_calls:
                     break
-                
-                parts = current_response.candidates[0].content.parts
-                function_calls = [p.function_call for p in parts if p.function_call]
-                
-                if function_calls:
-                    tool_call_count += 1
-                    
-                    # Execute tools in parallel for speed
-                    async def execute_tool(fc):
-                        name = fc.name
-                        args = fc.args
-                        logger.info(f"Executing Tool: {name}")
-                        
-                        result = None
-                        if name == "search_knowledge_base":
-                            result = await search_knowledge_base(args.get("query", ""))
-                        elif name == "create_ticket":
-                            result = await create_ticket(
-                                args.get("title", ""), 
-                                args.get("description", ""), 
-                                args.get("category", "General Support")
-                            )
-                        
-                        return types.Part(
-                            function_response=types.FunctionResponse(
-                                name=name,
-                                id=fc.id,
-                                response={"result": result}
-                            )
-                        )
-                    
-                    # Run all tool calls in parallel
-                    function_responses = await asyncio.gather(
-                        *[execute_tool(fc) for fc in function_calls],
-                        return_exceptions=True
-                    )
-                    
-                    # Filter out exceptions
-                    valid_responses = [r for r in function_responses if not isinstance(r, Exception)]
-                    
-                    if valid_responses:
-                        current_response = await chat.send_message(valid_responses)
-                    else:
-                        model_response_text = "I encountered an error processing your request."
-                        break
-                else:
-                    # No function calls, extract text
-                    model_response_text = "".join([p.text for p in parts if p.text]).strip()
+                if tool_call_count >= max_tool_calls:
+                    sentences = []
                     break
+                tool_call_count += 1
+                
+                # Run all tool calls in parallel (latency = slowest call); execute_tool reports
+                # failures as error responses, so every call gets its answer
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [tg.create_task(execute_tool(fc)) for fc in function_calls]
+                message = [t.result() for t in tasks]
             
-            # Update session history in background
-            background_tasks.add_task(lambda: session.update({"history": chat._curated_history}))
+            # Save the history for the next turn (which may be served by another worker)
+            history = chat.get_history(curated=True)
+            if not complete and sentences:
+                # The chat does not record a stream that was cut short; keep the turn as spoken
+                user_parts = [types.Part(text=message)] if isinstance(message, str) else message
+                history = [
+                    *history,
+                    types.Content(role="user", parts=user_parts),
+                    types.Content(role="model", parts=[types.Part(text=" ".join(sentences))]),
+                ]
+            await sessions.set(call_sid, _trim_history(history))
             
             # Fallback response
-            if not model_response_text:
-                model_response_text = "I'm not sure. Could you rephrase that?"
+            if not sentences:
+                sentences = ["I'm not sure. Could you rephrase that?"]
+            model_response_text = " ".join(sentences)
             
-            logger.info(f"Response: {model_response_text}")
+            logger.info("Response: %s", model_response_text)
             
+            # One <Say> per sentence, so text-to-speech can start on the first one
             response = VoiceResponse()
-            response.say(model_response_text, voice="Polly.Joanna", language="en-US")
+            for sentence in sentences:
+                response.say(sentence, voice=VOICE, language=LANGUAGE)
             
             # Continue conversation
-            gather = Gather(
-                input="speech", 
-                action="/api/v1/twilio/process_speech", 
-                speechTimeout="auto",
-                speechModel="phone_call",
-                enhanced=True,
-                language="en-US"
-            )
-            response.append(gather)
+            response.append(_gather())
             
             # Timeout fallback
-            response.say("Anything else?", voice="Polly.Joanna", language="en-US")
+            response.say("Anything else?", voice=VOICE, language=LANGUAGE)
             
-            return Response(content=str(response), media_type="application/xml")
+            return _twiml(str(response).encode())
     
     except asyncio.TimeoutError:
-        logger.error(f"Overall timeout for {call_sid}")
-        response = VoiceResponse()
-        response.say("Sorry, that's taking too long. Please try a simpler question.", voice="Polly.Joanna", language="en-US")
-        gather = Gather(
-            input="speech", 
-            action="/api/v1/twilio/process_speech", 
-            speechTimeout="auto",
-            speechModel="phone_call",
-            enhanced=True,
-            language="en-US"
-        )
-        response.append(gather)
-        return Response(content=str(response), media_type="application/xml")
+        logger.error("Overall timeout for %s", call_sid)
+        return _twiml(PROMPT_TIMEOUT_XML)
         
     except Exception as e:
-        logger.error(f"Error in process_speech: {e}", exc_info=True)
-        response = VoiceResponse()
-        response.say("I encountered an error. Please try again.", voice="Polly.Joanna", language="en-US")
-        gather = Gather(
-            input="speech", 
-            action="/api/v1/twilio/process_speech", 
-            speechTimeout="auto",
-            speechModel="phone_call",
-            enhanced=True,
-            language="en-US"
-        )
-        response.append(gather)
-        return Response(content=str(response), media_type="application/xml")
+        logger.error("Error in process_speech: %s", e, exc_info=True)
+        return _twiml(PROMPT_ERROR_XML)
 
 @router.get("/health")
 async def health_check():
@@ -324,6 +430,6 @@ async def health_check():
     settings = get_settings()
     return {
         "status": "healthy",
-        "active_sessions": len(sessions),
+        "active_sessions": await sessions.count(),
         "gemini_configured": bool(settings.gemini_api_key)
     }
\ No newline at end of file
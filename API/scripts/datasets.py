@@ -24,19 +24,35 @@ import os
 import importlib
 import importlib.util
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import mimetypes
 import re
 import hashlib
 import inspect
+import io
+from functools import lru_cache
+
+try:
+    from blake3 import blake3 as _content_hasher  # type: ignore  # SIMD-accelerated, much faster on large files
+except ImportError:
+    _content_hasher = hashlib.sha256
 
 # Optional deps used for extraction
 from bs4 import BeautifulSoup  # type: ignore
+try:
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore  # C (lexbor) parser, far faster than bs4
+except ImportError:
+    LexborHTMLParser = None
 from pypdf import PdfReader  # type: ignore
+try:
+    import pymupdf  # type: ignore  # MuPDF (C) text extraction, much faster than pypdf
+except ImportError:
+    pymupdf = None
 from docx import Document  # type: ignore
 import pandas as pd
 import requests
+import httpx
 
 # Embeddings
 from sentence_transformers import SentenceTransformer
@@ -46,7 +62,9 @@ import numpy as np
 from core.config import get_settings
 from services.knowledge_service import KnowledgeService
 from utils.logger import setup_logger
+from utils import event_loop
 from utils.ledger import JSONLedger
+from utils.ledger_sqlite import SqliteLedger
 
 logger = setup_logger(__name__)
 
@@ -107,66 +125,175 @@ def download_kaggle_dataset(dataset_id: str, dest_dir: Path) -> None:
     logger.info(f"Kaggle dataset saved to {dest_dir}")
 
 
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# Keep-alive connection pool reused by every synchronous download_url call
+_HTTP = requests.Session()
+
+
 def download_url(url: str, dest_dir: Path, filename: Optional[str] = None) -> Path:
     ensure_dir(dest_dir)
     logger.info(f"Downloading: {url}")
-    resp = requests.get(url, timeout=60)
-    resp.raise_for_status()
+    # Streamed to disk in DOWNLOAD_CHUNK_SIZE pieces, so large files are never held in memory
+    with _HTTP.get(url, timeout=60, stream=True) as resp:
+        resp.raise_for_status()
+        path = _download_path(url, dest_dir, resp.headers.get("content-type", ""), filename)
+        try:
+            with open(path, "wb") as f:
+                for chunk in resp.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+
+    logger.info(f"Saved to: {path}")
+    return path
+
 
-    # Determine filename
+# Concurrent downloads per CLI run; one pooled HTTP client is shared by all of them
+MAX_PARALLEL_DOWNLOADS = 8
+
+
+def _download_path(url: str, dest_dir: Path, content_type: str, filename: Optional[str] = None) -> Path:
     fname = filename or guess_filename_from_url(url)
-    content_type = resp.headers.get("content-type", "")
     if not Path(fname).suffix:
         ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
         if ext and not fname.endswith(ext):
             fname = fname + ext
-    path = dest_dir / safe_filename(fname)
-
-    with open(path, "wb") as f:
-        f.write(resp.content)
-
+    return dest_dir / safe_filename(fname)
+
+
+async def download_url_async(
+    client: httpx.AsyncClient, url: str, dest_dir: Path, semaphore: asyncio.Semaphore, filename: Optional[str] = None
+) -> Path:
+    """Async counterpart of download_url; at most `semaphore`'s value run at once."""
+    async with semaphore:
+        logger.info(f"Downloading: {url}")
+        async with client.stream("GET", url) as resp:
+            resp.raise_for_status()
+            path = _download_path(url, dest_dir, resp.headers.get("content-type", ""), filename)
+            f = await asyncio.to_thread(open, path, "wb")
+            try:
+                async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    await asyncio.to_thread(f.write, chunk)
+            except BaseException:
+                f.close()
+                path.unlink(missing_ok=True)
+                raise
+            await asyncio.to_thread(f.close)
     logger.info(f"Saved to: {path}")
     return path
 
 
+async def download_urls(urls: List[str], dest_dir: Path) -> List[Path]:
+    """Download `urls` concurrently into `dest_dir`; failures are logged and skipped."""
+    ensure_dir(dest_dir)
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_DOWNLOADS)
+    http2 = importlib.util.find_spec("h2") is not None
+    async with httpx.AsyncClient(
+        http2=http2, timeout=60, follow_redirects=True, limits=httpx.Limits(max_connections=20)
+    ) as client:
+        results = await asyncio.gather(
+            *(download_url_async(client, u, dest_dir, semaphore) for u in urls), return_exceptions=True
+        )
+    paths = []
+    for u, result in zip(urls, results):
+        if isinstance(result, BaseException):
+            logger.error(f"URL download failed for {u}: {result}")
+        else:
+            paths.append(result)
+    return paths
+
+
 # -------------------------
 # Text extraction
 # -------------------------
 
-def extract_text_from_file(path: Path, max_chars: int = 200_000) -> str:
+# bs4 backend when selectolax is not installed: lxml's C parser if available
+_BS4_HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+
+def _html_to_text(html: str) -> str:
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(["script", "style", "noscript"])
+        return tree.text(separator=" ")
+    return BeautifulSoup(html, _BS4_HTML_PARSER).get_text(separator=" ")
+
+
+def _pdf_to_text(path: Path, data: Optional[bytes], max_chars: int) -> str:
+    """Page texts joined by newlines; pages past max_chars are not extracted at all."""
+    chunks, size = [], 0
+    if pymupdf is not None:
+        with (pymupdf.open(stream=data, filetype="pdf") if data is not None else pymupdf.open(path)) as doc:
+            for page in doc:
+                chunks.append(page.get_text("text"))
+                size += len(chunks[-1]) + 1
+                if size >= max_chars:
+                    break
+    else:
+        reader = PdfReader(io.BytesIO(data) if data is not None else path)
+        for page in reader.pages:
+            chunks.append(page.extract_text() or "")
+            size += len(chunks[-1]) + 1
+            if size >= max_chars:
+                break
+    return "\n".join(chunks)[:max_chars]
+
+
+def extract_text_from_file(path: Path, max_chars: int = 200_000, data: Optional[bytes] = None) -> str:
+    """Extract plain text from a supported file.
+
+    Pass `data` (the file's bytes, e.g. already read for hashing) to parse from
+    memory instead of reading the file from disk again.
+    """
     suffix = path.suffix.lower()
 
+    def source():
+        return io.BytesIO(data) if data is not None else path
+
+    def read_text() -> str:
+        if data is not None:
+            return data.decode("utf-8", errors="ignore")
+        return path.read_text(encoding="utf-8", errors="ignore")
+
+    def read_prefix() -> str:
+        """The first max_chars characters, decoding/reading no more than needed (UTF-8 is <= 4 bytes/char)."""
+        if data is not None:
+            return data[:max_chars * 4].decode("utf-8", errors="ignore")[:max_chars]
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return f.read(max_chars)
+
     try:
         if suffix in {".txt", ".md"}:
-            return path.read_text(encoding="utf-8", errors="ignore")[:max_chars]
+            return read_prefix()
 
         if suffix == ".csv":
+            # CSV is already text: use it as-is; pandas only for files that are not UTF-8 text
+            # (NULs, e.g. UTF-16 exports), where it re-serializes the parsed table
+            text = read_prefix()
+            if "\x00" not in text:
+                return text
             try:
-                df = pd.read_csv(path)
+                df = pd.read_csv(source())
             except Exception:
-                df = pd.read_csv(path, encoding_errors="ignore")
+                df = pd.read_csv(source(), encoding_errors="ignore")
             text = df.to_csv(index=False)
             return text[:max_chars]
 
         if suffix == ".pdf":
-            reader = PdfReader(str(path))
-            chunks = []
-            for page in reader.pages:
-                chunks.append(page.extract_text() or "")
-            return "\n".join(chunks)[:max_chars]
+            return _pdf_to_text(path, data, max_chars)
 
         if suffix == ".docx":
-            doc = Document(str(path))
+            doc = Document(source())
             text = "\n".join(p.text for p in doc.paragraphs)
             return text[:max_chars]
 
         if suffix in {".html", ".htm"}:
-            html = path.read_text(encoding="utf-8", errors="ignore")
-            soup = BeautifulSoup(html, "html.parser")
-            return soup.get_text(separator=" ")[:max_chars]
+            return _html_to_text(read_text())[:max_chars]
 
         # Fallback: read bytes and decode
-        return path.read_text(encoding="utf-8", errors="ignore")[:max_chars]
+        return read_text()[:max_chars]
     except Exception as e:
         logger.warning(f"Failed to extract text from {path.name}: {e}")
         return ""
@@ -177,11 +304,57 @@ def extract_text_from_file(path: Path, max_chars: int = 200_000) -> str:
 # -------------------------
 
 class Embedder:
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2") -> None:
-        self.model = SentenceTransformer(model_name)
+    # Characters kept per token of the model's window; text past the window is truncated by the model
+    # anyway, so only a generous prefix is handed to the tokenizer
+    CHARS_PER_TOKEN_BOUND = 10
+
+    # int8 dynamically quantized export shipped in the model repo (VNNI int8 matmuls on x86 CPUs)
+    ONNX_QUANTIZED_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        backend: str = "torch",
+        cache_folder: Optional[str] = None,
+    ) -> None:
+        self.model = None
+        if backend == "onnx":
+            try:
+                self.model = SentenceTransformer(
+                    model_name, backend="onnx", model_kwargs={"file_name": self.ONNX_QUANTIZED_FILE},
+                    cache_folder=cache_folder
+                )
+            except Exception as e:
+                logger.warning(f"Quantized ONNX encoder unavailable, using the PyTorch model: {e}")
+        if self.model is None:
+            self.model = SentenceTransformer(model_name, cache_folder=cache_folder)
+        self.max_chars = (self.model.max_seq_length or 512) * self.CHARS_PER_TOKEN_BOUND
 
     def encode(self, text: str) -> np.ndarray:
-        return np.asarray(self.model.encode(text, show_progress_bar=False, normalize_embeddings=True))
+        return np.asarray(self.model.encode(text[:self.max_chars], show_progress_bar=False, normalize_embeddings=True))
+
+    def embed_batch(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Encode many texts in one call (one row per text); far cheaper than per-text encode.
+
+        Whole documents are passed in here, so each is clipped to max_chars first: the
+        tokenizer would otherwise tokenize entire files only for the model to keep the
+        first max_seq_length tokens.
+        """
+        return self.model.encode(
+            [text[:self.max_chars] for text in texts],
+            batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True
+        )
+
+
+@lru_cache(maxsize=None)
+def get_embedder(model_name: str = "sentence-transformers/all-MiniLM-L6-v2", backend: Optional[str] = None) -> Embedder:
+    """Process-wide Embedder per model; the model is loaded into memory only once.
+
+    `backend` defaults to settings.embedding_backend ("torch", or "onnx" for the int8 encoder).
+    Weights are cached under settings.model_cache_dir, so later runs skip the download.
+    """
+    settings = get_settings()
+    return Embedder(model_name, backend or settings.embedding_backend, settings.model_cache_dir)
 
 
 async def _ledger_has(ledger, doc_id: str) -> bool:
@@ -193,6 +366,25 @@ async def _ledger_has(ledger, doc_id: str) -> bool:
     return bool(res)
 
 
+async def _ledger_hash_owners(ledger, content_hash: str) -> List[Dict[str, Any]]:
+    """doc_id/path of the synced entries that already hold content with this hash."""
+    if ledger is None or not hasattr(ledger, "active_entries_by_hash"):
+        return []
+    res = ledger.active_entries_by_hash(content_hash)
+    if inspect.iscoroutine(res):
+        return await res
+    return res
+
+
+def _read_and_hash(path: Path) -> Tuple[bytes, str]:
+    """Read a file once; return its bytes and their hash (blake3 when installed, else SHA-256).
+
+    The bytes are reused for extraction, so each file is read from disk a single time.
+    """
+    data = path.read_bytes()
+    return data, _content_hasher(data).hexdigest()
+
+
 async def _ledger_record_synced(ledger, *, doc_id: str, path: Path, source_type: str, category: Optional[str], content_hash: str) -> None:
     if ledger is None:
         return
@@ -227,7 +419,194 @@ async def _ledger_record_synced(ledger, *, doc_id: str, path: Path, source_type:
             await res
 
 
-async def ingest_folder(
+def _synced_entries(batch: List[Tuple[Dict[str, Any], Path, str]], source_type: str, category: str) -> List[Dict[str, Any]]:
+    """Ledger rows (with file size/mtime) for a stored batch, for upsert_synced_many."""
+    entries = []
+    for doc, path, content_hash in batch:
+        try:
+            st = path.stat()
+            size, mtime = st.st_size, st.st_mtime
+        except OSError:
+            size = mtime = None
+        entries.append({
+            "doc_id": doc["doc_id"],
+            "path": str(path),
+            "source_type": source_type,
+            "category": category,
+            "content_hash": content_hash,
+            "size": size,
+            "mtime": mtime,
+        })
+    return entries
+
+
+async def _ledger_file_index(ledger) -> Dict[str, Tuple[Optional[int], Optional[float]]]:
+    """path -> (size, mtime) of files already synced, when the ledger tracks them."""
+    if ledger is None or not hasattr(ledger, "file_index"):
+        return {}
+    res = ledger.file_index()
+    if inspect.iscoroutine(res):
+        return await res
+    return res
+
+
+async def _prepare_document(
+    path: Path,
+    folder: Path,
+    category: Optional[str],
+    source_type: str,
+    knowledge: KnowledgeService,
+    ledger,
+) -> Optional[Tuple[Dict[str, Any], str]]:
+    """Extract and id one file; None when it is too short or already in the ledger.
+
+    The id comes from the file's byte hash, so both ledger checks run before text
+    extraction. Embeddings are added later, per batch, by _store_documents. A file
+    whose bytes are already synced is not stored again, but is still recorded
+    (_record_known_content) so later runs skip it on size/mtime.
+
+    Ledger rows written before ids used the byte hash hold sha1(path|text) ids and
+    hashes, so neither check matches them: such files are only skipped while their
+    size/mtime are unchanged (_changed_files). When one is re-read, it is stored under
+    the new id and _store_documents removes the legacy document for its path.
+    """
+    # Reading, hashing and extraction are blocking I/O / parsing: keep them off the event loop
+    data, content_hash = await asyncio.to_thread(_read_and_hash, path)
+
+    # Deterministic ID based on file content + relative path to avoid duplicates on re-runs
+    rel = str(path.relative_to(folder)) if folder in path.parents or folder == path.parent else path.name
+    doc_id = "file-" + hashlib.sha1(f"{rel}|{content_hash}".encode("utf-8", errors="ignore")).hexdigest()
+
+    owners = await _ledger_hash_owners(ledger, content_hash)
+    if owners:
+        await _record_known_content(
+            ledger, knowledge, owners,
+            doc_id=doc_id, path=path, source_type=source_type, category=category, content_hash=content_hash,
+        )
+        return None
+
+    # Skip if already in ledger
+    if await _ledger_has(ledger, doc_id):
+        return None
+
+    text = await asyncio.to_thread(extract_text_from_file, path, data=data)
+    if not text or len(text.strip()) < 20:
+        return None
+
+    title = path.stem.replace("_", " ")
+
+    doc = {
+        "title": title,
+        "content": text,
+        "category": category or "Documentation",
+        "tags": [path.suffix.lower().lstrip(".")],
+        "source": str(path),
+        "source_type": source_type,
+        "metadata": {"filename": path.name, "relative_path": rel, "type": "documentation"},
+        "doc_id": doc_id,
+    }
+    return doc, content_hash
+
+
+async def _superseded_doc_ids(ledger, batch: List[Tuple[Dict[str, Any], Path, str]]) -> List[str]:
+    """Ids the ledger still lists for the batch's paths under a different id (older versions of the files)."""
+    if ledger is None or not hasattr(ledger, "active_ids_by_path"):
+        return []
+    res = ledger.active_ids_by_path([str(path) for _, path, _ in batch])
+    if inspect.iscoroutine(res):
+        res = await res
+    new_ids = {doc["doc_id"] for doc, _, _ in batch}
+    return [doc_id for ids in res.values() for doc_id in ids if doc_id not in new_ids]
+
+
+async def _remove_superseded(ledger, knowledge: KnowledgeService, doc_ids: List[str]) -> None:
+    """Delete replaced versions from the vector store, then mark them removed in the ledger."""
+    if not doc_ids:
+        return
+    try:
+        await knowledge.delete_documents(doc_ids)
+    except Exception as e:
+        logger.error(f"Failed to remove {len(doc_ids)} superseded documents: {e}")
+        return
+    res = ledger.mark_removed_many(doc_ids)
+    if inspect.iscoroutine(res):
+        await res
+
+
+async def _record_known_content(
+    ledger,
+    knowledge: KnowledgeService,
+    owners: List[Dict[str, Any]],
+    *,
+    doc_id: str,
+    path: Path,
+    source_type: str,
+    category: Optional[str],
+    content_hash: str,
+) -> None:
+    """Record a file whose bytes the ledger already holds, without storing it again.
+
+    When this path owns the content (e.g. only its mtime changed) its row gets the new
+    size/mtime; a copy of another file's content gets a row of its own, served by that
+    file's document. Either way the path's previous versions are retired.
+    """
+    kept = next((owner["doc_id"] for owner in owners if owner["path"] == str(path)), doc_id)
+    await _ledger_record_synced(
+        ledger,
+        doc_id=kept,
+        path=path,
+        source_type=source_type,
+        category=category or "Documentation",
+        content_hash=content_hash,
+    )
+    superseded = await _superseded_doc_ids(ledger, [({"doc_id": kept}, path, content_hash)])
+    await _remove_superseded(ledger, knowledge, superseded)
+
+
+async def _store_documents(
+    batch: List[Tuple[Dict[str, Any], Path, str]],
+    source_type: str,
+    category: Optional[str],
+    knowledge: KnowledgeService,
+    embedder: Embedder,
+    ledger,
+) -> int:
+    if not batch:
+        return 0
+    try:
+        docs = [doc for doc, _, _ in batch]
+        vectors = await asyncio.to_thread(embedder.embed_batch, [doc["content"] for doc in docs])
+        for doc, vector in zip(docs, vectors):
+            doc["embeddings"] = vector
+        await knowledge.add_documents(docs)
+    except Exception as e:
+        logger.error(f"Failed to ingest batch of {len(batch)} files: {e}")
+        return 0
+    # A changed file gets a new id (it is derived from the content): drop the version it replaces,
+    # otherwise every save would leave one more stale copy in search results
+    superseded = await _superseded_doc_ids(ledger, batch)
+    if ledger is not None and hasattr(ledger, "upsert_synced_many"):
+        # One stat pass and one ledger transaction for the whole batch
+        entries = await asyncio.to_thread(_synced_entries, batch, source_type, category or "Documentation")
+        res = ledger.upsert_synced_many(entries)
+        if inspect.iscoroutine(res):
+            await res
+    else:
+        for doc, path, content_hash in batch:
+            await _ledger_record_synced(
+                ledger,
+                doc_id=doc["doc_id"],
+                path=path,
+                source_type=source_type,
+                category=category or "Documentation",
+                content_hash=content_hash,
+            )
+    await _remove_superseded(ledger, knowledge, superseded)
+    return len(batch)
+
+
+async def ingest_file(
+    path: Path,
     folder: Path,
     category: Optional[str],
     source_type: str,
@@ -235,50 +614,92 @@ async def ingest_folder(
     embedder: Embedder,
     ledger: Optional[JSONLedger] = None,
 ) -> int:
-    count = 0
+    """Ingest a single file (e.g. one reported by a folder watcher); returns 1 if added."""
+    if not path.is_file() or path.suffix.lower() not in SUPPORTED_SUFFIXES:
+        return 0
+    try:
+        prepared = await _prepare_document(path, folder, category, source_type, knowledge, ledger)
+    except Exception as e:
+        logger.error(f"Failed to ingest {path}: {e}")
+        return 0
+    if prepared is None:
+        return 0
+    doc, content_hash = prepared
+    return await _store_documents([(doc, path, content_hash)], source_type, category, knowledge, embedder, ledger)
+
+
+def _changed_files(folder: Path, known: Dict[str, Tuple[Optional[int], Optional[float]]]) -> List[Path]:
+    """Supported files under `folder` whose size/mtime differ from the ledger (blocking walk + stats)."""
+    files = []
     for path in folder.rglob("*"):
-        if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES:
-            text = extract_text_from_file(path)
-            if not text or len(text.strip()) < 20:
+        if not (path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES):
+            continue
+        if known:
+            try:
+                st = path.stat()
+            except OSError as e:
+                logger.error(f"Failed to ingest {path}: {e}")
+                continue
+            if known.get(str(path)) == (st.st_size, st.st_mtime):
                 continue
+        files.append(path)
+    return files
+
+
+# Files read/extracted at once by ingest_folder (each in a worker thread)
+EXTRACT_CONCURRENCY = os.cpu_count() or 4
+
+
+async def ingest_folder(
+    folder: Path,
+    category: Optional[str],
+    source_type: str,
+    knowledge: KnowledgeService,
+    embedder: Embedder,
+    ledger: Optional[JSONLedger] = None,
+    batch_size: int = 64,
+) -> int:
+    """Ingest new/changed supported files under `folder`; returns the number of documents added.
+
+    Files are taken `batch_size` at a time: a batch is read and extracted concurrently
+    (EXTRACT_CONCURRENCY threads), then embedded and stored in one call while the
+    next batch is being extracted.
+    """
+    # Files whose size and mtime match the ledger are unchanged: skip before extraction/embedding
+    known = await _ledger_file_index(ledger)
+    files = await asyncio.to_thread(_changed_files, folder, known)
+    semaphore = asyncio.Semaphore(EXTRACT_CONCURRENCY)
 
-            title = path.stem.replace("_", " ")
+    async def prepare(path: Path) -> Optional[Tuple[Dict[str, Any], Path, str]]:
+        async with semaphore:
             try:
-                emb = embedder.encode(text)
-                # Deterministic ID based on file content + relative path to avoid duplicates on re-runs
-                rel = str(path.relative_to(folder)) if folder in path.parents or folder == path.parent else path.name
-                h = hashlib.sha1()
-                h.update(rel.encode("utf-8", errors="ignore"))
-                h.update(b"|")
-                h.update(text[:100000].encode("utf-8", errors="ignore"))  # cap to keep memory reasonable
-                doc_id = f"file-{h.hexdigest()}"
-
-                # Skip if already in ledger
-                if await _ledger_has(ledger, doc_id):
-                    continue
-
-                await knowledge.add_document(
-                    title=title,
-                    content=text,
-                    category=category or "Documentation",
-                    tags=[path.suffix.lower().lstrip(".")],
-                    source=str(path),
-                    source_type=source_type,
-                    metadata={"filename": path.name, "relative_path": str(path.relative_to(folder)), "type": "documentation"},
-                    embeddings=emb,
-                    doc_id=doc_id,
-                )
-                await _ledger_record_synced(
-                    ledger,
-                    doc_id=doc_id,
-                    path=path,
-                    source_type=source_type,
-                    category=category or "Documentation",
-                    content_hash=h.hexdigest(),
-                )
-                count += 1
+                prepared = await _prepare_document(path, folder, category, source_type, knowledge, ledger)
             except Exception as e:
                 logger.error(f"Failed to ingest {path}: {e}")
+                return None
+        if prepared is None:
+            return None
+        doc, content_hash = prepared
+        return doc, path, content_hash
+
+    count = 0
+    storing: Optional[asyncio.Task] = None
+    try:
+        for start in range(0, len(files), batch_size):
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(prepare(path)) for path in files[start:start + batch_size]]
+            batch = [t.result() for t in tasks if t.result() is not None]
+            if storing is not None:
+                count += await storing
+            storing = asyncio.create_task(
+                _store_documents(batch, source_type, category, knowledge, embedder, ledger)
+            )
+        if storing is not None:
+            count += await storing
+            storing = None
+    finally:
+        if storing is not None:
+            storing.cancel()
     return count
 
 
@@ -294,6 +715,7 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     p.add_argument("--save-dir", type=str, default=None, help="Directory to save downloads (defaults to <API>/data/imports)")
     p.add_argument("--category", type=str, default=None, help="Optional category label for ingested documents")
     p.add_argument("--ingest", action="store_true", help="Ingest downloaded/files into the vector DB")
+    p.add_argument("--force", action="store_true", help="Re-ingest files the ingestion ledger already lists as synced")
     return p.parse_args(argv)
 
 
@@ -309,46 +731,48 @@ async def main_async(args: argparse.Namespace) -> int:
         save_dir = Path(settings.data_dir) / "imports"
     ensure_dir(save_dir)
 
-    # Downloads
-    if args.kaggle:
-        for ds in args.kaggle:
-            try:
-                dest = save_dir / "kaggle" / ds.replace("/", "_")
-                download_kaggle_dataset(ds, dest)
-            except Exception as e:
-                logger.error(f"Kaggle download failed for {ds}: {e}")
+    # Downloads: Kaggle datasets (blocking client, one thread each) and URLs run concurrently
+    async def _kaggle(ds: str) -> None:
+        try:
+            dest = save_dir / "kaggle" / ds.replace("/", "_")
+            await asyncio.to_thread(download_kaggle_dataset, ds, dest)
+        except Exception as e:
+            logger.error(f"Kaggle download failed for {ds}: {e}")
 
+    downloads = [_kaggle(ds) for ds in args.kaggle or []]
     if args.urls:
-        url_dir = save_dir / "urls"
-        for u in args.urls:
-            try:
-                download_url(u, url_dir)
-            except Exception as e:
-                logger.error(f"URL download failed for {u}: {e}")
+        downloads.append(download_urls(args.urls, save_dir / "urls"))
+    await asyncio.gather(*downloads)
 
     # Ingestion
     if args.ingest:
         knowledge = KnowledgeService(settings)
         await knowledge.initialize()
 
-        embedder = Embedder()
+        embedder = get_embedder()
         total = 0
-
-        # Ingest downloaded Kaggle and URL files
-        if (save_dir / "kaggle").exists():
-            total += await ingest_folder(save_dir / "kaggle", args.category, "kaggle", knowledge, embedder)
-        if (save_dir / "urls").exists():
-            total += await ingest_folder(save_dir / "urls", args.category, "url", knowledge, embedder)
-
-        # Ingest an arbitrary folder, if provided
-        if args.folder:
-            folder = Path(args.folder)
-            if not folder.is_absolute():
-                folder = Path(settings.data_dir) / folder
-            if folder.exists():
-                total += await ingest_folder(folder, args.category, "manual", knowledge, embedder)
-            else:
-                logger.warning(f"Folder not found: {folder}")
+        # The API's ledger: files it (or an earlier run) already synced are skipped before extraction
+        ledger = None if args.force else SqliteLedger(Path(getattr(settings, "ledger_db_path", "./data/ledger.db")))
+
+        try:
+            # Ingest downloaded Kaggle and URL files
+            if (save_dir / "kaggle").exists():
+                total += await ingest_folder(save_dir / "kaggle", args.category, "kaggle", knowledge, embedder, ledger)
+            if (save_dir / "urls").exists():
+                total += await ingest_folder(save_dir / "urls", args.category, "url", knowledge, embedder, ledger)
+
+            # Ingest an arbitrary folder, if provided
+            if args.folder:
+                folder = Path(args.folder)
+                if not folder.is_absolute():
+                    folder = Path(settings.data_dir) / folder
+                if folder.exists():
+                    total += await ingest_folder(folder, args.category, "manual", knowledge, embedder, ledger)
+                else:
+                    logger.warning(f"Folder not found: {folder}")
+        finally:
+            if ledger is not None:
+                ledger.close()
 
         health = await knowledge.health_check()
         logger.info(f"Ingestion complete. Added {total} documents. Backend={health.get('backend')} Count={health.get('document_count')}")
@@ -359,7 +783,7 @@ async def main_async(args: argparse.Namespace) -> int:
 def main() -> int:
     args = parse_args()
     try:
-        return asyncio.run(main_async(args))
+        return event_loop.run(main_async(args))
     except KeyboardInterrupt:
         logger.warning("Interrupted")
         return 130
@@ -8,12 +8,12 @@ and insert several troubleshooting guides so recommendations are never empty.
 """
 from __future__ import annotations
 
-import asyncio
 from typing import List, Dict
 
 from core.config import get_settings
 from services.knowledge_service import KnowledgeService
 from utils.logger import setup_logger
+from utils import event_loop
 
 logger = setup_logger(__name__)
 
@@ -165,20 +165,13 @@ async def main() -> None:
     ks = KnowledgeService(settings)
     await ks.initialize()
 
+    # One batched write (a single Chroma add() call) instead of a round trip per solution
     inserted = 0
-    for doc in SAMPLE_SOLUTIONS:
-        try:
-            await ks.add_document(
-                title=doc["title"],
-                content=doc["content"],
-                category=doc["category"],
-                metadata=doc["metadata"],
-                source="seed",
-                source_type="script",
-            )
-            inserted += 1
-        except Exception as e:
-            logger.warning(f"Failed to insert '{doc['title']}': {e}")
+    try:
+        ids = await ks.add_documents([{**doc, "source": "seed", "source_type": "script"} for doc in SAMPLE_SOLUTIONS])
+        inserted = len(ids)
+    except Exception as e:
+        logger.warning(f"Failed to insert seed solutions: {e}")
 
     health = await ks.health_check()
     count = await ks.get_document_count()
@@ -186,4 +179,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    event_loop.run(main())
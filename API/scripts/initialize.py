@@ -5,16 +5,30 @@ Run this script to initialize the system with sample data
 '''
 
 import asyncio
+import hashlib
 import sys
+import uuid
 from pathlib import Path
 
+from tqdm import tqdm
+
 # Add the current directory to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from core.config import get_settings
 from services.knowledge_service import KnowledgeService
 from services.data_service import DataService
-from services.model_service import ModelService
+from utils import event_loop
+from scripts.datasets import get_embedder
+
+# Embedded batches allowed to wait for storage while the next one is being encoded
+EMBEDDED_BATCH_QUEUE_SIZE = 2
+
+
+def knowledge_doc_id(item) -> str:
+    '''Deterministic id from the item's title and content, so re-runs find what is already stored'''
+    digest = hashlib.blake2b(f"{item['title']}\n{item['content']}".encode("utf-8"), digest_size=16)
+    return str(uuid.UUID(bytes=digest.digest()))
 
 async def initialize_system():
     '''Initialize the system with sample data'''
@@ -29,10 +43,8 @@ async def initialize_system():
         # Initialize services
         print("🔧 Initializing services...")
         
-        model_service = ModelService(settings)
-        await model_service.initialize()
-        print("✅ Model service initialized")
-        
+        # No ModelService here: its LLM clients and classifier are never used while
+        # seeding, and loading them only added a multi-second cold start
         knowledge_service = KnowledgeService(settings)
         await knowledge_service.initialize()
         print("✅ Knowledge service initialized")
@@ -45,20 +57,67 @@ async def initialize_system():
         print("📊 Loading initial datasets...")
         await data_service.load_initial_datasets()
         
-        # Get cached knowledge and add to knowledge base
-        knowledge_items = await data_service.get_cached_knowledge()
-        print(f"📚 Adding {len(knowledge_items)} items to knowledge base...")
+        # Stream cached knowledge into the knowledge base in batches: a producer embeds
+        # the next batch (in a worker thread) while the current one is being stored, and
+        # the bounded queue caps how many embedded batches wait in memory
+        knowledge_count = len(await data_service.get_cached_knowledge())
+        print(f"📚 Adding {knowledge_count} items to knowledge base...")
+        
+        embedder = get_embedder()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=EMBEDDED_BATCH_QUEUE_SIZE)
+        
+        seen_ids = set()
+        # One progress bar (redrawn at most ~10x/s) instead of a line per item
+        progress = tqdm(total=knowledge_count, unit="doc", desc="Knowledge items")
+        
+        async def embed_batches():
+            try:
+                async for batch in data_service.iter_cached_knowledge(settings.batch_size):
+                    # Skip items stored by an earlier run (or repeated in this one)
+                    # before paying for their embeddings
+                    doc_ids = [knowledge_doc_id(item) for item in batch]
+                    existing = await knowledge_service.existing_ids(doc_ids)
+                    fresh = []
+                    for item, doc_id in zip(batch, doc_ids):
+                        if doc_id not in existing and doc_id not in seen_ids:
+                            seen_ids.add(doc_id)
+                            fresh.append({**item, "doc_id": doc_id})
+                    progress.update(len(batch) - len(fresh))
+                    batch = fresh
+                    if not batch:
+                        continue
+                    vectors = await asyncio.to_thread(
+                        embedder.embed_batch, [item["content"] for item in batch], settings.batch_size
+                    )
+                    await queue.put((batch, vectors))
+            finally:
+                await queue.put(None)
         
-        for item in knowledge_items:
-            await knowledge_service.add_document(
-                title=item["title"],
-                content=item["content"],
-                category=item.get("category"),
-                tags=item.get("metadata", {}).get("tags", []),
-                source=item.get("source", "initialization"),
-                source_type=item.get("source_type", "manual"),
-                metadata=item.get("metadata", {})
-            )
+        producer = asyncio.create_task(embed_batches())
+        try:
+            while (embedded := await queue.get()) is not None:
+                batch, vectors = embedded
+                await knowledge_service.add_documents([
+                    {
+                        "title": item["title"],
+                        "content": item["content"],
+                        "category": item.get("category"),
+                        "tags": item.get("metadata", {}).get("tags", []),
+                        "source": item.get("source", "initialization"),
+                        "source_type": item.get("source_type", "manual"),
+                        "metadata": item.get("metadata", {}),
+                        "embeddings": vector,
+                        "doc_id": item["doc_id"],
+                    }
+                    for item, vector in zip(batch, vectors)
+                ])
+                progress.update(len(batch))
+        except BaseException:
+            producer.cancel()
+            raise
+        finally:
+            progress.close()
+        await producer  # re-raises an embedding failure
         
         # Get statistics
         stats = await knowledge_service.get_statistics()
@@ -75,4 +134,4 @@ async def initialize_system():
         raise
 
 if __name__ == "__main__":
-    asyncio.run(initialize_system())
+    event_loop.run(initialize_system())
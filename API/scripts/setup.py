@@ -6,6 +6,7 @@ Setup and initialization scripts for IT Ticket Analyzer
 import os
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def create_directory_structure():
@@ -33,10 +34,13 @@ def create_directory_structure():
     
     print("📁 Creating directory structure...")
     
-    for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
-        print(f"  ✅ Created: {directory}")
+    # mkdir calls overlap (each is a metadata round trip on network filesystems);
+    # exist_ok covers parents created concurrently, list() re-raises any failure
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda directory: Path(directory).mkdir(parents=True, exist_ok=True), directories))
     
+    # One write for the whole listing rather than a flushed line per directory
+    print("\n".join(f"  ✅ Created: {directory}" for directory in directories))
     print("✅ Directory structure created successfully")
 
 def create_env_file():
@@ -109,10 +113,11 @@ METRICS_PORT=9000
     if not Path(".env").exists():
         with open(".env", "w") as f:
             f.write(env_content)
-        print("✅ Created .env file with example configuration")
-        print("⚠️  Please edit .env file with your actual API keys and configuration")
-    else:
-        print("⚠️  .env file already exists, skipping creation")
+        return (
+            "✅ Created .env file with example configuration\n"
+            "⚠️  Please edit .env file with your actual API keys and configuration"
+        )
+    return "⚠️  .env file already exists, skipping creation"
 
 def create_docker_files():
     """Create additional Docker configuration files"""
@@ -176,7 +181,7 @@ scrape_configs:
     with open("prometheus.yml", "w") as f:
         f.write(prometheus_conf)
     
-    print("✅ Created Docker configuration files")
+    return "✅ Created Docker configuration files"
 
 def install_dependencies():
     """Install Python dependencies"""
@@ -301,7 +306,7 @@ if __name__ == "__main__":
     
     # Make it executable
     os.chmod("scripts/initialize.py", 0o755)
-    print("✅ Created initialization script")
+    return "✅ Created initialization script"
 
 def create_run_scripts():
     """Create convenience run scripts"""
@@ -371,7 +376,7 @@ fi
         f.write(prod_script)
     os.chmod("scripts/run_prod.sh", 0o755)
     
-    print("✅ Created run scripts")
+    return "✅ Created run scripts"
 
 def create_test_script():
     """Create test script to verify installation"""
@@ -493,7 +498,7 @@ if __name__ == "__main__":
     with open("scripts/test_installation.py", "w") as f:
         f.write(test_script)
     os.chmod("scripts/test_installation.py", 0o755)
-    print("✅ Created test script")
+    return "✅ Created test script"
 
 def create_readme():
     """Create comprehensive README.md"""
@@ -795,7 +800,7 @@ This project is licensed under the MIT License - see the [LICENSE](LICENSE) file
     
     with open("README.md", "w") as f:
         f.write(readme_content)
-    print("✅ Created comprehensive README.md")
+    return "✅ Created comprehensive README.md"
 
 def main():
     """Main setup function"""
@@ -806,17 +811,20 @@ def main():
     # Create directory structure
     create_directory_structure()
     
-    # Create configuration files  
-    create_env_file()
-    create_docker_files()
-    
-    # Create scripts
-    create_init_script()
-    create_run_scripts()
-    create_test_script()
-    
-    # Create documentation
-    create_readme()
+    # Configuration files, scripts and documentation are independent small writes:
+    # run them side by side. Each returns its status message, printed here in order
+    # (result() re-raises a failure)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        writes = [
+            pool.submit(create_env_file),
+            pool.submit(create_docker_files),
+            pool.submit(create_init_script),
+            pool.submit(create_run_scripts),
+            pool.submit(create_test_script),
+            pool.submit(create_readme),
+        ]
+        for write in writes:
+            print(write.result())
     
     print("\n🎉 Setup completed successfully!")
     print("\nNext steps:")
@@ -1,4 +1,3 @@
-import asyncio
 import random
 import uuid
 import json
@@ -14,6 +13,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from API.core.config import get_settings
 from API.utils.database import TicketDatabase
 from API.services.knowledge_service import KnowledgeService
+from API.utils import event_loop
 
 # Setup logging
 import logging
@@ -316,4 +316,4 @@ async def seed_database():
     logger.info("🎉 Database seeding complete!")
 
 if __name__ == "__main__":
-    asyncio.run(seed_database())
+    event_loop.run(seed_database())
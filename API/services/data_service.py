@@ -9,7 +9,7 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from datetime import timezone
 import os
@@ -880,7 +880,7 @@ class DataService:
         
         return {
             "report_type": "summary",
-            "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "generated_at": datetime.now(timezone.utc),  # rendered as ISO-8601 "...Z" by ORJSONResponse
             "period": {"start": start_date, "end": end_date},
             "totals": {
                 "total_items": total_items,
@@ -932,7 +932,7 @@ class DataService:
         
         return {
             "report_type": "category_analysis",
-            "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "generated_at": datetime.now(timezone.utc),  # rendered as ISO-8601 "...Z" by ORJSONResponse
             "categories": category_analysis,
             "summary": {
                 "total_categories": len(category_analysis),
@@ -964,7 +964,7 @@ class DataService:
         
         return {
             "report_type": "trend_analysis",
-            "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "generated_at": datetime.now(timezone.utc),  # rendered as ISO-8601 "...Z" by ORJSONResponse
             "period": {"start": start_date, "end": end_date},
             "trends": trends,
             "insights": {
@@ -978,6 +978,12 @@ class DataService:
         """Get all cached knowledge items"""
         return self.datasets_cache.get("knowledge_cache", [])
     
+    async def iter_cached_knowledge(self, batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield cached knowledge items in batches of at most `batch_size`"""
+        knowledge_items = self.datasets_cache.get("knowledge_cache", [])
+        for start in range(0, len(knowledge_items), batch_size):
+            yield knowledge_items[start:start + batch_size]
+    
     async def clear_cache(self):
         """Clear all cached data"""
         self.datasets_cache.clear()
@@ -9,9 +9,10 @@ Vector DB Priority:
 - Fallback: In-memory storage
 """
 
+import asyncio
 import json
 import uuid
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
 from datetime import datetime, timezone
 import numpy as np
 from pathlib import Path
@@ -118,6 +119,9 @@ class KnowledgeService:
             try:
                 self.chroma_collection = self.chroma_client.get_collection(name=collection_name)
                 logger.info(f"✅ Using existing ChromaDB collection: {collection_name}")
+                space = (self.chroma_collection.metadata or {}).get("hnsw:space", "l2")
+                if space != "cosine":
+                    logger.warning(f"Chroma collection uses '{space}' distance; similarity scores assume cosine")
             except Exception as e:
                 logger.warning(f"Recreating Chroma collection due to error: {str(e)}")
                 try:
@@ -126,7 +130,7 @@ class KnowledgeService:
                     pass
                 self.chroma_collection = self.chroma_client.create_collection(
                     name=collection_name,
-                    metadata={"hnsw:space": "cosine"}
+                    metadata=self._hnsw_metadata()
                 )
                 logger.info(f"✅ Created new ChromaDB collection: {collection_name}")
 
@@ -144,6 +148,15 @@ class KnowledgeService:
                 pass
             await self._init_fallback()
 
+    def _hnsw_metadata(self) -> Dict[str, Any]:
+        """HNSW index configuration for a new Chroma collection (cosine space)."""
+        return {
+            "hnsw:space": "cosine",
+            "hnsw:M": int(getattr(self.settings, "chroma_hnsw_m", 16)),
+            "hnsw:construction_ef": int(getattr(self.settings, "chroma_hnsw_construction_ef", 200)),
+            "hnsw:search_ef": int(getattr(self.settings, "chroma_hnsw_search_ef", 64)),
+        }
+
     async def _init_fallback(self):
         """Initialize in-memory fallback knowledge base."""
         self.fallback_storage = []
@@ -220,6 +233,7 @@ class KnowledgeService:
         category: Optional[str] = None,
         max_results: int = 5,
         min_similarity: float = 0.4,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
         """Return solution-style recommendations based on a query.
 
@@ -227,7 +241,10 @@ class KnowledgeService:
         Maps raw search results into a standardized solution shape expected by the app.
         """
         try:
-            results = await self.search(query=query, category=category, limit=max_results, min_similarity=min_similarity)
+            results = await self.search(
+                query=query, category=category, limit=max_results, min_similarity=min_similarity,
+                query_embedding=query_embedding,
+            )
             solutions: List[Dict[str, Any]] = []
             for i, r in enumerate(results):
                 # Extract steps if present in metadata or derive simple bullets from content
@@ -262,12 +279,15 @@ class KnowledgeService:
         source_type: str = "manual",
         metadata: Optional[Dict[str, Any]] = None,
         task_id: str = "",
+        embedder: Any = None,
     ) -> bool:
         """Lightweight ingestion entrypoint used by the API.
 
         - If metadata contains a "documents" list, each item should have title/content/category
           and will be added.
         - Otherwise this acts as a no-op acknowledging the request (other scripts handle bulk ingestion).
+        - When an embedder is passed (the app's shared one), documents are stored with its
+          embeddings instead of leaving the vector store to embed them.
         """
         try:
             docs = []
@@ -277,20 +297,23 @@ class KnowledgeService:
                 logger.info("ingest_knowledge called with no documents; acknowledged.")
                 return True
 
-            for doc in docs:
-                title = doc.get("title") or "Untitled"
-                content = doc.get("content") or ""
-                category = doc.get("category") or "Documentation"
-                tags = doc.get("tags") or []
-                await self.add_document(
-                    title=title,
-                    content=content,
-                    category=category,
-                    tags=tags,
-                    source=source,
-                    source_type=source_type,
-                    metadata=doc.get("metadata") or {},
-                )
+            batch = [
+                {
+                    "title": doc.get("title") or "Untitled",
+                    "content": doc.get("content") or "",
+                    "category": doc.get("category") or "Documentation",
+                    "tags": doc.get("tags") or [],
+                    "source": source,
+                    "source_type": source_type,
+                    "metadata": doc.get("metadata") or {},
+                }
+                for doc in docs
+            ]
+            if embedder is not None:
+                vectors = await asyncio.to_thread(embedder.embed_batch, [doc["content"] for doc in batch])
+                for doc, vector in zip(batch, vectors):
+                    doc["embeddings"] = vector
+            await self.add_documents(batch)
             logger.info(f"✅ Ingested {len(docs)} documents via API task={task_id}")
             return True
         except Exception as e:
@@ -326,7 +349,9 @@ class KnowledgeService:
                 if metadata:
                     chroma_metadata["custom_metadata"] = json.dumps(metadata)
 
-                self.chroma_collection.add(
+                # Chroma's client is blocking (and embeds the text when no vector is given)
+                await asyncio.to_thread(
+                    self.chroma_collection.add,
                     ids=[doc_id],
                     documents=[content],
                     metadatas=[chroma_metadata],
@@ -357,24 +382,115 @@ class KnowledgeService:
         logger.info(f"✅ Added document to fallback storage: {title[:60]}")
         return doc_id
 
+    async def add_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """Add several documents at once.
+
+        Each item takes the keyword arguments of add_document. In Chroma mode the
+        batch is written with a single add() call (in a worker thread); otherwise
+        (or if that fails) documents are added individually, a few at a time.
+        """
+        if not documents:
+            return []
+        docs = [{**doc, "doc_id": doc.get("doc_id") or str(uuid.uuid4())} for doc in documents]
+
+        with_embeddings = [doc.get("embeddings") is not None for doc in docs]
+        if self.chroma_collection is not None and (all(with_embeddings) or not any(with_embeddings)):
+            try:
+                created_at = datetime.now(timezone.utc).isoformat()
+                metadatas = []
+                for doc in docs:
+                    chroma_metadata = {
+                        "title": doc["title"],
+                        "category": doc.get("category") or "",
+                        "source": doc.get("source", "manual"),
+                        "source_type": doc.get("source_type", "manual"),
+                        "created_at": created_at,
+                    }
+                    if doc.get("tags"):
+                        chroma_metadata["tags"] = ",".join(doc["tags"])
+                    if doc.get("metadata"):
+                        chroma_metadata["custom_metadata"] = json.dumps(doc["metadata"])
+                    metadatas.append(chroma_metadata)
+
+                await asyncio.to_thread(
+                    self.chroma_collection.add,
+                    ids=[doc["doc_id"] for doc in docs],
+                    documents=[doc["content"] for doc in docs],
+                    metadatas=metadatas,
+                    embeddings=[doc["embeddings"].tolist() for doc in docs] if all(with_embeddings) else None,
+                )
+                logger.info(f"✅ Added {len(docs)} documents to ChromaDB")
+                return [doc["doc_id"] for doc in docs]
+            except Exception as e:
+                logger.error(f"Batch add to ChromaDB failed, adding documents individually: {str(e)}")
+
+        # Per-document adds overlap, bounded like other outbound work
+        semaphore = asyncio.Semaphore(max(1, getattr(self.settings, "max_concurrent_requests", 5)))
+
+        async def add_one(doc: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await self.add_document(**doc)
+
+        return list(await asyncio.gather(*(add_one(doc) for doc in docs)))
+
+    async def delete_documents(self, doc_ids: List[str]) -> None:
+        """Remove documents by id (ids that are not stored are ignored)."""
+        if not doc_ids:
+            return
+        if self.chroma_collection is not None:
+            try:
+                await asyncio.to_thread(self.chroma_collection.delete, ids=list(doc_ids))
+                logger.info(f"🗑️ Removed {len(doc_ids)} documents from ChromaDB")
+                return
+            except Exception as e:
+                logger.error(f"Failed to delete documents from ChromaDB: {str(e)}")
+                raise
+        unwanted = set(doc_ids)
+        self.fallback_storage = [
+            doc for doc in getattr(self, "fallback_storage", []) if doc["doc_id"] not in unwanted
+        ]
+
+    async def existing_ids(self, doc_ids: List[str]) -> Set[str]:
+        """The subset of `doc_ids` already stored (one lookup for the whole list)."""
+        if not doc_ids:
+            return set()
+        if self.chroma_collection is not None:
+            try:
+                found = await asyncio.to_thread(self.chroma_collection.get, ids=list(doc_ids), include=[])
+                return set(found["ids"])
+            except Exception as e:
+                logger.warning(f"ChromaDB id lookup failed: {e}")
+                return set()
+        wanted = set(doc_ids)
+        return {doc["doc_id"] for doc in getattr(self, "fallback_storage", []) if doc["doc_id"] in wanted}
+
     async def search(
         self,
         query: str,
         category: Optional[str] = None,
         limit: int = 10,
         min_similarity: float = 0.0,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
-        """Search the knowledge base."""
+        """Search the knowledge base.
+
+        `query_embedding` is the query's vector when the caller already computed it
+        (same model as the stored documents); Chroma then skips embedding the text again.
+        """
         if self.chroma_collection is not None:
-            return await self._chroma_search(query, category, limit, min_similarity)
+            return await self._chroma_search(query, category, limit, min_similarity, query_embedding)
         return await self._fallback_search(query, category, limit, min_similarity)
 
-    async def _chroma_search(self, query, category, limit, min_similarity):
+    async def _chroma_search(self, query, category, limit, min_similarity, query_embedding=None):
         """Search using ChromaDB."""
         try:
             where = {"category": category} if category else None
+            if query_embedding is not None:
+                query_args = {"query_embeddings": [np.asarray(query_embedding).tolist()]}
+            else:
+                query_args = {"query_texts": [query]}
             results = self.chroma_collection.query(
-                query_texts=[query],
+                **query_args,
                 n_results=limit,
                 where=where,
             )
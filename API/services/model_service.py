@@ -4,6 +4,7 @@ Supports Ollama, Hugging Face, Groq, Gemini with fallbacks
 """
 
 import aiohttp
+import asyncio
 from typing import Dict, List, Any, Union
 import numpy as np
 
@@ -51,6 +52,13 @@ class ModelService:
         self.classifiers = {}
         self.clients = {}
         self.initialized = False
+        self._http_session = None  # shared aiohttp session for Ollama calls (keep-alive pool)
+        
+    def _get_session(self) -> aiohttp.ClientSession:
+        """The service's shared aiohttp session; stays open across calls (closed in cleanup)."""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession()
+        return self._http_session
         
     async def initialize(self):
         """Initialize all available models"""
@@ -79,20 +87,20 @@ class ModelService:
             return
             
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.settings.ollama_host}/api/tags") as response:
-                    if response.status == 200:
-                        models = await response.json()
-                        available_models = [m['name'] for m in models.get('models', [])]
-                        
-                        self.clients['ollama'] = {
-                            'host': self.settings.ollama_host,
-                            'available_models': available_models
-                        }
-                        
-                        logger.info(f"✅ Ollama connected: {len(available_models)} models available")
-                    else:
-                        logger.warning("❌ Ollama not available")
+            session = self._get_session()
+            async with session.get(f"{self.settings.ollama_host}/api/tags") as response:
+                if response.status == 200:
+                    models = await response.json()
+                    available_models = [m['name'] for m in models.get('models', [])]
+                    
+                    self.clients['ollama'] = {
+                        'host': self.settings.ollama_host,
+                        'available_models': available_models
+                    }
+                    
+                    logger.info(f"✅ Ollama connected: {len(available_models)} models available")
+                else:
+                    logger.warning("❌ Ollama not available")
                         
         except Exception as e:
             logger.warning(f"Ollama initialization failed: {str(e)}")
@@ -111,7 +119,10 @@ class ModelService:
             # Initialize embedding model
             if SENTENCE_TRANSFORMERS_AVAILABLE:
                 embedding_model = self.settings.hf_models['embedding']
-                self.embedders['huggingface'] = SentenceTransformer(embedding_model)
+                # Model loading is blocking disk I/O + deserialization: keep it off the event loop
+                self.embedders['huggingface'] = await asyncio.to_thread(
+                    SentenceTransformer, embedding_model, cache_folder=self.settings.model_cache_dir
+                )
                 logger.info(f"✅ HuggingFace embedder loaded: {embedding_model}")
             
             # Initialize classification pipeline
@@ -123,11 +134,13 @@ class ModelService:
                 device = -1
                 logger.info("💻 Using CPU for HuggingFace models")
             
-            self.classifiers['huggingface'] = pipeline(
+            self.classifiers['huggingface'] = await asyncio.to_thread(
+                pipeline,
                 "text-classification",
                 model=classification_model,
                 device=device,
-                return_all_scores=True
+                return_all_scores=True,
+                model_kwargs={"cache_dir": self.settings.model_cache_dir}
             )
             
             self.clients['huggingface'] = {
@@ -201,7 +214,8 @@ class ModelService:
         if 'huggingface' in self.embedders:
             try:
                 embedder = self.embedders['huggingface']
-                embeddings = embedder.encode(texts, convert_to_numpy=True)
+                # Torch inference releases the GIL: run it in a worker thread, not on the event loop
+                embeddings = await asyncio.to_thread(embedder.encode, texts, convert_to_numpy=True)
                 return embeddings
             except Exception as e:
                 logger.warning(f"HuggingFace embedding failed: {str(e)}")
@@ -218,25 +232,35 @@ class ModelService:
         return self._fallback_embeddings(texts)
     
     async def _generate_ollama_embeddings(self, texts: List[str]) -> np.ndarray:
-        """Generate embeddings using Ollama"""
-        embeddings = []
+        """Generate embeddings using Ollama
+
+        One /api/embed request embeds the whole batch; Ollama versions without it
+        (404) get concurrent per-text /api/embeddings requests instead.
+        """
+        model = self.settings.ollama_models['embedding']
+        
+        session = self._get_session()
+        async with session.post(
+            f"{self.settings.ollama_host}/api/embed",
+            json={"model": model, "input": texts}
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return np.array(result['embeddings'])
+            if response.status != 404:
+                raise Exception(f"Ollama API error: {response.status}")
+        
+        async def embed_one(text: str) -> List[float]:
+            async with session.post(
+                f"{self.settings.ollama_host}/api/embeddings",
+                json={"model": model, "prompt": text}
+            ) as response:
+                if response.status != 200:
+                    raise Exception(f"Ollama API error: {response.status}")
+                result = await response.json()
+                return result['embedding']
         
-        async with aiohttp.ClientSession() as session:
-            for text in texts:
-                payload = {
-                    "model": self.settings.ollama_models['embedding'],
-                    "prompt": text
-                }
-                
-                async with session.post(
-                    f"{self.settings.ollama_host}/api/embeddings",
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        embeddings.append(result['embedding'])
-                    else:
-                        raise Exception(f"Ollama API error: {response.status}")
+        embeddings = await asyncio.gather(*(embed_one(text) for text in texts))
         
         return np.array(embeddings)
     
@@ -305,34 +329,34 @@ class ModelService:
             Respond with only the category name that best matches this ticket.
             """
         
-        async with aiohttp.ClientSession() as session:
-            payload = {
-                "model": self.settings.ollama_models['llm'],
-                "prompt": ollama_prompt,
-                "stream": False
-            }
-            
-            async with session.post(
-                f"{self.settings.ollama_host}/api/generate",
-                json=payload
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    predicted_category = result['response'].strip()
-                    
-                    # Find best matching category
-                    for category in categories:
-                        if category.lower() in predicted_category.lower():
-                            return {
-                                "category": category,
-                                "confidence": 0.8,
-                                "reasoning": f"Ollama classification: {predicted_category} (matched {category})"
-                            }
-                    
-                    # If no match found, raise exception to trigger fallback
-                    raise ValueError(f"Ollama response '{predicted_category}' did not match any valid category")
-                else:
-                    raise Exception(f"Ollama API error: {response.status}")
+        session = self._get_session()
+        payload = {
+            "model": self.settings.ollama_models['llm'],
+            "prompt": ollama_prompt,
+            "stream": False
+        }
+        
+        async with session.post(
+            f"{self.settings.ollama_host}/api/generate",
+            json=payload
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                predicted_category = result['response'].strip()
+                
+                # Find best matching category
+                for category in categories:
+                    if category.lower() in predicted_category.lower():
+                        return {
+                            "category": category,
+                            "confidence": 0.8,
+                            "reasoning": f"Ollama classification: {predicted_category} (matched {category})"
+                        }
+                
+                # If no match found, raise exception to trigger fallback
+                raise ValueError(f"Ollama response '{predicted_category}' did not match any valid category")
+            else:
+                raise Exception(f"Ollama API error: {response.status}")
     
     async def _classify_groq(self, text: str, categories: List[str], prompt: str = None, few_shot: list = None) -> Dict[str, Any]:
         """Classify using Groq"""
@@ -353,7 +377,8 @@ class ModelService:
             """
         
         try:
-            response = client.chat.completions.create(
+            response = await asyncio.to_thread(
+                client.chat.completions.create,
                 model=self.settings.groq_model,
                 messages=[{"role": "user", "content": groq_prompt}],
                 max_tokens=48,
@@ -396,7 +421,7 @@ class ModelService:
             """
         
         try:
-            response = model.generate_content(gemini_prompt)
+            response = await asyncio.to_thread(model.generate_content, gemini_prompt)
             predicted_category = response.text.strip()
             
             # Find best matching category
@@ -521,26 +546,26 @@ class ModelService:
     async def _generate_ollama_text(self, prompt: str, max_tokens: int) -> str:
         """Generate text using Ollama"""
         
-        async with aiohttp.ClientSession() as session:
-            payload = {
-                "model": self.settings.ollama_models['llm'],
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "num_predict": max_tokens,
-                    "temperature": 0.7
-                }
+        session = self._get_session()
+        payload = {
+            "model": self.settings.ollama_models['llm'],
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "num_predict": max_tokens,
+                "temperature": 0.7
             }
-            
-            async with session.post(
-                f"{self.settings.ollama_host}/api/generate",
-                json=payload
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result['response']
-                else:
-                    raise Exception(f"Ollama API error: {response.status}")
+        }
+        
+        async with session.post(
+            f"{self.settings.ollama_host}/api/generate",
+            json=payload
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return result['response']
+            else:
+                raise Exception(f"Ollama API error: {response.status}")
     
     async def _generate_groq_text(self, prompt: str, max_tokens: int) -> str:
         """Generate text using Groq"""
@@ -548,7 +573,8 @@ class ModelService:
         client = self.clients['groq']
         
         try:
-            response = client.chat.completions.create(
+            response = await asyncio.to_thread(
+                client.chat.completions.create,
                 model=self.settings.groq_model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=max_tokens,
@@ -566,7 +592,8 @@ class ModelService:
         model = self.clients['gemini']
         
         try:
-            response = model.generate_content(
+            response = await asyncio.to_thread(
+                model.generate_content,
                 prompt,
                 generation_config={
                     'max_output_tokens': max_tokens,
@@ -636,6 +663,9 @@ class ModelService:
         self.embedders.clear()
         self.classifiers.clear()
         self.clients.clear()
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
         
         # Clear CUDA cache if available
         try:
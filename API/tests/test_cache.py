@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from utils.cache import async_ttl_cache
+
+
+@pytest.mark.asyncio
+async def test_async_ttl_cache_shares_inflight_call_and_clears():
+    calls = []
+
+    @async_ttl_cache(ttl=60)
+    async def probe():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    results = await asyncio.gather(*[probe() for _ in range(5)])
+    assert results == [{"ok": True}] * 5
+    assert len(calls) == 1
+
+    probe.cache_clear()
+    await probe()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_ttl_cache_does_not_cache_failures():
+    calls = []
+
+    @async_ttl_cache(ttl=60)
+    async def flaky():
+        calls.append(1)
+        raise RuntimeError("probe failed")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await flaky()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_ttl_cache_skips_results_rejected_by_cache_if():
+    calls = []
+
+    @async_ttl_cache(ttl=60, cache_if=bool)
+    async def lookup(found):
+        calls.append(found)
+        return ["hit"] if found else []
+
+    assert await lookup(False) == []
+    assert await lookup(False) == []
+    assert await lookup(True) == ["hit"]
+    assert await lookup(True) == ["hit"]
+    assert calls == [False, False, True]
@@ -0,0 +1,59 @@
+import pytest
+
+from utils.call_sessions import CallSessionStore
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def getex(self, key, ex=None):
+        if key in self.data:
+            self.ttls[key] = ex
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.data):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+
+def _store(**kwargs):
+    return CallSessionStore(
+        maxsize=10, ttl=60, encode=lambda v: ",".join(v).encode(), decode=lambda raw: raw.decode().split(","), **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_call_sessions_local_roundtrip_and_delete():
+    store = _store()
+    assert await store.get("CA1") is None
+    await store.set("CA1", [])
+    assert await store.get("CA1") == []
+    await store.set("CA1", ["hi", "hello"])
+    assert await store.get("CA1") == ["hi", "hello"]
+    assert await store.count() == 1
+    await store.delete("CA1")
+    assert await store.get("CA1") is None
+
+
+@pytest.mark.asyncio
+async def test_call_sessions_redis_encodes_and_refreshes_ttl():
+    store = _store()
+    redis = FakeRedis()
+    store.attach_redis(redis)
+    await store.set("CA2", ["hi", "hello"])
+    assert redis.data == {"twilio:CA2": b"hi,hello"}
+    assert await store.get("CA2") == ["hi", "hello"]
+    assert redis.ttls["twilio:CA2"] == 60
+    assert await store.count() == 1
+    await store.delete("CA2")
+    assert await store.get("CA2") is None
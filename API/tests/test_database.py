@@ -0,0 +1,37 @@
+import sqlite3
+
+from utils.database import TicketDatabase
+
+
+def test_knowledge_base_size_counts_distinct_solution_ids(tmp_path):
+    db_path = tmp_path / "tickets.db"
+    # A ticket_solutions table whose solution_id accepts NULL (the shipped schema declares it NOT NULL)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE ticket_solutions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticket_id TEXT NOT NULL,
+                solution_id TEXT,
+                title TEXT NOT NULL,
+                description TEXT,
+                category TEXT,
+                steps JSON,
+                similarity_score REAL,
+                source TEXT,
+                metadata JSON,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    db = TicketDatabase(str(db_path))
+    db.create_tickets_bulk([
+        {"title": "VPN drops", "description": "VPN disconnects hourly", "category": "Network", "priority": "High",
+         "recommended_solutions": [{"title": "Reinstall client"}, {"solution_id": "kb-1", "title": "Reset VPN"}]},
+        {"title": "VPN slow", "description": "VPN is slow at home", "category": "Network", "priority": "Low",
+         "recommended_solutions": [{"title": "Check bandwidth"}, {"solution_id": "kb-1", "title": "Reset VPN"}]},
+    ])
+
+    with db.get_connection() as conn:
+        stored = conn.execute("SELECT COUNT(*) FROM ticket_solutions").fetchone()[0]
+        distinct = conn.execute("SELECT COUNT(DISTINCT solution_id) FROM ticket_solutions").fetchone()[0]
+    assert (stored, distinct) == (4, 1)
+    assert db.get_dashboard_metrics()["knowledge_base_size"] == distinct
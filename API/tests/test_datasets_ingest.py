@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+
+import scripts.datasets as datasets
+from utils.ledger_sqlite import SqliteLedger
+
+
+class FakeEmbedder:
+    def embed_batch(self, texts, batch_size=64):
+        return np.zeros((len(texts), 4))
+
+
+class FakeKnowledge:
+    def __init__(self):
+        self.docs = {}
+
+    async def add_documents(self, docs):
+        for doc in docs:
+            self.docs[doc["doc_id"]] = doc
+
+    async def delete_documents(self, doc_ids):
+        for doc_id in doc_ids:
+            self.docs.pop(doc_id, None)
+
+
+@pytest.mark.asyncio
+async def test_touched_file_is_not_reread_on_next_ingest(tmp_path, monkeypatch):
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    path = folder / "vpn.txt"
+    path.write_text("Reconnect the VPN client after changing networks.")
+    knowledge = FakeKnowledge()
+    ledger = SqliteLedger(tmp_path / "ledger.db")
+    try:
+        assert await datasets.ingest_folder(folder, None, "auto", knowledge, FakeEmbedder(), ledger) == 1
+
+        # Same bytes, new mtime (touch / checkout): recorded, not stored again
+        st = path.stat()
+        os.utime(path, (st.st_atime, st.st_mtime + 100))
+        assert await datasets.ingest_folder(folder, None, "auto", knowledge, FakeEmbedder(), ledger) == 0
+        assert ledger.file_index()[str(path)] == (st.st_size, st.st_mtime + 100)
+
+        reads = []
+        read_and_hash = datasets._read_and_hash
+        monkeypatch.setattr(datasets, "_read_and_hash", lambda p: reads.append(p) or read_and_hash(p))
+        assert await datasets.ingest_folder(folder, None, "auto", knowledge, FakeEmbedder(), ledger) == 0
+        assert reads == []
+        assert len(knowledge.docs) == 1
+    finally:
+        ledger.close()
+
+
+@pytest.mark.asyncio
+async def test_file_edited_to_match_another_retires_its_old_version(tmp_path):
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    first = folder / "a.txt"
+    second = folder / "b.txt"
+    first.write_text("Clear the browser cache and sign in again.")
+    second.write_text("Restart the print spooler service on the host.")
+    knowledge = FakeKnowledge()
+    ledger = SqliteLedger(tmp_path / "ledger.db")
+    try:
+        assert await datasets.ingest_folder(folder, None, "auto", knowledge, FakeEmbedder(), ledger) == 2
+        old_ids = ledger.active_ids_by_path([str(second)])[str(second)]
+
+        second.write_bytes(first.read_bytes())
+        assert await datasets.ingest_file(second, folder, None, "auto", knowledge, FakeEmbedder(), ledger) == 0
+
+        assert not any(doc_id in knowledge.docs for doc_id in old_ids)
+        assert [doc["source"] for doc in knowledge.docs.values()] == [str(first)]
+        new_ids = ledger.active_ids_by_path([str(second)])[str(second)]
+        assert len(new_ids) == 1 and new_ids != old_ids
+        assert str(second) in ledger.file_index()
+    finally:
+        ledger.close()
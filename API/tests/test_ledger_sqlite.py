@@ -0,0 +1,43 @@
+from utils.ledger_sqlite import SqliteLedger
+
+
+def test_upsert_synced_many_inserts_and_updates_in_one_call(tmp_path):
+    ledger = SqliteLedger(tmp_path / "ledger.db")
+    try:
+        entries = [
+            {"doc_id": f"file-{i}", "path": f"/docs/{i}.txt", "source_type": "auto", "category": "Documentation",
+             "content_hash": f"h{i}", "size": 10, "mtime": 1.0}
+            for i in range(3)
+        ]
+        assert ledger.upsert_synced_many(entries) == 3
+        ledger.mark_removed("file-0")
+
+        entries[0]["content_hash"] = "h0-new"
+        assert ledger.upsert_synced_many(entries[:1]) == 1
+        assert ledger.upsert_synced_many([]) == 0
+
+        rows = {row["doc_id"]: row for row in ledger.query_entries()}
+        assert len(rows) == 3
+        assert rows["file-0"]["status"] == "synced"
+        assert rows["file-0"]["content_hash"] == "h0-new"
+        assert ledger.has_hash("h2") and not ledger.has_hash("h0")
+        assert ledger.stats() == {"synced": 3, "removed": 0, "total": 3}
+    finally:
+        ledger.close()
+
+
+def test_active_ids_by_path_skips_removed_entries(tmp_path):
+    ledger = SqliteLedger(tmp_path / "ledger.db")
+    try:
+        entries = [
+            {"doc_id": doc_id, "path": path, "source_type": "auto", "category": "Documentation",
+             "content_hash": doc_id, "size": 10, "mtime": 1.0}
+            for doc_id, path in [("old-a", "/docs/a.txt"), ("new-a", "/docs/a.txt"), ("b", "/docs/b.txt")]
+        ]
+        ledger.upsert_synced_many(entries)
+        ledger.mark_removed("b")
+
+        found = ledger.active_ids_by_path(["/docs/a.txt", "/docs/b.txt", "/docs/missing.txt"])
+        assert {path: sorted(ids) for path, ids in found.items()} == {"/docs/a.txt": ["new-a", "old-a"]}
+    finally:
+        ledger.close()
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from utils.response_cache import ResponseCache
+
+
+@pytest.mark.asyncio
+async def test_response_cache_single_flight_and_namespace_clear():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"total_tickets": 3}
+
+    results = await asyncio.gather(*[cache.get_or_compute("dash", "30", 30, compute) for _ in range(5)])
+    assert results == [{"total_tickets": 3}] * 5
+    assert len(calls) == 1
+
+    await cache.get_or_compute("dash", "30", 30, compute)
+    assert len(calls) == 1
+
+    await cache.clear("dash")
+    assert await cache.get("dash", "30") is None
+    await cache.get_or_compute("dash", "30", 30, compute)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_response_cache_expires_entries():
+    cache = ResponseCache()
+    await cache.set("dash", "7", {"ok": True}, ttl=0)
+    assert await cache.get("dash", "7") is None
@@ -0,0 +1,34 @@
+import numpy as np
+
+from utils.semantic_cache import SemanticCache
+
+
+def _unit(v):
+    v = np.asarray(v, dtype=float)
+    return v / np.linalg.norm(v)
+
+
+def test_semantic_cache_hit_within_scope():
+    cache = SemanticCache(max_entries=8, ttl_seconds=60, threshold=0.9)
+    cache.put(_unit([1.0, 0.0, 0.1]), ["cached"], scope="recommend:None")
+
+    assert cache.lookup(_unit([1.0, 0.0, 0.12]), scope="recommend:None") == ["cached"]
+    # Same vector, different scope (e.g. another category) must not bleed across
+    assert cache.lookup(_unit([1.0, 0.0, 0.1]), scope="recommend:Email Issues") is None
+    # Dissimilar query misses
+    assert cache.lookup(_unit([0.0, 1.0, 0.0]), scope="recommend:None") is None
+
+
+def test_semantic_cache_evicts_lru_and_expired():
+    cache = SemanticCache(max_entries=2, ttl_seconds=60, threshold=0.99)
+    a, b, c = _unit([1, 0, 0]), _unit([0, 1, 0]), _unit([0, 0, 1])
+    cache.put(a, "a")
+    cache.put(b, "b")
+    assert cache.lookup(a) == "a"  # a is now most recently used
+    cache.put(c, "c")
+    assert cache.lookup(b) is None
+    assert cache.lookup(a) == "a"
+
+    expired = SemanticCache(ttl_seconds=0)
+    expired.put(a, "a")
+    assert expired.lookup(a) is None
@@ -0,0 +1,131 @@
+import types as pytypes
+
+import pytest
+from google.genai import chats, types
+
+import routers.twilio as twilio
+
+
+def _chunk(*parts, finish=None):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)), finish_reason=finish)]
+    )
+
+
+class FakeModels:
+    _api_client = pytypes.SimpleNamespace(vertexai=False)
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.configs = []
+
+    async def generate_content_stream(self, model, contents, config):
+        self.configs.append(config)
+        chunks = self.replies.pop(0)
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+
+        return stream()
+
+
+class FakeRequest:
+    def __init__(self, form):
+        self._form = form
+
+    async def form(self):
+        return self._form
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    models = FakeModels([])
+    created = []
+
+    def create(model, config, history):
+        created.append(config)
+        return chats.AsyncChat(modules=models, model=model, config=config, history=history)
+
+    client = pytypes.SimpleNamespace(aio=pytypes.SimpleNamespace(chats=pytypes.SimpleNamespace(create=create)))
+
+    async def get_client():
+        return client
+
+    monkeypatch.setattr(twilio, "get_gemini_client", get_client)
+    return models, created
+
+
+@pytest.mark.asyncio
+async def test_voice_turn_reuses_shared_config_and_stops_after_two_sentences(fake_gemini):
+    models, created = fake_gemini
+    before = twilio.GEMINI_VOICE_CONFIG.model_dump_json()
+    models.replies.append([
+        _chunk(types.Part(text="Restart the rou")),
+        _chunk(types.Part(text="ter. Then check the cable! And")),
+        _chunk(types.Part(text=" much more."), finish="STOP"),
+    ])
+
+    await twilio.voice_webhook(FakeRequest({"CallSid": "CA-test"}))
+    response = await twilio.process_speech(FakeRequest({"CallSid": "CA-test", "SpeechResult": "my wifi is down"}))
+
+    body = response.body.decode()
+    assert ">Restart the router.</Say>" in body
+    assert ">Then check the cable!</Say>" in body
+    assert "much more" not in body
+    # Each chat gets a shallow copy: tools are shared, and the SDK's header writes don't leak back
+    assert len(created) == 1 and created[0] is not twilio.GEMINI_VOICE_CONFIG
+    assert created[0].tools is twilio.GEMINI_VOICE_CONFIG.tools
+    assert twilio.GEMINI_VOICE_CONFIG.model_dump_json() == before
+
+    history = await twilio.sessions.get("CA-test")
+    assert [content.role for content in history] == ["user", "model"]
+    assert history[1].parts[0].text == "Restart the router. Then check the cable!"
+    await twilio.sessions.delete("CA-test")
+
+
+def test_trim_history_starts_on_a_spoken_user_turn(monkeypatch):
+    monkeypatch.setattr(twilio, "MAX_HISTORY_TURNS", 4)
+    user = lambda text: types.Content(role="user", parts=[types.Part(text=text)])
+    model = lambda text: types.Content(role="model", parts=[types.Part(text=text)])
+    tool_result = types.Content(
+        role="user", parts=[types.Part(function_response=types.FunctionResponse(name="search_knowledge_base", response={}))]
+    )
+
+    history = [user("a"), model("b"), user("c"), model("d")]
+    assert twilio._trim_history(history) == history
+    history = [user("a"), model("b"), user("c"), model("call"), tool_result, model("d"), user("e"), model("f")]
+    assert twilio._trim_history(history) == history[6:]
+    history = [user("a"), model("b"), user("c"), model("d"), user("e"), model("call"), tool_result, model("f")]
+    assert twilio._trim_history(history) == history[4:]
+
+
+@pytest.mark.asyncio
+async def test_parallel_tool_calls_each_get_a_response(fake_gemini, monkeypatch):
+    models, _ = fake_gemini
+
+    async def failing_create(args):
+        raise RuntimeError("db down")
+
+    async def search(args):
+        return "Reboot the router"
+
+    monkeypatch.setitem(twilio.TOOLS, "search_knowledge_base", search)
+    monkeypatch.setitem(twilio.TOOLS, "create_ticket", failing_create)
+    models.replies.extend([
+        [_chunk(
+            types.Part(function_call=types.FunctionCall(id="1", name="search_knowledge_base", args={"query": "wifi"})),
+            types.Part(function_call=types.FunctionCall(id="2", name="create_ticket", args={"title": "wifi"})),
+            finish="STOP",
+        )],
+        [_chunk(types.Part(text="Please reboot the router."), finish="STOP")],
+    ])
+
+    await twilio.voice_webhook(FakeRequest({"CallSid": "CA-tools"}))
+    response = await twilio.process_speech(FakeRequest({"CallSid": "CA-tools", "SpeechResult": "wifi broken"}))
+
+    assert ">Please reboot the router.</Say>" in response.body.decode()
+    history = await twilio.sessions.get("CA-tools")
+    responses = {part.function_response.id: part.function_response.response for part in history[2].parts}
+    assert responses == {"1": {"result": "Reboot the router"}, "2": {"error": "The tool failed."}}
+    await twilio.sessions.delete("CA-tools")
@@ -0,0 +1,48 @@
+"""
+Small async caching helpers.
+
+- async_ttl_cache: memoize a coroutine function for `ttl` seconds per argument set.
+  Concurrent callers with the same arguments share a single in-flight call, and
+  failures are never cached. Call `.cache_clear()` on the wrapper to invalidate.
+  With `cache_if`, results it rejects are shared by the in-flight callers but not
+  kept (e.g. empty results from a backend that swallows its errors).
+"""
+from __future__ import annotations
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+
+def async_ttl_cache(
+    ttl: float, maxsize: int = 128, cache_if: Optional[Callable[[Any], bool]] = None
+) -> Callable:
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        entries: "OrderedDict[Any, Tuple[float, asyncio.Future]]" = OrderedDict()
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items())))
+            entry = entries.get(key)
+            if entry is None or (entry[1].done() and entry[0] <= time.monotonic()):
+                entry = (time.monotonic() + ttl, asyncio.ensure_future(func(*args, **kwargs)))
+                entries[key] = entry
+                while len(entries) > maxsize:
+                    entries.popitem(last=False)
+            entries.move_to_end(key)
+            try:
+                # shield: a cancelled caller must not cancel the call other callers share
+                result = await asyncio.shield(entry[1])
+            except Exception:
+                if entries.get(key) is entry:
+                    del entries[key]
+                raise
+            if cache_if is not None and not cache_if(result) and entries.get(key) is entry:
+                del entries[key]
+            return result
+
+        wrapper.cache_clear = entries.clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
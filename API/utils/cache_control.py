@@ -0,0 +1,52 @@
+"""
+Cache-Control headers for idempotent, read-heavy GET endpoints.
+
+Dashboards poll a few endpoints every few seconds; letting the browser reuse a
+response for as long as the server-side cache would serve it anyway removes the
+request entirely. Implemented as a plain ASGI middleware (no per-request
+BaseHTTPMiddleware task), and only 200 responses without their own
+Cache-Control header are tagged.
+"""
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+class CacheControlMiddleware:
+    def __init__(
+        self,
+        app: Callable[[Scope, Receive, Send], Awaitable[None]],
+        max_age_by_path: Dict[str, int],
+        skip_if_query_contains: Iterable[Tuple[str, bytes]] = (),
+    ) -> None:
+        self.app = app
+        self.max_age_by_path = max_age_by_path
+        # (path, query fragment) pairs that make a response uncacheable, e.g. ledger entry dumps
+        self.skip_if_query_contains = list(skip_if_query_contains)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        max_age = self.max_age_by_path.get(path)
+        query = scope.get("query_string", b"").lower()
+        if max_age is None or any(p == path and fragment in query for p, fragment in self.skip_if_query_contains):
+            await self.app(scope, receive, send)
+            return
+
+        header_value = f"private, max-age={max_age}".encode("latin-1")
+
+        async def send_with_cache_control(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = list(message.get("headers", []))
+                if not any(name.lower() == b"cache-control" for name, _ in headers):
+                    headers.append((b"cache-control", header_value))
+                    message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
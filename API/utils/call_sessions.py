@@ -0,0 +1,82 @@
+"""
+Per-call session store for the voice assistant.
+
+- Backed by Redis (`redis.asyncio`) when a client is attached, so any API worker
+  can serve any turn of a call and calls survive a restart; otherwise by an
+  in-process TTLCache (single worker)
+- Keys are "twilio:<call_sid>"; every read and write restarts the entry's TTL, so
+  only calls that go quiet expire
+- Values go through `encode`/`decode` (bytes) only on the Redis path; the local
+  cache keeps the objects themselves
+"""
+from __future__ import annotations
+from typing import Any, Callable, Optional
+
+from cachetools import TTLCache
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class CallSessionStore:
+    KEY_PREFIX = "twilio:"
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: int,
+        encode: Callable[[Any], bytes],
+        decode: Callable[[bytes], Any],
+    ) -> None:
+        self.ttl = ttl
+        self.redis: Any = None
+        self._local: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._encode = encode
+        self._decode = decode
+
+    def attach_redis(self, redis_client: Any) -> None:
+        """Share sessions through Redis from now on (None goes back to the local cache)."""
+        self.redis = redis_client
+
+    async def get(self, call_sid: str) -> Optional[Any]:
+        """The call's session (restarting its TTL), or None when unknown or expired."""
+        if self.redis is not None:
+            try:
+                raw = await self.redis.getex(self.KEY_PREFIX + call_sid, ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Redis session read failed for {call_sid}: {e}")
+                return None
+            return self._decode(raw) if raw is not None else None
+        value = self._local.get(call_sid)
+        if value is not None:
+            self._local[call_sid] = value  # re-set to restart the TTL
+        return value
+
+    async def set(self, call_sid: str, value: Any) -> None:
+        if self.redis is not None:
+            try:
+                await self.redis.set(self.KEY_PREFIX + call_sid, self._encode(value), ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Redis session write failed for {call_sid}: {e}")
+            return
+        self._local[call_sid] = value
+
+    async def delete(self, call_sid: str) -> None:
+        if self.redis is not None:
+            try:
+                await self.redis.delete(self.KEY_PREFIX + call_sid)
+            except Exception as e:
+                logger.warning(f"Redis session delete failed for {call_sid}: {e}")
+            return
+        self._local.pop(call_sid, None)
+
+    async def count(self) -> Optional[int]:
+        """Number of live sessions (a SCAN over the key prefix on Redis; None if that fails)."""
+        if self.redis is not None:
+            try:
+                return sum([1 async for _ in self.redis.scan_iter(match=f"{self.KEY_PREFIX}*", count=1000)])
+            except Exception as e:
+                logger.warning(f"Redis session count failed: {e}")
+                return None
+        return len(self._local)
@@ -17,6 +17,10 @@ logger = logging.getLogger(__name__)
 class TicketDatabase:
     """Manages SQLite database for ticket analysis and analytics"""
     
+    # Writers wait this long for a competing write (e.g. refresh_rollups) instead of
+    # failing with "database is locked"
+    BUSY_TIMEOUT_MS = 10_000
+    
     def __init__(self, db_path: str = "./data/tickets.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -27,6 +31,7 @@ class TicketDatabase:
         """Context manager for database connections"""
         conn = sqlite3.connect(str(self.db_path))
         conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
         try:
             yield conn
             conn.commit()
@@ -41,6 +46,10 @@ class TicketDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
+            # WAL (persistent in the file): readers no longer block the writer or vice versa,
+            # so API threads can read while a write or a rollup refresh is in progress
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
             # Tickets table - stores all analyzed tickets
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS tickets (
@@ -130,11 +139,78 @@ class TicketDatabase:
                 )
             """)
             
+            # Daily rollup of ticket aggregates - rebuilt by refresh_rollups() so the
+            # dashboard reads pre-grouped rows instead of scanning tickets per request
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_daily_stats (
+                    day TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    ticket_count INTEGER NOT NULL,
+                    hours_sum REAL NOT NULL DEFAULT 0,
+                    hours_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, category, priority)
+                )
+            """)
+            
+            # Daily per-agent prediction rollup, kept current by the triggers below
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_agent_perf_daily (
+                    day TEXT NOT NULL,
+                    agent_name TEXT NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    correct INTEGER NOT NULL DEFAULT 0,
+                    confidence_sum REAL NOT NULL DEFAULT 0,
+                    confidence_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, agent_name)
+                )
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_agent_perf_rollup_insert
+                AFTER INSERT ON agent_performance
+                BEGIN
+                    INSERT INTO rollup_agent_perf_daily (
+                        day, agent_name, total, correct, confidence_sum, confidence_count
+                    ) VALUES (
+                        DATE(NEW.created_at), NEW.agent_name, 1,
+                        COALESCE(NEW.is_correct = 1, 0),
+                        COALESCE(NEW.confidence, 0), NEW.confidence IS NOT NULL
+                    )
+                    ON CONFLICT(day, agent_name) DO UPDATE SET
+                        total = total + 1,
+                        correct = correct + excluded.correct,
+                        confidence_sum = confidence_sum + excluded.confidence_sum,
+                        confidence_count = confidence_count + excluded.confidence_count;
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_agent_perf_rollup_feedback
+                AFTER UPDATE OF is_correct ON agent_performance
+                BEGIN
+                    UPDATE rollup_agent_perf_daily
+                    SET correct = correct + COALESCE(NEW.is_correct = 1, 0) - COALESCE(OLD.is_correct = 1, 0)
+                    WHERE day = DATE(NEW.created_at) AND agent_name = NEW.agent_name;
+                END
+            """)
+            
+            # Live counters maintained by the write path (e.g. knowledge base size)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS kb_stats (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            
             # Create indexes for common queries
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_tickets_created_at 
                 ON tickets(created_at DESC)
             """)
+            # Keyset pagination order for ticket exports and history
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tickets_created_at_ticket_id 
+                ON tickets(created_at DESC, ticket_id DESC)
+            """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_tickets_category 
                 ON tickets(category)
@@ -151,6 +227,32 @@ class TicketDatabase:
                 CREATE INDEX IF NOT EXISTS idx_agent_performance_agent 
                 ON agent_performance(agent_name, created_at DESC)
             """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ticket_solutions_solution_id 
+                ON ticket_solutions(solution_id)
+            """)
+            
+            # Backfill rollup groups that predate the triggers (existing groups are left alone)
+            cursor.execute("""
+                INSERT OR IGNORE INTO rollup_agent_perf_daily (
+                    day, agent_name, total, correct, confidence_sum, confidence_count
+                )
+                SELECT 
+                    DATE(created_at),
+                    agent_name,
+                    COUNT(*),
+                    SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END),
+                    COALESCE(SUM(confidence), 0),
+                    COUNT(confidence)
+                FROM agent_performance
+                GROUP BY DATE(created_at), agent_name
+            """)
+            
+            # Backfill the knowledge base counter once for databases created before kb_stats
+            cursor.execute("""
+                INSERT OR IGNORE INTO kb_stats (key, value)
+                SELECT 'knowledge_base_size', COUNT(DISTINCT solution_id) FROM ticket_solutions
+            """)
             
             conn.commit()
             logger.info(f"✅ Database initialized at {self.db_path}")
@@ -162,14 +264,24 @@ class TicketDatabase:
         Create a new ticket in the database
         Returns the ticket_id
         """
+        return self.create_tickets_bulk([ticket_data])[0]
+    
+    def create_tickets_bulk(self, tickets: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create several tickets in a single transaction (one executemany for the rows)
+        Returns the ticket_ids in input order
+        """
         import uuid
-        if 'ticket_id' not in ticket_data:
-            ticket_data['ticket_id'] = f"TKT-{str(uuid.uuid4())[:8].upper()}"
+        for ticket_data in tickets:
+            if 'ticket_id' not in ticket_data:
+                ticket_data['ticket_id'] = f"TKT-{str(uuid.uuid4())[:8].upper()}"
+        if not tickets:
+            return []
             
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            cursor.execute("""
+            cursor.executemany("""
                 INSERT INTO tickets (
                     ticket_id, title, description,
                     category, subcategory, classification_confidence, classification_reasoning,
@@ -178,45 +290,62 @@ class TicketDatabase:
                     processing_time_ms, summary, suggested_assignee, tags,
                     status
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                ticket_data.get('ticket_id'),
-                ticket_data.get('title'),
-                ticket_data.get('description'),
-                ticket_data.get('category'),
-                ticket_data.get('subcategory'),
-                ticket_data.get('classification_confidence'),
-                ticket_data.get('classification_reasoning'),
-                ticket_data.get('priority'),
-                ticket_data.get('priority_confidence'),
-                ticket_data.get('estimated_resolution_hours'),
-                ticket_data.get('priority_reasoning'),
-                ticket_data.get('requester_name'),
-                ticket_data.get('requester_email'),
-                ticket_data.get('requester_department'),
-                json.dumps(ticket_data.get('requester_info')) if ticket_data.get('requester_info') else None,
-                ticket_data.get('processing_time_ms'),
-                ticket_data.get('summary'),
-                ticket_data.get('suggested_assignee'),
-                json.dumps(ticket_data.get('tags')) if ticket_data.get('tags') else None,
-                ticket_data.get('status', 'Open')
-            ))
-            
-            ticket_id = ticket_data.get('ticket_id')
-            
-            # Insert solutions if provided
-            if 'recommended_solutions' in ticket_data:
-                for solution in ticket_data['recommended_solutions']:
-                    self._add_ticket_solution(cursor, ticket_id, solution)
-            
-            # Track agent performance
-            if 'track_performance' in ticket_data and ticket_data['track_performance']:
-                self._track_agent_predictions(cursor, ticket_id, ticket_data)
-            
-            logger.info(f"✅ Ticket created: {ticket_id}")
-            return ticket_id
+            """, [
+                (
+                    ticket_data.get('ticket_id'),
+                    ticket_data.get('title'),
+                    ticket_data.get('description'),
+                    ticket_data.get('category'),
+                    ticket_data.get('subcategory'),
+                    ticket_data.get('classification_confidence'),
+                    ticket_data.get('classification_reasoning'),
+                    ticket_data.get('priority'),
+                    ticket_data.get('priority_confidence'),
+                    ticket_data.get('estimated_resolution_hours'),
+                    ticket_data.get('priority_reasoning'),
+                    ticket_data.get('requester_name'),
+                    ticket_data.get('requester_email'),
+                    ticket_data.get('requester_department'),
+                    json.dumps(ticket_data.get('requester_info')) if ticket_data.get('requester_info') else None,
+                    ticket_data.get('processing_time_ms'),
+                    ticket_data.get('summary'),
+                    ticket_data.get('suggested_assignee'),
+                    json.dumps(ticket_data.get('tags')) if ticket_data.get('tags') else None,
+                    ticket_data.get('status', 'Open')
+                )
+                for ticket_data in tickets
+            ])
+            
+            ticket_ids = []
+            for ticket_data in tickets:
+                ticket_id = ticket_data.get('ticket_id')
+                
+                # Insert solutions if provided
+                if 'recommended_solutions' in ticket_data:
+                    for solution in ticket_data['recommended_solutions']:
+                        self._add_ticket_solution(cursor, ticket_id, solution)
+                
+                # Track agent performance
+                if 'track_performance' in ticket_data and ticket_data['track_performance']:
+                    self._track_agent_predictions(cursor, ticket_id, ticket_data)
+                
+                ticket_ids.append(ticket_id)
+            
+            logger.info(f"✅ Tickets created: {len(ticket_ids)}" if len(ticket_ids) > 1 else f"✅ Ticket created: {ticket_ids[0]}")
+            return ticket_ids
     
     def _add_ticket_solution(self, cursor, ticket_id: str, solution: Dict[str, Any]):
         """Add a solution recommendation for a ticket"""
+        # knowledge_base_size counts distinct solution ids; solutions without one are not counted
+        solution_id = solution.get('solution_id')
+        is_new_solution = False
+        if solution_id is not None:
+            cursor.execute(
+                "SELECT 1 FROM ticket_solutions WHERE solution_id = ? LIMIT 1",
+                (solution_id,)
+            )
+            is_new_solution = cursor.fetchone() is None
+        
         cursor.execute("""
             INSERT INTO ticket_solutions (
                 ticket_id, solution_id, title, description,
@@ -224,7 +353,7 @@ class TicketDatabase:
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             ticket_id,
-            solution.get('solution_id'),
+            solution_id,
             solution.get('title'),
             solution.get('description'),
             solution.get('category'),
@@ -233,6 +362,11 @@ class TicketDatabase:
             solution.get('source'),
             json.dumps(solution.get('metadata')) if solution.get('metadata') else None
         ))
+        
+        if is_new_solution:
+            cursor.execute("""
+                UPDATE kb_stats SET value = value + 1 WHERE key = 'knowledge_base_size'
+            """)
     
     def _track_agent_predictions(self, cursor, ticket_id: str, ticket_data: Dict[str, Any]):
         """Track agent predictions for performance monitoring"""
@@ -305,12 +439,22 @@ class TicketDatabase:
         category: Optional[str] = None,
         priority: Optional[str] = None,
         status: Optional[str] = None,
-        days: Optional[int] = None
-    ) -> Tuple[List[Dict[str, Any]], int]:
+        days: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        after: Optional[Tuple[str, str]] = None,
+        count_total: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
         """
         Get tickets with filters and pagination
-        Returns (tickets, total_count)
+        Returns (tickets, total_count); `columns` limits the selected fields (default all)
+        `after` is a (created_at, ticket_id) keyset cursor: rows strictly after it in
+        newest-first order are returned and `offset` is ignored. total_count ignores it.
+        count_total=False skips the COUNT(*) scan (total_count is None), for page walks
         """
+        if columns and not all(c.isidentifier() for c in columns):
+            raise ValueError(f"Invalid column list: {columns}")
+        select_sql = ", ".join(columns) if columns else "*"
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
@@ -338,14 +482,21 @@ class TicketDatabase:
             where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
             
             # Get total count
-            cursor.execute(f"SELECT COUNT(*) FROM tickets WHERE {where_sql}", params)
-            total_count = cursor.fetchone()[0]
+            total_count = None
+            if count_total:
+                cursor.execute(f"SELECT COUNT(*) FROM tickets WHERE {where_sql}", params)
+                total_count = cursor.fetchone()[0]
+            
+            if after:
+                where_sql += " AND (created_at, ticket_id) < (?, ?)"
+                params = params + list(after)
+                offset = 0
             
             # Get tickets
             cursor.execute(f"""
-                SELECT * FROM tickets 
+                SELECT {select_sql} FROM tickets 
                 WHERE {where_sql}
-                ORDER BY created_at DESC
+                ORDER BY created_at DESC, ticket_id DESC
                 LIMIT ? OFFSET ?
             """, params + [limit, offset])
             
@@ -393,70 +544,188 @@ class TicketDatabase:
     
     def get_dashboard_metrics(self, days: int = 30) -> Dict[str, Any]:
         """Calculate dashboard metrics from database"""
+        with self.get_connection() as conn:
+            return self._dashboard_metrics(conn.cursor(), datetime.utcnow() - timedelta(days=days))
+    
+    def _dashboard_metrics(self, cursor, cutoff_date: datetime) -> Dict[str, Any]:
+        """Headline metrics in one statement (scalar subqueries over the same window)"""
+        cutoff = cutoff_date.isoformat()
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM tickets WHERE created_at >= :cutoff),
+                (SELECT AVG(processing_time_ms) FROM tickets
+                 WHERE created_at >= :cutoff AND processing_time_ms IS NOT NULL),
+                -- Classification accuracy (where feedback exists)
+                (SELECT COUNT(*) FROM agent_performance
+                 WHERE agent_name = 'classification' AND actual_value IS NOT NULL AND created_at >= :cutoff),
+                (SELECT SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) FROM agent_performance
+                 WHERE agent_name = 'classification' AND actual_value IS NOT NULL AND created_at >= :cutoff),
+                -- Knowledge base size (distinct solutions, maintained by _add_ticket_solution)
+                (SELECT value FROM kb_stats WHERE key = 'knowledge_base_size')
+        """, {"cutoff": cutoff})
+        total_tickets, avg_processing_time, feedback_total, feedback_correct, knowledge_base_size = cursor.fetchone()
+        classification_accuracy = (feedback_correct / feedback_total) if feedback_total > 0 else 0.92
+        
+        return {
+            "total_tickets": total_tickets,
+            "avg_processing_time": round(avg_processing_time or 0, 2),
+            "classification_accuracy": round(classification_accuracy, 2),
+            "knowledge_base_size": knowledge_base_size or 0
+        }
+    
+    def get_dashboard_bundle(self, days: int = 30, recent_limit: int = 10) -> Dict[str, Any]:
+        """
+        Everything the dashboard shows, read over one connection and snapshot:
+        metrics, category/priority/trend breakdowns and the most recent tickets.
+        The three breakdowns are shaped from a single scan of the daily rollup.
+        """
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("BEGIN")  # one read snapshot for all statements
             
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
+            metrics = self._dashboard_metrics(cursor, cutoff_date)
+            
+            cursor.execute("""
+                SELECT day, category, priority, ticket_count, hours_sum, hours_count
+                FROM rollup_daily_stats
+                WHERE day >= ?
+            """, (cutoff_date.date().isoformat(),))
+            rollup_rows = cursor.fetchall()
             
-            # Total tickets
             cursor.execute("""
-                SELECT COUNT(*) FROM tickets
+                SELECT ticket_id, title, category, priority, status, created_at
+                FROM tickets
                 WHERE created_at >= ?
-            """, (cutoff_date.isoformat(),))
-            total_tickets = cursor.fetchone()[0]
+                ORDER BY created_at DESC
+                LIMIT ?
+            """, (cutoff_date.isoformat(), recent_limit))
+            recent_tickets = [dict(row) for row in cursor.fetchall()]
             
-            # Average processing time
             cursor.execute("""
-                SELECT AVG(processing_time_ms) FROM tickets
-                WHERE created_at >= ? AND processing_time_ms IS NOT NULL
-            """, (cutoff_date.isoformat(),))
-            avg_processing_time = cursor.fetchone()[0] or 0
+                SELECT calculated_at FROM analytics_cache
+                WHERE metric_name = 'rollup_daily_stats'
+            """)
+            row = cursor.fetchone()
+            refreshed_at = datetime.fromisoformat(row[0]) if row else None
+        
+        categories: Dict[str, Dict[str, Any]] = {}
+        priorities: Dict[str, Dict[str, Any]] = {}
+        trends: Dict[str, Dict[str, Any]] = {}
+        for day, category, priority, count, hours_sum, hours_count in rollup_rows:
+            cat = categories.setdefault(category, {
+                "count": 0, "hours_sum": 0.0, "hours_count": 0,
+                "priorities": {"Critical": 0, "High": 0, "Medium": 0, "Low": 0}
+            })
+            cat["count"] += count
+            cat["hours_sum"] += hours_sum or 0
+            cat["hours_count"] += hours_count or 0
+            if priority in cat["priorities"]:
+                cat["priorities"][priority] += count
+            
+            pri = priorities.setdefault(priority, {
+                "priority": priority, "count": 0, "avg_resolution_hours": 0, "categories": {}
+            })
+            pri["count"] += count
+            pri["categories"][category] = pri["categories"].get(category, 0) + count
+            
+            trend = trends.setdefault(day, {"count": 0, "hours_sum": 0.0, "hours_count": 0})
+            trend["count"] += count
+            trend["hours_sum"] += hours_sum or 0
+            trend["hours_count"] += hours_count or 0
+        
+        def avg_hours(agg: Dict[str, Any]) -> float:
+            return round(agg["hours_sum"] / agg["hours_count"], 1) if agg["hours_count"] else 0
+        
+        priority_rank = {"Critical": 1, "High": 2, "Medium": 3, "Low": 4}
+        return {
+            "metrics": metrics,
+            "category_stats": sorted(
+                (
+                    {
+                        "category": category,
+                        "count": agg["count"],
+                        "avg_resolution_hours": avg_hours(agg),
+                        "priorities": agg["priorities"]
+                    }
+                    for category, agg in categories.items()
+                ),
+                key=lambda c: c["count"],
+                reverse=True
+            ),
+            # Same ordering as get_priority_stats: unknown priorities (NULL rank) first
+            "priority_stats": sorted(priorities.values(), key=lambda p: priority_rank.get(p["priority"], 0)),
+            "trend_data": [
+                {"date": day, "count": agg["count"], "avg_resolution_hours": avg_hours(agg)}
+                for day, agg in sorted(trends.items())
+            ],
+            "recent_tickets": recent_tickets,
+            "rollup_refreshed_at": refreshed_at
+        }
+    
+    # ==================== ROLLUPS ====================
+    
+    def refresh_rollups(self) -> None:
+        """Rebuild the daily rollup table from tickets in a single transaction.
+        
+        Readers keep seeing the previous rollup until the transaction commits.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
             
-            # Classification accuracy (where feedback exists)
+            cursor.execute("DELETE FROM rollup_daily_stats")
             cursor.execute("""
+                INSERT INTO rollup_daily_stats (
+                    day, category, priority, ticket_count, hours_sum, hours_count
+                )
                 SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) as correct
-                FROM agent_performance
-                WHERE agent_name = 'classification' 
-                AND actual_value IS NOT NULL
-                AND created_at >= ?
-            """, (cutoff_date.isoformat(),))
-            perf_row = cursor.fetchone()
-            classification_accuracy = (perf_row[1] / perf_row[0]) if perf_row[0] > 0 else 0.92
-            
-            # Knowledge base size (from solutions)
-            cursor.execute("SELECT COUNT(DISTINCT solution_id) FROM ticket_solutions")
-            knowledge_base_size = cursor.fetchone()[0]
-            
-            return {
-                "total_tickets": total_tickets,
-                "avg_processing_time": round(avg_processing_time, 2),
-                "classification_accuracy": round(classification_accuracy, 2),
-                "knowledge_base_size": knowledge_base_size
-            }
+                    DATE(created_at),
+                    category,
+                    priority,
+                    COUNT(*),
+                    COALESCE(SUM(COALESCE(actual_resolution_hours, estimated_resolution_hours)), 0),
+                    COUNT(COALESCE(actual_resolution_hours, estimated_resolution_hours))
+                FROM tickets
+                GROUP BY DATE(created_at), category, priority
+            """)
+            cursor.execute("""
+                INSERT INTO analytics_cache (metric_name, metric_value, calculated_at)
+                VALUES ('rollup_daily_stats', '{}', ?)
+                ON CONFLICT(metric_name) DO UPDATE SET calculated_at = excluded.calculated_at
+            """, (datetime.utcnow().isoformat(),))
+    
+    def get_rollup_refreshed_at(self) -> Optional[datetime]:
+        """Return when the daily rollup was last rebuilt (UTC), or None if never"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT calculated_at FROM analytics_cache
+                WHERE metric_name = 'rollup_daily_stats'
+            """)
+            row = cursor.fetchone()
+            return datetime.fromisoformat(row[0]) if row else None
     
     def get_category_stats(self, days: int = 30) -> List[Dict[str, Any]]:
         """Get statistics by category"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
+            cutoff_day = (datetime.utcnow() - timedelta(days=days)).date()
             
             cursor.execute("""
                 SELECT 
                     category,
-                    COUNT(*) as total,
-                    AVG(COALESCE(actual_resolution_hours, estimated_resolution_hours)) as avg_hours,
-                    SUM(CASE WHEN priority = 'Critical' THEN 1 ELSE 0 END) as critical,
-                    SUM(CASE WHEN priority = 'High' THEN 1 ELSE 0 END) as high,
-                    SUM(CASE WHEN priority = 'Medium' THEN 1 ELSE 0 END) as medium,
-                    SUM(CASE WHEN priority = 'Low' THEN 1 ELSE 0 END) as low
-                FROM tickets
-                WHERE created_at >= ?
+                    SUM(ticket_count) as total,
+                    SUM(hours_sum) / NULLIF(SUM(hours_count), 0) as avg_hours,
+                    SUM(CASE WHEN priority = 'Critical' THEN ticket_count ELSE 0 END) as critical,
+                    SUM(CASE WHEN priority = 'High' THEN ticket_count ELSE 0 END) as high,
+                    SUM(CASE WHEN priority = 'Medium' THEN ticket_count ELSE 0 END) as medium,
+                    SUM(CASE WHEN priority = 'Low' THEN ticket_count ELSE 0 END) as low
+                FROM rollup_daily_stats
+                WHERE day >= ?
                 GROUP BY category
                 ORDER BY total DESC
-            """, (cutoff_date.isoformat(),))
+            """, (cutoff_day.isoformat(),))
             
             stats = []
             for row in cursor.fetchall():
@@ -479,16 +748,16 @@ class TicketDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
+            cutoff_day = (datetime.utcnow() - timedelta(days=days)).date()
             
             cursor.execute("""
                 SELECT 
                     priority,
-                    COUNT(*) as total,
-                    AVG(COALESCE(actual_resolution_hours, estimated_resolution_hours)) as avg_hours,
+                    SUM(ticket_count) as total,
+                    SUM(hours_sum) / NULLIF(SUM(hours_count), 0) as avg_hours,
                     category
-                FROM tickets
-                WHERE created_at >= ?
+                FROM rollup_daily_stats
+                WHERE day >= ?
                 GROUP BY priority, category
                 ORDER BY 
                     CASE priority 
@@ -497,7 +766,7 @@ class TicketDatabase:
                         WHEN 'Medium' THEN 3
                         WHEN 'Low' THEN 4
                     END
-            """, (cutoff_date.isoformat(),))
+            """, (cutoff_day.isoformat(),))
             
             # Group by priority
             priority_map = {}
@@ -521,18 +790,18 @@ class TicketDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
+            cutoff_day = (datetime.utcnow() - timedelta(days=days)).date()
             
             cursor.execute("""
                 SELECT 
-                    DATE(created_at) as date,
-                    COUNT(*) as count,
-                    AVG(COALESCE(actual_resolution_hours, estimated_resolution_hours)) as avg_hours
-                FROM tickets
-                WHERE created_at >= ?
-                GROUP BY DATE(created_at)
+                    day as date,
+                    SUM(ticket_count) as count,
+                    SUM(hours_sum) / NULLIF(SUM(hours_count), 0) as avg_hours
+                FROM rollup_daily_stats
+                WHERE day >= ?
+                GROUP BY day
                 ORDER BY date ASC
-            """, (cutoff_date.isoformat(),))
+            """, (cutoff_day.isoformat(),))
             
             trends = []
             for row in cursor.fetchall():
@@ -554,32 +823,40 @@ class TicketDatabase:
         feedback_source: str = "user"
     ):
         """Log feedback for an agent's prediction"""
+        self.log_agent_feedback_batch([(ticket_id, agent_name, actual_value, feedback_source)])
+    
+    def log_agent_feedback_batch(self, feedback: List[Tuple[str, str, str, str]]) -> int:
+        """
+        Log feedback for many predictions in one transaction
+        Each item is (ticket_id, agent_name, actual_value, feedback_source); the
+        latest prediction of that agent for the ticket is updated.
+        Returns the number of predictions updated
+        """
+        if not feedback:
+            return 0
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Get the original prediction
-            cursor.execute("""
-                SELECT id, predicted_value FROM agent_performance
-                WHERE ticket_id = ? AND agent_name = ?
-                ORDER BY created_at DESC LIMIT 1
-            """, (ticket_id, agent_name))
-            
-            row = cursor.fetchone()
-            if row:
-                perf_id = row[0]
-                predicted = row[1]
-                is_correct = (predicted == actual_value)
-                
-                cursor.execute("""
-                    UPDATE agent_performance
-                    SET actual_value = ?,
-                        is_correct = ?,
-                        feedback_source = ?,
-                        feedback_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (actual_value, is_correct, feedback_source, perf_id))
-                
-                logger.info(f"✅ Feedback logged for {agent_name} on ticket {ticket_id}")
+            cursor.executemany("""
+                UPDATE agent_performance
+                SET actual_value = ?,
+                    is_correct = (predicted_value = ?),
+                    feedback_source = ?,
+                    feedback_at = CURRENT_TIMESTAMP
+                WHERE id = (
+                    SELECT id FROM agent_performance
+                    WHERE ticket_id = ? AND agent_name = ?
+                    ORDER BY created_at DESC LIMIT 1
+                )
+            """, [
+                (actual_value, actual_value, feedback_source, ticket_id, agent_name)
+                for ticket_id, agent_name, actual_value, feedback_source in feedback
+            ])
+            
+            updated = cursor.rowcount
+            logger.info(f"✅ Feedback logged for {updated}/{len(feedback)} agent predictions")
+            return updated
     
     def get_agent_performance(self, days: int = 30) -> Dict[str, Any]:
         """Get agent performance statistics"""
@@ -588,17 +865,17 @@ class TicketDatabase:
             
             cutoff_date = datetime.utcnow() - timedelta(days=days)
             
-            # Get performance by agent
+            # Get performance by agent (from the trigger-maintained daily rollup)
             cursor.execute("""
                 SELECT 
                     agent_name,
-                    COUNT(*) as total,
-                    SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) as correct,
-                    AVG(confidence) as avg_confidence
-                FROM agent_performance
-                WHERE created_at >= ?
+                    SUM(total) as total,
+                    SUM(correct) as correct,
+                    SUM(confidence_sum) / NULLIF(SUM(confidence_count), 0) as avg_confidence
+                FROM rollup_agent_perf_daily
+                WHERE day >= ?
                 GROUP BY agent_name
-            """, (cutoff_date.isoformat(),))
+            """, (cutoff_date.date().isoformat(),))
             
             agents = {}
             total_correct = 0
@@ -0,0 +1,28 @@
+"""
+Event loop selection for programmatic entry points (CLI scripts).
+
+The API server picks uvloop through uvicorn (`loop="uvloop"` in main.py); scripts
+that start their own loop use `run()` to get the same libuv-based loop when uvloop
+is installed, and the stock asyncio loop otherwise (e.g. on Windows).
+"""
+from __future__ import annotations
+import asyncio
+from typing import Any, Coroutine, TypeVar
+
+try:
+    import uvloop  # type: ignore
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+T = TypeVar("T")
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """asyncio.run(main) on uvloop when available."""
+    if not UVLOOP_AVAILABLE:
+        return asyncio.run(main)
+    if hasattr(uvloop, "run"):  # uvloop >= 0.18
+        return uvloop.run(main)
+    uvloop.install()
+    return asyncio.run(main)
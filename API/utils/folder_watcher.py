@@ -0,0 +1,102 @@
+"""
+Watch data folders and ingest files as they are created or modified.
+
+Uses watchdog's native observer (inotify/FSEvents/ReadDirectoryChangesW), or its
+PollingObserver for network filesystems where native events are not delivered.
+Events are debounced per file so a file being written is ingested once it settles.
+watchdog is optional: when it is not installed, start() returns False and
+changes are only picked up by the startup auto-sync.
+"""
+from __future__ import annotations
+import asyncio
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+try:
+    from watchdog.events import FileSystemEvent, PatternMatchingEventHandler
+    from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class FolderWatcher:
+    def __init__(
+        self,
+        folders: Iterable[Path],
+        patterns: Iterable[str],
+        on_change: Callable[[Path, Path], Awaitable[int]],
+        polling: bool = False,
+        debounce_seconds: float = 2.0,
+    ) -> None:
+        self.folders: List[Path] = [Path(f) for f in folders]
+        self.patterns = list(patterns)
+        self.on_change = on_change  # called with (file path, watched folder) on the event loop
+        self.polling = polling
+        self.debounce_seconds = debounce_seconds
+        self._observer = None
+        self._pending: Dict[Path, asyncio.TimerHandle] = {}
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> bool:
+        if not WATCHDOG_AVAILABLE:
+            logger.info("watchdog not installed; folder watching disabled")
+            return False
+        loop = loop or asyncio.get_running_loop()
+        self._observer = PollingObserver() if self.polling else Observer()
+        for folder in self.folders:
+            if folder.exists():
+                self._observer.schedule(self._handler(folder, loop), str(folder), recursive=True)
+        self._observer.start()
+        logger.info(f"Watching {len(self.folders)} data folders ({'polling' if self.polling else 'native events'})")
+        return True
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        for handle in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
+
+    def _schedule(self, path: Path, folder: Path, loop: asyncio.AbstractEventLoop) -> None:
+        """Runs on the event loop: (re)start the debounce timer for `path`."""
+        handle = self._pending.pop(path, None)
+        if handle is not None:
+            handle.cancel()
+        self._pending[path] = loop.call_later(self.debounce_seconds, self._fire, path, folder, loop)
+
+    def _fire(self, path: Path, folder: Path, loop: asyncio.AbstractEventLoop) -> None:
+        self._pending.pop(path, None)
+        task = loop.create_task(self.on_change(path, folder))
+        task.add_done_callback(lambda t: _log_failure(t, path))
+
+    def _handler(self, folder: Path, loop: asyncio.AbstractEventLoop):
+        watcher = self
+
+        class _Handler(PatternMatchingEventHandler):
+            def on_created(self, event: FileSystemEvent) -> None:
+                self._dispatch_file(event.src_path)
+
+            def on_modified(self, event: FileSystemEvent) -> None:
+                self._dispatch_file(event.src_path)
+
+            def on_moved(self, event: FileSystemEvent) -> None:
+                self._dispatch_file(event.dest_path)
+
+            def _dispatch_file(self, src_path) -> None:
+                # Observer thread -> event loop
+                loop.call_soon_threadsafe(watcher._schedule, Path(str(src_path)), folder, loop)
+
+        # Case-insensitive so .PDF/.Md files match like they do in ingest_folder
+        return _Handler(patterns=self.patterns, ignore_directories=True, case_sensitive=False)
+
+
+def _log_failure(task: asyncio.Task, path: Path) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Ingest of changed file {path} failed: {task.exception()}")
@@ -14,12 +14,20 @@ Schema: ledger_entries
 - mtime REAL
 - error TEXT
 
-Convenience indexes on (path) to look up by file path.
+Convenience indexes on (path) to look up by file path, and on (content_hash)
+so unchanged content can be skipped before it is extracted and embedded.
+
+Writes go through one shared connection (serialized by a lock), so the page
+cache and mmap stay warm across calls; create one ledger per process. Reads
+use a small pool of query-only connections which, under WAL, run concurrently
+with each other and with the writer instead of queueing on the lock.
 """
 from __future__ import annotations
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any, Iterable, List
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 from datetime import datetime, timezone
  
 
@@ -27,16 +35,65 @@ def ISO(dt: datetime) -> str:
     return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
 
 class SqliteLedger:
+    READ_POOL_SIZE = 4
+
     def __init__(self, db_path: Path) -> None:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-200000;
+            PRAGMA temp_store=MEMORY;
+            """
+        )
         self._ensure_schema()
+        self._pool_lock = threading.Lock()
+        self._idle_readers: List[sqlite3.Connection] = []
+        self._closed = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Shared connection, one transaction per block (commit on success, rollback on error)."""
+        with self._lock, self._conn:
+            yield self._conn
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Pooled read-only connection; returned to the pool (up to READ_POOL_SIZE idle) afterwards."""
+        with self._pool_lock:
+            conn = self._idle_readers.pop() if self._idle_readers else None
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            # mmap pages are shared through the OS page cache, so readers keep the default cache_size
+            conn.executescript(
+                """
+                PRAGMA query_only=ON;
+                PRAGMA mmap_size=268435456;
+                PRAGMA temp_store=MEMORY;
+                """
+            )
+        try:
+            yield conn
+        finally:
+            with self._pool_lock:
+                if self._closed or len(self._idle_readers) >= self.READ_POOL_SIZE:
+                    conn.close()
+                else:
+                    self._idle_readers.append(conn)
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(self.db_path))
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("PRAGMA synchronous=NORMAL;")
-        return conn
+    def close(self) -> None:
+        with self._pool_lock:
+            self._closed = True
+            for conn in self._idle_readers:
+                conn.close()
+            self._idle_readers.clear()
+        with self._lock:
+            self._conn.close()
 
     def _ensure_schema(self) -> None:
         with self._connect() as conn:
@@ -58,12 +115,22 @@ class SqliteLedger:
                 """
             )
             conn.execute("CREATE INDEX IF NOT EXISTS idx_ledger_path ON ledger_entries(path);")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ledger_content_hash ON ledger_entries(content_hash);")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ledger_status ON ledger_entries(status);")
 
     def has(self, doc_id: str) -> bool:
-        with self._connect() as conn:
+        with self._reader() as conn:
             cur = conn.execute("SELECT 1 FROM ledger_entries WHERE doc_id = ? AND status != 'removed'", (doc_id,))
             return cur.fetchone() is not None
 
+    def has_hash(self, content_hash: str) -> bool:
+        """True when content with this hash is already synced to the vector store."""
+        with self._reader() as conn:
+            cur = conn.execute(
+                "SELECT 1 FROM ledger_entries WHERE content_hash = ? AND status != 'removed' LIMIT 1", (content_hash,)
+            )
+            return cur.fetchone() is not None
+
     def upsert_synced(self, *, doc_id: str, path: str, source_type: str, category: Optional[str], content_hash: Optional[str], size: Optional[int], mtime: Optional[float]) -> None:
         now = ISO(datetime.now(timezone.utc))
         with self._connect() as conn:
@@ -86,6 +153,29 @@ class SqliteLedger:
                     (doc_id, path, source_type, category, content_hash, now, now, size, mtime)
                 )
 
+    def upsert_synced_many(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """upsert_synced for many entries (same keyword fields, as dicts) in one transaction."""
+        now = ISO(datetime.now(timezone.utc))
+        rows = [
+            (e["doc_id"], e["path"], e["source_type"], e.get("category"), e.get("content_hash"), now, now, e.get("size"), e.get("mtime"))
+            for e in entries
+        ]
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO ledger_entries (doc_id, path, source_type, category, content_hash, status, first_seen_at, last_seen_at, size, mtime)
+                VALUES (?, ?, ?, ?, ?, 'synced', ?, ?, ?, ?)
+                ON CONFLICT(doc_id) DO UPDATE SET
+                    path = excluded.path, source_type = excluded.source_type, category = excluded.category,
+                    content_hash = excluded.content_hash, status = 'synced', last_seen_at = excluded.last_seen_at,
+                    size = excluded.size, mtime = excluded.mtime, error = NULL
+                """,
+                rows
+            )
+        return len(rows)
+
     def mark_removed(self, doc_id: str) -> None:
         now = ISO(datetime.now(timezone.utc))
         with self._connect() as conn:
@@ -94,20 +184,126 @@ class SqliteLedger:
                 (now, doc_id)
             )
 
-    def all_doc_ids(self) -> List[str]:
+    # Stays under SQLite's historical 999 bound-parameter limit (ids + the timestamp)
+    MARK_REMOVED_CHUNK = 900
+
+    def mark_removed_many(self, doc_ids: Iterable[str]) -> int:
+        """Mark several entries removed in a single transaction; returns the number of ids given.
+
+        Ids are updated MARK_REMOVED_CHUNK at a time with `doc_id IN (...)` statements.
+        """
+        now = ISO(datetime.now(timezone.utc))
+        ids = list(doc_ids)
+        if not ids:
+            return 0
         with self._connect() as conn:
+            for start in range(0, len(ids), self.MARK_REMOVED_CHUNK):
+                chunk = ids[start:start + self.MARK_REMOVED_CHUNK]
+                placeholders = ", ".join("?" for _ in chunk)
+                conn.execute(
+                    f"UPDATE ledger_entries SET status = 'removed', last_seen_at = ? WHERE doc_id IN ({placeholders})",
+                    [now, *chunk]
+                )
+        return len(ids)
+
+    def active_entries(self, source_types: Iterable[str]) -> List[Dict[str, Any]]:
+        """doc_id/path of non-removed entries with one of the given source types."""
+        types = list(source_types)
+        placeholders = ", ".join("?" for _ in types)
+        with self._reader() as conn:
+            cur = conn.execute(
+                f"SELECT doc_id, path FROM ledger_entries WHERE source_type IN ({placeholders}) AND status != 'removed'",
+                types
+            )
+            return [{"doc_id": row[0], "path": row[1]} for row in cur.fetchall()]
+
+    def active_entries_by_hash(self, content_hash: str) -> List[Dict[str, Any]]:
+        """doc_id/path of non-removed entries whose content has this hash."""
+        with self._reader() as conn:
+            cur = conn.execute(
+                "SELECT doc_id, path FROM ledger_entries WHERE content_hash = ? AND status != 'removed'", (content_hash,)
+            )
+            return [{"doc_id": row[0], "path": row[1]} for row in cur.fetchall()]
+
+    def active_ids_by_path(self, paths: Iterable[str]) -> Dict[str, List[str]]:
+        """path -> doc_ids of its non-removed entries (looked up MARK_REMOVED_CHUNK paths at a time)."""
+        wanted = list(dict.fromkeys(paths))
+        found: Dict[str, List[str]] = {}
+        with self._reader() as conn:
+            for start in range(0, len(wanted), self.MARK_REMOVED_CHUNK):
+                chunk = wanted[start:start + self.MARK_REMOVED_CHUNK]
+                placeholders = ", ".join("?" for _ in chunk)
+                cur = conn.execute(
+                    f"SELECT path, doc_id FROM ledger_entries WHERE path IN ({placeholders}) AND status != 'removed'",
+                    chunk
+                )
+                for path, doc_id in cur.fetchall():
+                    found.setdefault(path, []).append(doc_id)
+        return found
+
+    def file_index(self) -> Dict[str, Tuple[Optional[int], Optional[float]]]:
+        """path -> (size, mtime) for entries that are not removed, used to skip unchanged files."""
+        with self._reader() as conn:
+            cur = conn.execute("SELECT path, size, mtime FROM ledger_entries WHERE status != 'removed' AND path IS NOT NULL")
+            return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+    def all_doc_ids(self) -> List[str]:
+        with self._reader() as conn:
             cur = conn.execute("SELECT doc_id FROM ledger_entries")
             return [row[0] for row in cur.fetchall()]
 
     def iter_entries(self) -> Iterable[Dict[str, Any]]:
-        with self._connect() as conn:
+        with self._reader() as conn:
             cur = conn.execute("SELECT doc_id, path, source_type, category, content_hash, status, first_seen_at, last_seen_at, size, mtime, error FROM ledger_entries")
             cols = [d[0] for d in cur.description]
-            for row in cur.fetchall():
-                yield {cols[i]: row[i] for i in range(len(cols))}
+            rows = cur.fetchall()
+        # Yield after the reader is back in the pool so a paused consumer does not hold it
+        for row in rows:
+            yield {cols[i]: row[i] for i in range(len(cols))}
+
+    @staticmethod
+    def _entries_query(status: Optional[str], limit: int) -> Tuple[str, List[Any]]:
+        """SELECT for entries with the status filter and limit applied in SQL (limit 0 = all)."""
+        sql = "SELECT doc_id, path, source_type, category, content_hash, status, first_seen_at, last_seen_at, size, mtime, error FROM ledger_entries"
+        params: List[Any] = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def query_entries(self, status: Optional[str] = None, limit: int = 0) -> List[Dict[str, Any]]:
+        """Entries matching `status`, at most `limit` (0 = no limit); only those rows are read."""
+        sql, params = self._entries_query(status, limit)
+        with self._reader() as conn:
+            cur = conn.execute(sql, params)
+            cols = [d[0] for d in cur.description]
+            return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    def iter_entries_cursor(self, status: Optional[str] = None, limit: int = 0, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream entries from a pooled read connection, `batch_size` rows at a time.
+
+        Unlike iter_entries, rows are never all held in memory; the reader stays
+        checked out until the consumer (e.g. an HTTP stream) finishes.
+        """
+        sql, params = self._entries_query(status, limit)
+        with self._reader() as conn:
+            cur = conn.execute(sql, params)
+            cols = [d[0] for d in cur.description]
+            try:
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(zip(cols, row))
+            finally:
+                cur.close()  # end the read before the connection goes back to the pool
 
     def stats(self) -> Dict[str, Any]:
-        with self._connect() as conn:
+        with self._reader() as conn:
             cur = conn.execute("SELECT COUNT(*) FROM ledger_entries WHERE status = 'synced'")
             synced = cur.fetchone()[0]
             cur = conn.execute("SELECT COUNT(*) FROM ledger_entries WHERE status = 'removed'")
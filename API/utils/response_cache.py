@@ -0,0 +1,92 @@
+"""
+Short-TTL response cache shared by API workers.
+
+- Backed by Redis (`redis.asyncio`) when a client is supplied, otherwise by an
+  in-process dict, so the API still works without a Redis server
+- Keys are "<namespace>:<key>"; `clear(namespace)` drops a whole namespace
+- `get_or_compute` is single-flight: concurrent misses for the same key in this
+  process await one computation instead of each hitting the database
+- Values must be JSON-serializable (stored with orjson)
+"""
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ResponseCache:
+    def __init__(self, redis_client: Any = None) -> None:
+        self.redis = redis_client
+        self._local: Dict[str, Tuple[float, bytes]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        full_key = f"{namespace}:{key}"
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(full_key)
+            except Exception as e:
+                logger.warning(f"Redis get failed for {full_key}: {e}")
+                return None
+        else:
+            entry = self._local.get(full_key)
+            raw = None
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    raw = entry[1]
+                else:
+                    del self._local[full_key]
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: int) -> None:
+        full_key = f"{namespace}:{key}"
+        raw = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        if self.redis is not None:
+            try:
+                await self.redis.set(full_key, raw, ex=ttl)
+            except Exception as e:
+                logger.warning(f"Redis set failed for {full_key}: {e}")
+        else:
+            self._local[full_key] = (time.monotonic() + ttl, raw)
+
+    async def clear(self, namespace: str) -> None:
+        prefix = f"{namespace}:"
+        if self.redis is not None:
+            try:
+                keys = [k async for k in self.redis.scan_iter(match=f"{prefix}*")]
+                if keys:
+                    await self.redis.delete(*keys)
+            except Exception as e:
+                logger.warning(f"Redis clear failed for namespace {namespace}: {e}")
+        else:
+            for full_key in [k for k in self._local if k.startswith(prefix)]:
+                del self._local[full_key]
+
+    async def get_or_compute(
+        self, namespace: str, key: str, ttl: int, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        cached = await self.get(namespace, key)
+        if cached is not None:
+            return cached
+
+        full_key = f"{namespace}:{key}"
+        pending = self._inflight.get(full_key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._compute_and_store(namespace, key, ttl, compute))
+            self._inflight[full_key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(full_key, None))
+        # shield: a cancelled caller must not cancel the computation other callers share
+        return await asyncio.shield(pending)
+
+    async def _compute_and_store(
+        self, namespace: str, key: str, ttl: int, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        value = await compute()
+        await self.set(namespace, key, value, ttl)
+        return value
@@ -0,0 +1,62 @@
+"""
+Semantic cache for knowledge-base lookups.
+
+Entries are keyed by a query embedding inside a scope (e.g. endpoint + category +
+result limits). A lookup returns a cached payload when a stored embedding in the
+same scope has cosine similarity >= threshold, so near-duplicate queries such as
+"reset password" / "password reset" skip the vector search entirely.
+
+- Embeddings are expected to be L2-normalized (cosine == dot product)
+- Bounded size with LRU eviction and a per-entry TTL
+"""
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600, threshold: float = 0.92) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        # key -> (scope, embedding, payload, expires_at); order tracks recency of use
+        self._entries: "OrderedDict[int, Tuple[str, np.ndarray, Any, float]]" = OrderedDict()
+        self._keys = count()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, embedding: np.ndarray, scope: str = "") -> Optional[Any]:
+        now = time.monotonic()
+        best_key = None
+        best_score = self.threshold
+        for key, (entry_scope, entry_emb, _, expires_at) in list(self._entries.items()):
+            if expires_at <= now:
+                del self._entries[key]
+                continue
+            if entry_scope != scope:
+                continue
+            score = float(np.dot(entry_emb, embedding))
+            if score >= best_score:
+                best_key, best_score = key, score
+
+        if best_key is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(best_key)
+        self.hits += 1
+        return self._entries[best_key][2]
+
+    def put(self, embedding: np.ndarray, payload: Any, scope: str = "") -> None:
+        self._entries[next(self._keys)] = (scope, np.asarray(embedding), payload, time.monotonic() + self.ttl_seconds)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
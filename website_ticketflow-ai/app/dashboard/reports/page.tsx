@@ -121,14 +121,16 @@ export default function ReportsPage() {
 
       if (!response.ok) throw new Error("Export failed")
 
-      const data = await response.json()
+      // The API streams text/csv; the filename comes from Content-Disposition
+      const disposition = response.headers.get('Content-Disposition') || ''
+      const filename = disposition.match(/filename="?([^";]+)"?/)?.[1] || `${reportType}_report.csv`
+      const blob = await response.blob()
 
       // Create download link
-      const blob = new Blob([data.content], { type: 'text/csv' })
       const url = window.URL.createObjectURL(blob)
       const a = document.createElement('a')
       a.href = url
-      a.download = data.filename
+      a.download = filename
       document.body.appendChild(a)
       a.click()
       window.URL.revokeObjectURL(url)